@@ -5,6 +5,7 @@ from Backend.core.tag_manager import TagManager
 from Backend.core.journal_manager import JournalEntry, JournalManager
 from Backend.core.net_worth_manager import NetWorthSnapshot, NetWorthManager
 from Backend.core.ai_analyser import FinancialAnalyser
+from Backend.core.ai_telemetry import AiTelemetry
 from Backend.ui_helpers import *
 from Backend.utils.validators import *
 from Backend.core.config_manager import load_config, save_config
@@ -36,7 +37,9 @@ def main():
     tag_manager = TagManager()
     journal_manager = JournalManager()
     net_worth_manager = NetWorthManager()
-    ai_analyser = FinancialAnalyser(api_key=api_key)
+    ai_analyser = FinancialAnalyser(api_key=api_key, hedge_after_seconds=config.get("ai_hedge_after_seconds"),
+                                    base_url=config.get("ai_base_url"), telemetry=AiTelemetry(),
+                                    hedge_model=config.get("ai_hedge_model"))
     
     all_data = storage_manager.load_data()
     ledger_manager.entries = [LedgerEntry.from_dict(d) for d in all_data["ledger_entries"]]
@@ -89,6 +92,7 @@ def main():
     # --- Shutdown --- 
     print("\n--- Saving Data ---")
     storage_manager.save_data(ledger_manager, transaction_manager, journal_manager, net_worth_manager)
+    ai_analyser.close()
     print("Goodbye!")
 
 if __name__ == "__main__":
@@ -1,26 +1,109 @@
 from datetime import timezone, datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from dataclasses import replace
+from email.utils import parsedate_to_datetime
 import json
+import logging
+import random
+import time
 import requests
+from requests.adapters import HTTPAdapter
 
 from Backend.core.ledger_manager import LedgerEntry
 from Backend.core.transaction_manager import Transaction
-from Backend.core.summary_calculator import calculate_balance_for_entry
+from Backend.core.ai_context import AI_CONTEXT_TOKEN_BUDGET, build_financial_context, estimate_tokens
+from Backend.core.ai_telemetry import AiCallRecord, AiTelemetry
+from Backend.core.command_parser import parse_command_locally
+from Backend.core.health_report import build_health_report
+from Backend.core.response_cache import ResponseCache
+
+# Any service that speaks the OpenAI-style chat completions API can stand in, such as
+# Backend/utils/mock_openrouter.py for testing and benchmarks
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+AI_CONNECT_TIMEOUT = 5
+AI_READ_TIMEOUT = 60
+AI_POOL_SIZE = 4
+AI_MAX_RETRIES = 3
+AI_BACKOFF_BASE = 0.5
+AI_BACKOFF_MAX = 8.0
+# A longer Retry-After than this is treated as a failure rather than waited out
+AI_MAX_RETRY_AFTER = 30.0
+AI_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# How the error messages returned in place of an answer begin
+AI_ERROR_PREFIXES = ("Error", "AI feature disabled")
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_after_seconds(response) -> float | None:
+    """Parses a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_ai_error(text: str) -> bool:
+    """Whether a response from _call_ai or _stream_ai is one of their error messages rather than an answer."""
+    return text.lstrip().startswith(AI_ERROR_PREFIXES)
+
 
 class FinancialAnalyser:
-    def __init__(self, api_key: str | None):
-        """Initialises the analyser with the provided API key."""
+    def __init__(self, api_key: str | None, cache: ResponseCache | None = None, hedge_after_seconds: float | None = None,
+                 context_token_budget: int = AI_CONTEXT_TOKEN_BUDGET, base_url: str | None = None,
+                 telemetry: AiTelemetry | None = None, hedge_model: str | None = None):
+        """
+        Initialises the analyser with the provided API key and an optional response cache.
+        If hedge_after_seconds and hedge_model are both set, a blocking call that hasn't answered
+        by then is raced against the same prompt sent to hedge_model. context_token_budget caps the
+        size of the financial data sent with each prompt. base_url points the analyser at a
+        different chat completions service than OpenRouter's. If telemetry is given, every call's
+        size, timings and outcome are recorded in it.
+        """
         self.api_key = api_key
+        self.chat_url = f"{(base_url or OPENROUTER_BASE_URL).rstrip('/')}/chat/completions"
+        self.cache = cache
+        self.hedge_after_seconds = hedge_after_seconds
+        self.hedge_model = hedge_model
+        self.context_token_budget = context_token_budget
+        self.telemetry = telemetry
         self.models = {
             "parser": "mistralai/mistral-7b-instruct:free", 
             "analyst": "mistralai/mistral-7b-instruct:free", 
         }
-        pass
+        # One keep-alive connection pool shared by every call, including those from worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=AI_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._hedge_pool = ThreadPoolExecutor(max_workers=2 * AI_POOL_SIZE, thread_name_prefix="ai-hedge")
 
-    def _call_ai(self, system_prompt: str, user_prompt: str, model_key: str = "analyst", is_json_mode: bool = False) -> str:
-        """Private helper to call the external AI API with a separated prompt and specified model."""
-        if not self.api_key:
-            return "AI feature disabled. An API key from OpenRouter.ai is required."
+    def close(self):
+        """
+        Releases the hedging threads and pooled connections, when the app exits. Doesn't wait for
+        requests in flight; queued hedges are cancelled.
+        """
+        self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
 
+    def _build_request(self, system_prompt: str, user_prompt: str, model_key: str, is_json_mode: bool = False) -> tuple[dict, dict]:
+        """Returns the headers and JSON body for a chat completions request."""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        return self._build_chat_request(messages, model_key, is_json_mode)
+
+    def _build_chat_request(self, messages: list[dict], model_key: str, is_json_mode: bool = False) -> tuple[dict, dict]:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -30,56 +113,255 @@ class FinancialAnalyser:
         
         data = {
             "model": self.models.get(model_key, self.models["analyst"]),
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            "messages": messages,
         }
         
         if is_json_mode:
             data["response_format"] = {"type": "json_object"}
+        return headers, data
 
+    @contextmanager
+    def _recorded_call(self, data: dict, streamed: bool):
+        """Yields an AiCallRecord for the caller to fill in, and adds it to the telemetry when the call ends."""
+        measured = self.telemetry is not None
+        record = AiCallRecord(
+            started=time.time(),
+            model=data["model"],
+            streamed=streamed,
+            prompt_bytes=len(json.dumps(data["messages"]).encode("utf-8")) if measured else 0,
+            prompt_tokens=sum(estimate_tokens(m["content"]) for m in data["messages"]) if measured else 0,
+        )
         try:
-            response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=90)
-            response.raise_for_status()
-            response_json = response.json()
-            content = response_json['choices'][0]['message']['content']
-            return content.strip()
-        except requests.exceptions.RequestException as e:
-            return f"Error connecting to AI service: {e}"
-        except (KeyError, IndexError):
-            return "Error: Received an unexpected response format from the AI service."
+            yield record
+        except GeneratorExit:
+            # A stream closed before it finished
+            record.outcome = "cancelled"
+            raise
+        finally:
+            record.wall_ms = 1000 * (time.perf_counter() - record.clock)
+            if record.error:
+                record.outcome = "error"
+            if self.telemetry is not None:
+                self.telemetry.record(record)
 
-    def _create_financial_context_string(self, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> str:
-        """Creates a detailed, readable string of the user's financial data for the AI."""
-        
-        context_parts = []
-        
-        debt_entries = [e for e in all_entries if e.entry_type == 'debt']
-        loan_entries = [e for e in all_entries if e.entry_type == 'loan']
+    def _post(self, headers: dict, data: dict, stream: bool = False, record: AiCallRecord | None = None) -> requests.Response:
+        """
+        POSTs a chat completions request, retrying connection errors, timeouts and 429/5xx
+        responses with exponential backoff, or after the server's Retry-After when it gives one.
+        Returns the last response, which may still be an error; raises if every attempt failed to connect.
+        """
+        for attempt in range(AI_MAX_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.chat_url, headers=headers, json=data, stream=stream,
+                                             timeout=(AI_CONNECT_TIMEOUT, AI_READ_TIMEOUT))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                logger.info("AI request to %s, attempt %d: %s after %.0f ms", data["model"], attempt + 1,
+                            type(e).__name__, 1000 * (time.perf_counter() - started))
+                if attempt == AI_MAX_RETRIES:
+                    if record is not None:
+                        record.retries = attempt
+                    raise
+                delay = None
+            else:
+                logger.info("AI request to %s, attempt %d: HTTP %d after %.0f ms", data["model"], attempt + 1,
+                            response.status_code, 1000 * (time.perf_counter() - started))
+                if record is not None:
+                    record.retries = attempt
+                    # elapsed runs from sending the request until its headers were read
+                    record.first_byte_ms = 1000 * (started - record.clock + response.elapsed.total_seconds())
+                if response.status_code not in AI_RETRY_STATUSES or attempt == AI_MAX_RETRIES:
+                    return response
+                delay = _retry_after_seconds(response)
+                if delay is not None and delay > AI_MAX_RETRY_AFTER:
+                    return response
+                response.close()
+            if delay is None:
+                # Full jitter, so clients that failed together don't retry together
+                delay = random.uniform(0, min(AI_BACKOFF_MAX, AI_BACKOFF_BASE * 2 ** attempt))
+            time.sleep(delay)
 
-        total_debt_balance = sum(calculate_balance_for_entry(d, all_transactions) for d in debt_entries)
-        total_loan_balance = sum(calculate_balance_for_entry(l, all_transactions) for l in loan_entries)
-        
-        context_parts.append(f"### Overall Financial Snapshot (AUD)\n- Total Debt Owed: ${total_debt_balance:,.2f}\n- Total Owed to You (Loans): ${total_loan_balance:,.2f}\n")
-
-        if all_entries:
-            context_parts.append("### Detailed Ledger Entries")
-            for entry in sorted(all_entries, key=lambda e: (e.entry_type, e.label)):
-                balance = calculate_balance_for_entry(entry, all_transactions)
-                if balance > 0.01:
-                    context_parts.append(f"- **{entry.label}** ({entry.entry_type.capitalize()}, Status: {entry.status.capitalize()})\n  - Original Amount: ${entry.amount:,.2f}\n  - Current Balance: ${balance:,.2f}")
-        
-        if all_transactions:
-            context_parts.append("\n### Recent Transactions (last 10)")
-            for t in sorted(all_transactions, key=lambda t: t.date_paid, reverse=True)[:10]:
-                 context_parts.append(f"- {t.date_paid.strftime('%Y-%m-%d')}: {t.label} (${t.amount:,.2f})")
-                 
-        return "\n".join(context_parts)
+    def _hedge_model(self, model: str) -> str | None:
+        """
+        The model to race a slow request to `model` against, or None to not hedge it. A second
+        request to the same model would queue behind the first, so hedging needs another model.
+        """
+        if self.hedge_after_seconds is None or self.hedge_model in (None, model):
+            return None
+        return self.hedge_model
+
+    def _complete(self, headers: dict, data: dict, record: AiCallRecord | None = None) -> str:
+        """Sends a blocking request and returns the completion's text, raising on HTTP or format errors."""
+        response = self._post(headers, data, record=record)
+        response.raise_for_status()
+        body = response.json()
+        if record is not None:
+            record.response_tokens = (body.get('usage') or {}).get('completion_tokens')
+        return body['choices'][0]['message']['content'].strip()
+
+    def _complete_hedged(self, headers: dict, data: dict, hedge_model: str, record: AiCallRecord | None = None) -> str:
+        """
+        Like _complete, but if no answer has arrived within hedge_after_seconds the prompt is also
+        sent to `hedge_model`, and whichever succeeds first wins. The slower request is left to
+        finish in the background and its answer is discarded.
+
+        Each attempt fills in its own AiCallRecord; only the one whose answer is used is copied
+        into `record`, so the slower attempt cannot overwrite it after it has been saved.
+        """
+        attempts = {}
+
+        def submit(attempt_data: dict):
+            attempt_record = replace(record, model=attempt_data["model"]) if record is not None else None
+            future = self._hedge_pool.submit(self._complete, headers, attempt_data, attempt_record)
+            attempts[future] = attempt_record
+            return future
+
+        def settle(future) -> str:
+            winner = attempts[future]
+            if winner is not None:
+                record.model = winner.model
+                record.retries = winner.retries
+                record.first_byte_ms = winner.first_byte_ms
+                record.response_tokens = winner.response_tokens
+            return future.result()
+
+        primary = submit(data)
+        done, _ = wait([primary], timeout=self.hedge_after_seconds)
+        if done:
+            return settle(primary)
+
+        hedge_data = dict(data, model=hedge_model)
+        logger.info("AI request to %s is slower than %.1f s; hedging with %s", data["model"],
+                    self.hedge_after_seconds, hedge_data["model"])
+        pending = {primary, submit(hedge_data)}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not pending:
+                    return settle(future)
+
+    def _cache_key(self, data: dict) -> str | None:
+        if self.cache is None or not self.cache.enabled:
+            return None
+        system_prompt = data["messages"][0]["content"]
+        rest = data["messages"][1:]
+        # A single prompt is keyed as before; a conversation by all of its turns
+        user_prompt = rest[0]["content"] if len(rest) == 1 else json.dumps(rest)
+        # JSON mode changes the reply, so it is part of the model's identity here
+        model = data["model"] + (":json" if "response_format" in data else "")
+        return self.cache.make_key(self.chat_url, model, system_prompt, user_prompt)
+
+    def _call_ai(self, system_prompt: str, user_prompt: str, model_key: str = "analyst", is_json_mode: bool = False) -> str:
+        """Private helper to call the external AI API with a separated prompt and specified model."""
+        if not self.api_key:
+            return "AI feature disabled. An API key from OpenRouter.ai is required."
+
+        headers, data = self._build_request(system_prompt, user_prompt, model_key, is_json_mode)
+        with self._recorded_call(data, streamed=False) as record:
+            cache_key = self._cache_key(data)
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    record.cache_hit = True
+                    return cached
+            try:
+                hedge_model = self._hedge_model(data["model"])
+                if hedge_model is not None:
+                    content = self._complete_hedged(headers, data, hedge_model, record)
+                else:
+                    content = self._complete(headers, data, record)
+                if cache_key:
+                    self.cache.put(cache_key, content)
+                return content
+            except requests.exceptions.RequestException as e:
+                record.error = f"{type(e).__name__}: {e}"
+                return f"Error connecting to AI service: {e}"
+            except (KeyError, IndexError):
+                record.error = "Unexpected response format"
+                return "Error: Received an unexpected response format from the AI service."
+
+    def _stream_ai(self, system_prompt: str, user_prompt: str, model_key: str = "analyst"):
+        """
+        Streaming variant of _call_ai. Yields the completion's text as the server sends it, as
+        server-sent events. Errors are yielded as text, like _call_ai returns them. Closing the
+        generator closes the connection. A cached response is yielded in one piece, and a stream
+        is only cached once it has completed without errors.
+        """
+        return self._stream_chat(self._build_request(system_prompt, user_prompt, model_key))
+
+    def _stream_chat(self, request: tuple[dict, dict]):
+        if not self.api_key:
+            yield "AI feature disabled. An API key from OpenRouter.ai is required."
+            return
+
+        headers, data = request
+        with self._recorded_call(data, streamed=True) as record:
+            cache_key = self._cache_key(data)
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    record.cache_hit = True
+                    yield cached
+                    return
+            data["stream"] = True
+            parts = []
+            try:
+                with self._post(headers, data, stream=True, record=record) as response:
+                    response.raise_for_status()
+                    # chunk_size=None hands over data as it arrives rather than waiting to fill a buffer.
+                    # Lines are decoded here since event streams rarely declare a charset.
+                    for line in response.iter_lines(chunk_size=None):
+                        # Blank lines separate events; lines starting with ':' are keep-alive comments
+                        if not line.startswith(b"data:"):
+                            continue
+                        payload = line[len(b"data:"):].strip().decode("utf-8")
+                        if payload == "[DONE]":
+                            if cache_key and parts:
+                                self.cache.put(cache_key, "".join(parts).strip())
+                            return
+                        event = json.loads(payload)
+                        if "error" in event:
+                            message = event['error'].get('message', event['error'])
+                            record.error = f"Stream error: {message}"
+                            yield f"\nError from AI service: {message}"
+                            return
+                        if event.get('usage'):
+                            # Some services end the stream with an event carrying only the usage
+                            record.response_tokens = event['usage'].get('completion_tokens')
+                            if not event.get('choices'):
+                                continue
+                        text = event['choices'][0].get('delta', {}).get('content')
+                        if text:
+                            parts.append(text)
+                            yield text
+            except requests.exceptions.RequestException as e:
+                record.error = f"{type(e).__name__}: {e}"
+                yield f"Error connecting to AI service: {e}"
+            except (json.JSONDecodeError, KeyError, IndexError):
+                record.error = "Unexpected response format"
+                yield "\nError: Received an unexpected response format from the AI service."
+
+    def _create_financial_context_string(self, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> str:
+        """Creates a readable summary of the user's financial data for the AI, within the context token budget."""
+        return build_financial_context(all_entries, all_transactions, self.context_token_budget)
 
     def generate_insights(self, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> str:
-        """Generates a financial health check report using a much better context."""
-        
+        """
+        Generates a financial health check report using a much better context. Without an API key,
+        or if the AI can't be reached, the report is written locally instead.
+        """
+        if not self.api_key:
+            return build_health_report(all_entries, all_transactions)
+        report = self._call_ai(*self._insights_prompts(all_entries, all_transactions))
+        if is_ai_error(report):
+            return f"{build_health_report(all_entries, all_transactions)}\n\n_{report.strip()}_"
+        return report
+
+    def stream_insights(self, all_entries: list[LedgerEntry], all_transactions: list[Transaction]):
+        """Like generate_insights, but yields the report as it is written."""
+        return self._stream_ai(*self._insights_prompts(all_entries, all_transactions))
+
+    def _insights_prompts(self, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> tuple[str, str]:
         if not all_entries and not all_transactions:
             system_prompt = """
             You are a friendly and knowledgeable financial guide from Australia. A new user is starting their financial journey from scratch. Your goal is to provide three simple, powerful, and universally applicable tips to set them up for success.
@@ -91,7 +373,7 @@ class FinancialAnalyser:
             4.  **The Tips:** The three tips must cover: (1) A simple budgeting rule, (2) The importance of an emergency fund, and (3) The power of consistent tracking.
             """
             user_prompt = "I'm new here and want to get better with my finances. What are the first things I should know?"
-            return self._call_ai(system_prompt, user_prompt)
+            return system_prompt, user_prompt
 
         system_prompt = """
         You are a professional, encouraging, and detail-oriented financial analyst based in Australia. All amounts are in AUD. Your primary directive is to analyze the user's financial data and provide a concise, structured 'Financial Health Check'.
@@ -108,13 +390,19 @@ class FinancialAnalyser:
         """
         context_string = self._create_financial_context_string(all_entries, all_transactions)
         user_prompt = f"Here is my financial data. Please provide your analysis.\n\n{context_string}"
-            
-        return self._call_ai(system_prompt, user_prompt)
+        return system_prompt, user_prompt
 
     def answer_user_question(self, question: str, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> str:
         """Answers a specific user question with their financial data as context. Now much smarter."""
-        
-        system_prompt = """
+        return self._call_ai(*self._question_prompts(question, all_entries, all_transactions))
+
+    def stream_answer(self, question: str, all_entries: list[LedgerEntry], all_transactions: list[Transaction]):
+        """Like answer_user_question, but yields the answer as it is written."""
+        return self._stream_ai(*self._question_prompts(question, all_entries, all_transactions))
+
+    @staticmethod
+    def _question_system_prompt() -> str:
+        return """
         You are an expert financial Q&A assistant from Australia. All amounts are in AUD. Your primary goal is to be helpful and accurate.
 
         **Core Directives:**
@@ -124,14 +412,59 @@ class FinancialAnalyser:
         4.  **Stay On Topic:** If the question is clearly off-topic (e.g., medical advice, politics), respond with: "I can only answer questions related to personal finance."
         5.  **NEVER Recommend Specific Products:** Your advice must be generic. Do not mention any brand names.
         """
-        
+
+    def _question_prompts(self, question: str, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> tuple[str, str]:
+        system_prompt = self._question_system_prompt()
         context_string = self._create_financial_context_string(all_entries, all_transactions)
         user_prompt = f"**Current Financial Context:**\n{context_string}\n\n**My question is:** \"{question}\""
-        
+        return system_prompt, user_prompt
+
+    def stream_chat_reply(self, question: str, summary: str, turns: list[tuple[str, str]],
+                          all_entries: list[LedgerEntry], all_transactions: list[Transaction]):
+        """
+        Like stream_answer, but as the next turn of a conversation. The financial context is sent
+        once, at the start, followed by the summary of older turns, the recent (question, answer)
+        turns, and then the new question.
+        """
+        messages = self._chat_messages(question, summary, turns, all_entries, all_transactions)
+        return self._stream_chat(self._build_chat_request(messages, "analyst"))
+
+    def _chat_messages(self, question: str, summary: str, turns: list[tuple[str, str]],
+                       all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> list[dict]:
+        context_string = self._create_financial_context_string(all_entries, all_transactions)
+        # The prompt and context lead every request unchanged while the data is, so providers that
+        # cache prompt prefixes only process them once per conversation
+        messages = [{"role": "system", "content": f"{self._question_system_prompt()}\n**Current Financial Context:**\n{context_string}"}]
+        if summary:
+            messages.append({"role": "system", "content": f"**Summary of the conversation so far:**\n{summary}"})
+        for asked, answered in turns:
+            messages.append({"role": "user", "content": asked})
+            messages.append({"role": "assistant", "content": answered})
+        messages.append({"role": "user", "content": question})
+        return messages
+
+    def summarise_conversation(self, summary: str, turns: list[tuple[str, str]]) -> str:
+        """Folds older chat turns into the conversation's running summary, or returns an error message."""
+        system_prompt = """
+        You keep a running summary of a conversation between a user and their financial Q&A assistant.
+
+        **Core Directives:**
+        1.  **Merge:** Combine the existing summary with the new turns into one summary.
+        2.  **Keep What Matters:** Keep the questions asked, the figures and entries discussed, and any conclusions or plans the user agreed to.
+        3.  **Conciseness:** Keep the summary under 120 words, as plain sentences without headers.
+        """
+        transcript = "\n\n".join(f"User: {asked}\nAssistant: {answered}" for asked, answered in turns)
+        user_prompt = f"**Summary so far:**\n{summary or '(none)'}\n\n**New turns:**\n{transcript}"
         return self._call_ai(system_prompt, user_prompt)
 
     def parse_command_to_json(self, command_str: str) -> dict:
-        """Converts a user's natural language command into a structured JSON object."""
+        """
+        Converts a user's natural language command into a structured JSON object. Common phrasings
+        are parsed locally; only commands the local parser isn't sure of are sent to the AI.
+        """
+        local = parse_command_locally(command_str)
+        if local is not None:
+            return local
         system_prompt = f"""
         You are a data extraction robot. Your ONLY job is to extract a list of financial action commands from the user's text. You MUST respond with a single JSON object containing a key "commands", which holds a list of action objects.
     
@@ -0,0 +1,154 @@
+import heapq
+import re
+from dataclasses import dataclass
+
+from Backend.core.ledger_manager import LedgerEntry
+from Backend.core.transaction_manager import Transaction
+from Backend.core.summary_calculator import calculate_paid_by_entry
+from Backend.core.data_version import memoize_on_data_version
+
+AI_CONTEXT_TOKEN_BUDGET = 1500
+RECENT_TRANSACTION_COUNT = 10
+MIN_CONTEXT_BALANCE = 0.01
+# When not every entry fits, this share of the remaining budget is kept for the by-tag summary
+TAIL_SUMMARY_SHARE = 0.25
+
+# Words, numbers and single punctuation marks: close to how BPE tokenisers split financial text,
+# and slightly pessimistic, which is the safe side for a budget
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """A fast local estimate of how many tokens a model will count for `text`."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+@dataclass
+class ContextLine:
+    text: str
+    tokens: int
+    entry_type: str = ""
+    group: str = ""
+    balance: float = 0.0
+
+
+def _line(text: str, **kwargs) -> ContextLine:
+    return ContextLine(text, estimate_tokens(text) + 1, **kwargs)
+
+
+@dataclass
+class ContextSections:
+    snapshot: ContextLine
+    entries: list[ContextLine]
+    recent_transactions: list[ContextLine]
+
+
+@memoize_on_data_version(maxsize=8)
+def build_context_sections(all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> ContextSections:
+    """
+    Formats every part of the AI context once per data version: the overall snapshot, one line
+    per entry with an outstanding balance ranked largest first, and the most recent transactions.
+    """
+    paid_by_entry = calculate_paid_by_entry(all_transactions)
+    total_debt_balance = 0.0
+    total_loan_balance = 0.0
+    ranked = []
+    for entry in all_entries:
+        balance = entry.amount - paid_by_entry.get(entry.id, 0.0)
+        if entry.entry_type == 'debt':
+            total_debt_balance += balance
+        elif entry.entry_type == 'loan':
+            total_loan_balance += balance
+        if balance > MIN_CONTEXT_BALANCE:
+            ranked.append((balance, entry))
+    ranked.sort(key=lambda item: item[0], reverse=True)
+
+    snapshot = _line(f"### Overall Financial Snapshot (AUD)\n- Total Debt Owed: ${total_debt_balance:,.2f}\n"
+                     f"- Total Owed to You (Loans): ${total_loan_balance:,.2f}\n")
+    entries = [
+        _line(f"- **{entry.label}** ({entry.entry_type.capitalize()}, Status: {entry.status.capitalize()})\n"
+              f"  - Original Amount: ${entry.amount:,.2f}\n  - Current Balance: ${balance:,.2f}",
+              entry_type=entry.entry_type, group=entry.tags[0] if entry.tags else "", balance=balance)
+        for balance, entry in ranked
+    ]
+    recent = heapq.nlargest(RECENT_TRANSACTION_COUNT, all_transactions, key=lambda t: t.date_paid)
+    recent_transactions = [_line(f"- {t.date_paid.strftime('%Y-%m-%d')}: {t.label} (${t.amount:,.2f})") for t in recent]
+    return ContextSections(snapshot, entries, recent_transactions)
+
+
+def _summarise_by_tag(lines: list[ContextLine], token_budget: int) -> list[ContextLine]:
+    """
+    Collapses entries that didn't fit into one line per (type, first tag), largest total first.
+    Groups that don't fit in `token_budget` either are rolled into a single closing line.
+    """
+    groups = {}
+    for line in lines:
+        count, total = groups.get((line.entry_type, line.group), (0, 0.0))
+        groups[(line.entry_type, line.group)] = (count + 1, total + line.balance)
+    ranked = sorted(groups.items(), key=lambda item: item[1][1], reverse=True)
+
+    summary = []
+    used = 0
+    for i, ((entry_type, group), (count, total)) in enumerate(ranked):
+        described = f"tagged '{group}'" if group else "with no tags"
+        line = _line(f"- {count} more {entry_type}(s) {described}: ${total:,.2f} outstanding")
+        rest = ranked[i + 1:]
+        reserve = _rollup(rest).tokens if rest else 0
+        if used + line.tokens + reserve > token_budget:
+            summary.append(_rollup(ranked[i:]))
+            break
+        summary.append(line)
+        used += line.tokens
+    return summary
+
+
+def _rollup(groups) -> ContextLine:
+    count = sum(count for _, (count, _) in groups)
+    total = sum(total for _, (_, total) in groups)
+    return _line(f"- {count} further entries: ${total:,.2f} outstanding")
+
+
+def _rollup_reserve(lines: list[ContextLine]) -> int:
+    return _rollup([(None, (len(lines), sum(line.balance for line in lines)))]).tokens
+
+
+def build_financial_context(all_entries: list[LedgerEntry], all_transactions: list[Transaction],
+                            token_budget: int = AI_CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    The user's financial data as Markdown for an AI prompt, kept within roughly `token_budget`
+    tokens. The snapshot and recent transactions always go in; entries follow largest balance
+    first until the budget runs out, and the rest are summarised by tag.
+    """
+    sections = build_context_sections(all_entries, all_transactions)
+    header = _line("### Detailed Ledger Entries")
+    recent_header = _line("\n### Recent Transactions (last 10)")
+
+    parts = [sections.snapshot]
+    used = sections.snapshot.tokens
+    if sections.recent_transactions:
+        used += recent_header.tokens + sum(line.tokens for line in sections.recent_transactions)
+
+    if all_entries:
+        parts.append(header)
+        used += header.tokens
+        entry_budget = token_budget
+        if used + sum(line.tokens for line in sections.entries) > token_budget:
+            entry_budget -= int((token_budget - used) * TAIL_SUMMARY_SHARE)
+        included = 0
+        for line in sections.entries:
+            if used + line.tokens > entry_budget:
+                break
+            parts.append(line)
+            used += line.tokens
+            included += 1
+        if included < len(sections.entries):
+            # Make room for at least a one-line summary by giving back the smallest included entries
+            while included and used + _rollup_reserve(sections.entries[included:]) > token_budget:
+                used -= parts.pop().tokens
+                included -= 1
+            parts.extend(_summarise_by_tag(sections.entries[included:], token_budget - used))
+
+    if sections.recent_transactions:
+        parts.append(recent_header)
+        parts.extend(sections.recent_transactions)
+    return "\n".join(line.text for line in parts)
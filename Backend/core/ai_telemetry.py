@@ -0,0 +1,160 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, asdict, fields
+from datetime import datetime
+
+from Backend.core.config_manager import get_config_path
+
+AI_TELEMETRY_FILE_NAME = "ai_usage.jsonl"
+AI_TELEMETRY_MAX_RECORDS = 2000
+AI_USAGE_DAYS_SHOWN = 14
+
+
+@dataclass
+class AiCallRecord:
+    """What one AI request cost: its size, its timings and how it ended."""
+    started: float
+    model: str
+    streamed: bool
+    prompt_bytes: int
+    # Estimated locally, since streamed responses don't report usage
+    prompt_tokens: int
+    # As reported by the service, when it does
+    response_tokens: int | None = None
+    wall_ms: float = 0.0
+    # From the start of the call, so it includes any retries
+    first_byte_ms: float | None = None
+    retries: int = 0
+    cache_hit: bool = False
+    # "ok", "error" or "cancelled"
+    outcome: str = "ok"
+    error: str | None = None
+    # perf_counter() when the call started; only meaningful in this process, so not saved
+    clock: float = field(default_factory=time.perf_counter, repr=False)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        del data["clock"]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        known = {f.name for f in fields(cls)} - {"clock"}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+class AiTelemetry:
+    """
+    A ring buffer of the most recent AI calls, kept in memory and in a JSON Lines file under the
+    config directory. Each record is appended to the file as it is made, and the file is trimmed
+    back to `max_records` when it has grown to twice that.
+    """
+    def __init__(self, path: str | None = None, max_records: int = AI_TELEMETRY_MAX_RECORDS):
+        self.path = path or os.path.join(get_config_path(), AI_TELEMETRY_FILE_NAME)
+        self.max_records = max_records
+        self._records = deque(maxlen=max_records)
+        self._lines_in_file = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        self._lines_in_file = len(lines)
+        for line in lines[-self.max_records:]:
+            try:
+                self._records.append(AiCallRecord.from_dict(json.loads(line)))
+            except (ValueError, TypeError):
+                # A line cut short by a crash, or from an older version
+                continue
+        if self._lines_in_file >= 2 * self.max_records:
+            self._rewrite()
+
+    def _rewrite(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(record.to_dict()) + "\n" for record in self._records)
+            os.replace(temp_path, self.path)
+            self._lines_in_file = len(self._records)
+        except OSError as e:
+            print(f"Error writing AI usage log: {e}")
+
+    def record(self, record: AiCallRecord):
+        with self._lock:
+            self._records.append(record)
+            if self._lines_in_file + 1 >= 2 * self.max_records:
+                self._rewrite()
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record.to_dict()) + "\n")
+                self._lines_in_file += 1
+            except OSError as e:
+                print(f"Error writing AI usage log: {e}")
+
+    def records(self) -> list[AiCallRecord]:
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._rewrite()
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    """The nearest-rank percentile of `values`, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarise_usage(records: list[AiCallRecord], days: int = AI_USAGE_DAYS_SHOWN) -> dict:
+    """
+    Overall counts and p50/p95 latencies, plus totals for each of the last `days` days that had
+    any calls, newest first. Latencies only count requests that reached the service and succeeded,
+    so cache hits and failures don't skew them.
+    """
+    answered = [r for r in records if not r.cache_hit and r.outcome == "ok"]
+    wall = [r.wall_ms for r in answered]
+    first_byte = [r.first_byte_ms for r in answered if r.first_byte_ms is not None]
+    by_day = {}
+    for r in records:
+        by_day.setdefault(datetime.fromtimestamp(r.started).date(), []).append(r)
+    daily = []
+    for day in sorted(by_day, reverse=True)[:days]:
+        calls = by_day[day]
+        daily.append({
+            "day": day,
+            "calls": len(calls),
+            "errors": sum(r.outcome == "error" for r in calls),
+            "cache_hits": sum(r.cache_hit for r in calls),
+            "prompt_tokens": sum(r.prompt_tokens for r in calls if not r.cache_hit),
+            "response_tokens": sum(r.response_tokens or 0 for r in calls),
+            "p50_ms": percentile([r.wall_ms for r in calls if not r.cache_hit and r.outcome == "ok"], 0.5),
+        })
+    return {
+        "calls": len(records),
+        "since": datetime.fromtimestamp(records[0].started) if records else None,
+        "errors": sum(r.outcome == "error" for r in records),
+        "cancelled": sum(r.outcome == "cancelled" for r in records),
+        "cache_hits": sum(r.cache_hit for r in records),
+        "retries": sum(r.retries for r in records),
+        "p50_ms": percentile(wall, 0.5),
+        "p95_ms": percentile(wall, 0.95),
+        "first_byte_p50_ms": percentile(first_byte, 0.5),
+        "first_byte_p95_ms": percentile(first_byte, 0.95),
+        "recent_errors": [r for r in records if r.error][-3:],
+        "daily": daily,
+    }
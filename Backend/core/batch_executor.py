@@ -0,0 +1,131 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from Backend.core.ledger_manager import LedgerManager, LedgerEntry
+from Backend.core.transaction_manager import TransactionManager, Transaction
+from Backend.core.summary_calculator import calculate_paid_by_entry
+from Backend.core.data_version import bump_data_version
+
+
+@dataclass
+class BatchResult:
+    entries: list[LedgerEntry] = field(default_factory=list)
+    transactions: list[Transaction] = field(default_factory=list)
+    # Entries the batch settled, for callers that congratulate the user
+    newly_paid: list[LedgerEntry] = field(default_factory=list)
+
+
+def _build_entry(payload: dict) -> LedgerEntry:
+    entry_type = payload.get('entry_type')
+    if entry_type not in ('debt', 'loan'):
+        raise ValueError(f"an entry must be a 'debt' or 'loan', not '{entry_type}'")
+    if not payload.get('label'):
+        raise ValueError("the new entry has no label")
+    return LedgerEntry(
+        label=payload['label'],
+        amount=float(payload.get('amount', 0)),
+        entry_type=entry_type,
+        comments=payload.get('comments'),
+        tags=list(payload.get('tags') or []),
+    )
+
+
+def _build_transaction(payload: dict, new_entries: dict[str, LedgerEntry],
+                       resolve_target: Callable[[str], Optional[LedgerEntry]]) -> Transaction:
+    target_label = payload.get('target_entry_label', '')
+    if not target_label:
+        raise ValueError("'add_transaction' is missing 'target_entry_label'")
+    # Entries created earlier in the same plan aren't in the ledger yet
+    target = new_entries.get(target_label.strip().lower()) or resolve_target(target_label)
+    if target is None:
+        raise ValueError(f"could not find an entry matching '{target_label}'")
+    return Transaction(
+        entry_id=target.id,
+        transaction_type=payload.get('transaction_type', 'payment'),
+        amount=float(payload.get('amount', 0)),
+        label=payload.get('label', 'AI Transaction'),
+        comments=payload.get('comments'),
+        tags=list(payload.get('tags') or []),
+    )
+
+
+def _update_statuses(entries: list[LedgerEntry], all_transactions: list[Transaction]) -> list[LedgerEntry]:
+    """Marks entries paid or active by balance, like update_entry_status, with one pass over the transactions."""
+    paid_by_entry = calculate_paid_by_entry(all_transactions)
+    newly_paid = []
+    for entry in entries:
+        balance = entry.amount - paid_by_entry.get(entry.id, 0.0)
+        if balance <= 0 and entry.status == 'active':
+            entry.status = 'paid'
+            newly_paid.append(entry)
+        elif balance > 0 and entry.status == 'paid':
+            entry.status = 'active'
+    bump_data_version()
+    return newly_paid
+
+
+def apply_plan(commands: list[dict], ledger_manager: LedgerManager, transaction_manager: TransactionManager,
+               resolve_target: Callable[[str], Optional[LedgerEntry]]) -> BatchResult:
+    """
+    Applies a plan's add_entry and add_transaction commands as one unit. Every step is validated
+    and built before anything is changed, then the entries and transactions are added in one go
+    each and the statuses of the touched entries recomputed once. Other actions are skipped.
+    `resolve_target` maps a target label to an existing entry, or None if there isn't one.
+    Raises ValueError naming the failing step; the managers are left exactly as they were.
+    """
+    result = BatchResult()
+    new_entries = {}
+    resolved = {}
+
+    def resolve_once(target_label):
+        # A long plan often names the same entry many times; resolve (and ask about) it only once
+        key = target_label.strip().lower()
+        if key not in resolved:
+            resolved[key] = resolve_target(target_label)
+        return resolved[key]
+
+    for i, command in enumerate(commands):
+        action = command.get('action')
+        payload = command.get('payload', {})
+        try:
+            if action == 'add_entry':
+                entry = _build_entry(payload)
+                result.entries.append(entry)
+                new_entries.setdefault(entry.label.strip().lower(), entry)
+            elif action == 'add_transaction':
+                result.transactions.append(_build_transaction(payload, new_entries, resolve_once))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Step {i+1} ({action}): {e}") from e
+
+    _commit(result, ledger_manager, transaction_manager)
+    return result
+
+
+def apply_transactions(transactions: list[Transaction], ledger_manager: LedgerManager,
+                       transaction_manager: TransactionManager) -> BatchResult:
+    """
+    Adds already built transactions against existing entries in one go and recomputes the
+    statuses of the entries they touch, undoing everything if that fails.
+    """
+    result = BatchResult(transactions=list(transactions))
+    _commit(result, ledger_manager, transaction_manager)
+    return result
+
+
+def _commit(result: BatchResult, ledger_manager: LedgerManager, transaction_manager: TransactionManager):
+    # Only entries that received transactions can change status. Collected before the new
+    # entries are added, so each appears once.
+    touched_ids = {t.entry_id for t in result.transactions}
+    touched = [e for e in result.entries if e.id in touched_ids]
+    touched += [e for e in ledger_manager.get_all_entries() if e.id in touched_ids]
+    previous_statuses = {e.id: e.status for e in touched}
+    try:
+        ledger_manager.add_entries(result.entries)
+        transaction_manager.add_transactions(result.transactions)
+        result.newly_paid = _update_statuses(touched, transaction_manager.get_all_transactions())
+    except Exception:
+        ledger_manager.delete_entries_by_id({e.id for e in result.entries})
+        transaction_manager.delete_transactions_by_id({t.id for t in result.transactions})
+        for entry in touched:
+            entry.status = previous_statuses[entry.id]
+        raise
@@ -0,0 +1,128 @@
+import re
+import threading
+
+from Backend.core.ai_analyser import FinancialAnalyser, is_ai_error
+from Backend.core.ai_context import estimate_tokens
+from Backend.core.ledger_manager import LedgerEntry
+from Backend.core.transaction_manager import Transaction
+
+# Once the summary and past turns add up to more than this, the older turns are summarised
+CHAT_HISTORY_TOKEN_BUDGET = 1200
+# The latest turns are always sent word for word, so follow-up questions have their antecedents
+CHAT_KEEP_RECENT_TURNS = 2
+# The summary written locally, when the AI can't summarise, is cut to this share of the budget
+LOCAL_SUMMARY_SHARE = 0.5
+
+_FIRST_SENTENCE = re.compile(r"(.+?[.!?])(\s|$)", re.DOTALL)
+
+
+def _first_sentence(text: str) -> str:
+    text = " ".join(text.split())
+    match = _FIRST_SENTENCE.match(text)
+    return match.group(1) if match else text
+
+
+def _turn_tokens(turn: tuple[str, str]) -> int:
+    return estimate_tokens(turn[0]) + estimate_tokens(turn[1])
+
+
+class ChatSession:
+    """
+    The history of one AI chat. Each question is sent with the turns before it, so follow-ups keep
+    their meaning. Once the history outgrows its token budget, all but the latest turns are folded
+    into a rolling summary, which keeps the size of each request bounded however long the chat runs.
+    """
+    def __init__(self, analyser: FinancialAnalyser, history_token_budget: int = CHAT_HISTORY_TOKEN_BUDGET,
+                 keep_recent_turns: int = CHAT_KEEP_RECENT_TURNS):
+        self.analyser = analyser
+        self.history_token_budget = history_token_budget
+        self.keep_recent_turns = keep_recent_turns
+        # Guards the history, which replies and summaries update from worker threads
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Starts a new conversation."""
+        with self._lock:
+            self.summary = ""
+            self.turns: list[tuple[str, str]] = []
+            self._turn_tokens: list[int] = []
+            # Replies and summaries still in flight from before a reset belong to the old conversation
+            self._conversation = object()
+            self._compacting = None
+
+    def history_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(self._turn_tokens)
+
+    def stream_reply(self, question: str, all_entries: list[LedgerEntry], all_transactions: list[Transaction]):
+        """
+        Yields the answer to `question` as it is written, then records the turn. Meant to run on a
+        worker thread. A reply that is closed early or is an error isn't recorded. Call compact()
+        afterwards, off the GUI thread, to keep the history within its budget.
+        """
+        with self._lock:
+            summary, turns, conversation = self.summary, list(self.turns), self._conversation
+        parts = []
+        for text in self.analyser.stream_chat_reply(question, summary, turns, all_entries, all_transactions):
+            parts.append(text)
+            yield text
+        answer = "".join(parts).strip()
+        if answer and not is_ai_error(answer):
+            with self._lock:
+                if conversation is self._conversation:
+                    self.turns.append((question, answer))
+                    self._turn_tokens.append(_turn_tokens(self.turns[-1]))
+
+    def reply(self, question: str, all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> str:
+        """Blocking variant of stream_reply, which also compacts the history."""
+        answer = "".join(self.stream_reply(question, all_entries, all_transactions))
+        self.compact()
+        return answer
+
+    def needs_compaction(self) -> bool:
+        with self._lock:
+            return (self._compacting is None and len(self.turns) > self.keep_recent_turns
+                    and self.history_tokens() > self.history_token_budget)
+
+    def compact(self):
+        """
+        If the history is over budget, folds all but the latest turns into the summary. The summary
+        is written by the AI without holding the lock, so replies and resets aren't held up by it;
+        the result is dropped if the conversation was reset in the meantime.
+        """
+        with self._lock:
+            if (self._compacting is not None or len(self.turns) <= self.keep_recent_turns
+                    or self.history_tokens() <= self.history_token_budget):
+                return
+            conversation = self._compacting = self._conversation
+            split = len(self.turns) - self.keep_recent_turns
+            previous, older = self.summary, self.turns[:split]
+        try:
+            summary = self.analyser.summarise_conversation(previous, older)
+            if is_ai_error(summary):
+                summary = self._local_summary(previous, older)
+            with self._lock:
+                # Turns are only appended while a compaction runs, so the older ones are still first
+                if conversation is self._conversation:
+                    self.summary = summary.strip()
+                    self.turns = self.turns[split:]
+                    self._turn_tokens = self._turn_tokens[split:]
+        finally:
+            with self._lock:
+                if self._compacting is conversation:
+                    self._compacting = None
+
+    def _local_summary(self, previous: str, turns: list[tuple[str, str]]) -> str:
+        """The previous summary plus each question and the first sentence of its answer, newest kept first."""
+        limit = int(self.history_token_budget * LOCAL_SUMMARY_SHARE)
+        lines = [f"Asked \"{asked.strip()}\"; answered: {_first_sentence(answered)}" for asked, answered in turns]
+        if previous:
+            lines.insert(0, previous)
+        kept, used = [], 0
+        for line in reversed(lines):
+            tokens = estimate_tokens(line)
+            if used + tokens > limit:
+                break
+            kept.append(line)
+            used += tokens
+        return "\n".join(reversed(kept))
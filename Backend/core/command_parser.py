@@ -0,0 +1,104 @@
+import re
+
+# A money amount: "$1,250.50", "50 dollars", "1.5k"
+_AMOUNT = r"(?P<amount>\$?\s*\d[\d,]*(?:\.\d+)?\s*k?)(?:\s*(?:dollars?|bucks|aud))?"
+# Optional article or possessive in front of a label
+_ARTICLE = r"(?:(?:a|an|the|my)\s+)?"
+_LABEL = r"(?P<label>.+?)"
+_ADD = r"(?:add|create|new|record|log|make)"
+
+_POLITE_WORDS = re.compile(r"^(?:(?:please|can you|could you|can u|pls)\s+)+|(?:\s+(?:please|pls|thanks|thank you))+$", re.IGNORECASE)
+_STEP_SEPARATOR = re.compile(r"\s*(?:;|\n|,?\s+and\s+then\s+|,?\s+then\s+)\s*", re.IGNORECASE)
+_STRAY_AMOUNT = re.compile(r"\$\s*\d|\d\s*(?:dollars?|bucks)\b", re.IGNORECASE)
+_LEADING_ARTICLE = re.compile(r"^(?:the|my|a|an)\s+", re.IGNORECASE)
+
+
+def _rule(pattern: str, action: str, **fixed):
+    return re.compile(pattern, re.IGNORECASE), action, fixed
+
+
+# Tried in order; each must match a whole command step
+_RULES = [
+    # Summaries come before lists, since "show ..." starts both
+    _rule(r"(?:show|display|give|view|get)?\s*(?:me\s+)?(?:a\s+|the\s+|my\s+)?(?:financial\s+)?(?:summary|overview|totals?)", "show_summary"),
+    _rule(r"how\s+am\s+i\s+doing", "show_summary"),
+    _rule(r"(?:list|show|display|view|what\s+are)\s+(?:me\s+)?(?:all\s+)?(?:of\s+)?(?:my\s+|the\s+)?"
+          r"(?:(?P<entry_type>debts?|loans?)|entries|everything)", "list"),
+    _rule(r"list", "list"),
+
+    _rule(rf"{_ADD}\s+{_ARTICLE}(?:new\s+)?{_AMOUNT}\s+(?P<entry_type>debt|loan)\s+(?:for|to|called|named|from|with|on)\s+{_LABEL}", "add_entry"),
+    _rule(rf"{_ADD}\s+{_ARTICLE}(?:new\s+)?(?P<entry_type>debt|loan)\s+(?:of|for)\s+{_AMOUNT}\s+(?:for|to|called|named|from|with|on)\s+{_LABEL}", "add_entry"),
+    _rule(rf"{_ADD}\s+{_ARTICLE}(?:new\s+)?(?P<entry_type>debt|loan)\s+(?:for|called|named|to|from)\s+{_LABEL}\s+(?:of|for)\s+{_AMOUNT}", "add_entry"),
+    _rule(rf"(?:i\s+)?(?:lent|loaned)\s+{_AMOUNT}\s+to\s+{_LABEL}", "add_entry", entry_type="loan"),
+    _rule(rf"(?:i\s+)?(?:lent|loaned)\s+{_LABEL}\s+{_AMOUNT}", "add_entry", entry_type="loan"),
+    _rule(rf"(?:i\s+)?borrowed\s+{_AMOUNT}\s+from\s+{_LABEL}", "add_entry", entry_type="debt"),
+    _rule(rf"i\s+owe\s+{_LABEL}\s+{_AMOUNT}", "add_entry", entry_type="debt"),
+
+    _rule(rf"{_ADD}\s+{_ARTICLE}{_AMOUNT}\s+(?P<transaction_type>payment|repayment)\s+(?:on|to|towards?|for|against|from|into)\s+{_LABEL}", "add_transaction"),
+    _rule(rf"(?:i\s+)?(?:paid|pay|paying)\s+(?:off\s+)?{_AMOUNT}\s+(?:on|to|towards?|for|against|into|off)\s+{_LABEL}", "add_transaction", transaction_type="payment"),
+    _rule(rf"(?:i\s+)?(?:received|receive|got)\s+(?:a\s+)?{_AMOUNT}\s+(?:repayment\s+|back\s+)?from\s+{_LABEL}", "add_transaction", transaction_type="repayment"),
+    _rule(rf"{_LABEL}\s+(?:repaid|paid\s+back|paid\s+me(?:\s+back)?)(?:\s+me)?\s+{_AMOUNT}", "add_transaction", transaction_type="repayment"),
+]
+
+
+def parse_amount(text: str) -> float | None:
+    """Reads an amount such as "$1,250.50", "50" or "1.5k". Returns None if it isn't one."""
+    text = text.strip().lower().replace("$", "").replace(",", "").strip()
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1000, text[:-1].strip()
+    try:
+        return float(text) * multiplier
+    except ValueError:
+        return None
+
+
+def _clean_label(label: str) -> str:
+    return _LEADING_ARTICLE.sub("", label.strip(" .,!?\"'")).strip()
+
+
+def _parse_step(step: str) -> dict | None:
+    for pattern, action, fixed in _RULES:
+        match = pattern.fullmatch(step)
+        if not match:
+            continue
+        groups = {key: value for key, value in match.groupdict().items() if value is not None}
+        payload = dict(fixed)
+        if "amount" in groups:
+            amount = parse_amount(groups["amount"])
+            if not amount or amount <= 0:
+                return None
+            payload["amount"] = amount
+        if "entry_type" in groups:
+            entry_type = groups["entry_type"].lower().rstrip("s")
+            payload["entry_type" if action == "add_entry" else "filter_by_type"] = entry_type
+        if "transaction_type" in groups:
+            payload["transaction_type"] = groups["transaction_type"].lower()
+        if "label" in groups:
+            label = _clean_label(groups["label"])
+            # A second amount in the label means the rule split the command in the wrong place
+            if not label or _STRAY_AMOUNT.search(label):
+                return None
+            payload["target_entry_label" if action == "add_transaction" else "label"] = label
+        return {"action": action, "payload": payload}
+    return None
+
+
+def parse_command_locally(command_str: str) -> dict | None:
+    """
+    Parses the common command bar phrasings (adding a debt or loan, recording a payment or
+    repayment, listing entries, showing the summary) without a network call. Steps can be
+    chained with "then" or ";", or given one per line. Returns the same {"commands": [...]}
+    shape as the AI parser, or None if any step isn't matched confidently, so the caller can
+    fall back to the AI.
+    """
+    commands = []
+    for step in _STEP_SEPARATOR.split(command_str.strip()):
+        step = _POLITE_WORDS.sub("", step.strip().rstrip(".!?")).strip()
+        if not step:
+            continue
+        command = _parse_step(step)
+        if command is None:
+            return None
+        commands.append(command)
+    return {"commands": commands} if commands else None
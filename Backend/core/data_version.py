@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+# A single counter bumped on every mutation of the managers' data. Anything cached
+# against an older version is treated as stale.
+_data_version = 0
+_version_lock = threading.Lock()
+
+_memoized_functions = {}
+
+
+def get_data_version() -> int:
+    return _data_version
+
+
+def bump_data_version() -> int:
+    """Marks all ledger, transaction, journal and snapshot data as changed."""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+
+class _MemoCache:
+    """
+    A bounded LRU cache for one memoised function, with hit/miss counters. It only holds results
+    for one data version: the first lookup at a newer version empties it, so results (and the
+    arguments kept alive with them) from older versions are released rather than left to age out.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = _data_version
+        self._lock = threading.Lock()
+
+    def _is_current(self, version: int) -> bool:
+        # Called with the lock held
+        if version > self._version:
+            self._entries.clear()
+            self._version = version
+        return version == self._version
+
+    def get(self, key, version: int):
+        with self._lock:
+            if self._is_current(version) and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, version: int, args, result):
+        with self._lock:
+            if not self._is_current(version):
+                # Computed from data that has changed since
+                return
+            # The arguments are kept alive alongside the result so their ids can't be reused while cached
+            self._entries[key] = (args, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def memoize_on_data_version(maxsize: int = 256):
+    """
+    Caches a pure function's result keyed on (function, argument ids) for the current data version.
+    Arguments are matched by identity, so callers should pass the managers' own lists
+    rather than fresh copies to get hits.
+    """
+    def decorator(func):
+        cache = _MemoCache(maxsize)
+        name = f"{func.__module__}.{func.__qualname__}"
+        _memoized_functions[name] = cache
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            version = _data_version
+            key = (tuple(id(a) for a in args), tuple((k, id(v)) for k, v in sorted(kwargs.items())))
+            found, result = cache.get(key, version)
+            if found:
+                return result
+            result = func(*args, **kwargs)
+            cache.put(key, version, (args, kwargs), result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def get_cache_stats() -> dict[str, dict]:
+    """Returns hit/miss counters and current size for every memoised function."""
+    stats = {}
+    for name, cache in _memoized_functions.items():
+        total = cache.hits + cache.misses
+        stats[name] = {
+            "hits": cache.hits,
+            "misses": cache.misses,
+            "hit_rate": cache.hits / total if total else 0.0,
+            "size": len(cache),
+            "maxsize": cache.maxsize,
+        }
+    return stats
+
+
+def clear_caches():
+    """Empties every memoised function's cache without resetting its counters."""
+    for cache in _memoized_functions.values():
+        cache.clear()
@@ -1,12 +1,80 @@
 import os
 import csv
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
+from operator import attrgetter
 from Backend.core.ledger_manager import LedgerEntry
 from Backend.core.transaction_manager import Transaction
 
-def export_data_to_csv(ledger_manager, transaction_manager, output_dir: str):
+# Rows formatted and written per writerows() call, and between progress reports and cancel checks.
+# writerows() holds the GIL throughout, so a chunk also bounds how long the GUI thread can stall.
+EXPORT_CHUNK_ROWS = 2000
+EXPORT_BUFFER_BYTES = 1 << 20
+
+LEDGER_HEADERS = ['id', 'label', 'amount', 'entry_type', 'status', 'date_incurred', 'comments', 'tags']
+TRANSACTION_HEADERS = ['id', 'entry_id', 'transaction_type', 'label', 'amount', 'date_paid', 'comments', 'tags']
+
+# csv writes None as an empty field, so comments need no conversion
+_ledger_fields = attrgetter('id', 'label', 'amount', 'entry_type', 'status', 'date_incurred', 'comments', 'tags')
+_transaction_fields = attrgetter('id', 'entry_id', 'transaction_type', 'label', 'amount', 'date_paid', 'comments', 'tags')
+
+
+def ledger_rows(entries: list[LedgerEntry]):
+    """Yields a CSV row for each entry, in LEDGER_HEADERS order."""
+    for entry_id, label, amount, entry_type, status, date_incurred, comments, tags in map(_ledger_fields, entries):
+        yield entry_id, label, amount, entry_type, status, date_incurred.isoformat(), comments, ", ".join(tags)
+
+
+def transaction_rows(transactions: list[Transaction]):
+    """Yields a CSV row for each transaction, in TRANSACTION_HEADERS order."""
+    for txn_id, entry_id, txn_type, label, amount, date_paid, comments, tags in map(_transaction_fields, transactions):
+        yield txn_id, entry_id, txn_type, label, amount, date_paid.isoformat(), comments, ", ".join(tags)
+
+
+def write_csv_rows(path: str, headers: list[str], rows, on_chunk=None, is_cancelled=None) -> bool:
+    """
+    Writes the header and then rows from the iterable `rows` to `path`, EXPORT_CHUNK_ROWS at a
+    time through a large write buffer. on_chunk(row_count) is called after each chunk. Returns
+    False, leaving a partial file, if is_cancelled() reports true between chunks.
+    """
+    rows = iter(rows)
+    with open(path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_BYTES) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(headers)
+        while True:
+            if is_cancelled and is_cancelled():
+                return False
+            chunk = list(islice(rows, EXPORT_CHUNK_ROWS))
+            if not chunk:
+                return True
+            writer.writerows(chunk)
+            if on_chunk:
+                on_chunk(len(chunk))
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def export_data_to_csv(ledger_manager, transaction_manager, output_dir: str,
+                       progress_callback=None, is_cancelled=None) -> tuple[str, str] | None:
+    """Exports ledger and transaction data to two CSV files in a user-specified directory. See export_lists_to_csv."""
+    return export_lists_to_csv(list(ledger_manager.get_all_entries()), list(transaction_manager.get_all_transactions()),
+                               output_dir, progress_callback, is_cancelled)
+
+
+def export_lists_to_csv(all_ledger_entries: list[LedgerEntry], all_transactions: list[Transaction], output_dir: str,
+                        progress_callback=None, is_cancelled=None) -> tuple[str, str] | None:
     """
-    Exports ledger and transaction data to two CSV files in a user-specified directory.
+    Exports the given entries and transactions to two CSV files in `output_dir`. The files
+    are written concurrently, each streamed in chunks. progress_callback(rows_done, total_rows)
+    is called as chunks are written, from either thread. If is_cancelled() reports true, or
+    writing fails, both files are deleted; returns None when cancelled, otherwise the two paths.
     """
     if not os.path.isdir(output_dir):
         print(f"Error: Provided output directory does not exist: {output_dir}")
@@ -15,44 +83,34 @@ def export_data_to_csv(ledger_manager, transaction_manager, output_dir: str):
     datetime_now = datetime.now()
     formatted_datetime = datetime_now.strftime("%Y-%m-%d_%H-%M-%S")
 
-    ledger_filename = f"ledger_entries_{formatted_datetime}.csv"
-    transaction_filename = f"transaction_entries_{formatted_datetime}.csv"
+    ledger_filepath = os.path.join(output_dir, f"ledger_entries_{formatted_datetime}.csv")
+    transaction_filepath = os.path.join(output_dir, f"transaction_entries_{formatted_datetime}.csv")
 
-    ledger_filepath = os.path.join(output_dir, ledger_filename)
-    transaction_filepath = os.path.join(output_dir, transaction_filename)
+    total_rows = len(all_ledger_entries) + len(all_transactions)
+    rows_done = 0
+    lock = threading.Lock()
 
-    ledger_headers = ['id', 'label', 'amount', 'entry_type', 'status', 'date_incurred', 'comments', 'tags']
-    all_ledger_entries = ledger_manager.get_all_entries()
-    with open(ledger_filepath, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(ledger_headers)
-        for entry in all_ledger_entries:
-            row_data = [
-                entry.id,
-                entry.label,
-                entry.amount,
-                entry.entry_type,
-                entry.status,
-                entry.date_incurred.isoformat(),
-                entry.comments if entry.comments is not None else "",
-                ", ".join(entry.tags)
-            ]
-            writer.writerow(row_data)
-
-    transaction_headers = ['id', 'entry_id', 'transaction_type', 'label', 'amount', 'date_paid', 'comments', 'tags']
-    all_transactions = transaction_manager.get_all_transactions()
-    with open(transaction_filepath, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(transaction_headers)
-        for transaction in all_transactions:
-            row_data = [
-                transaction.id,
-                transaction.entry_id,
-                transaction.transaction_type,
-                transaction.label,
-                transaction.amount,
-                transaction.date_paid.isoformat(),
-                transaction.comments if transaction.comments is not None else "",
-                ", ".join(transaction.tags)
-            ]
-            writer.writerow(row_data)
\ No newline at end of file
+    def on_chunk(row_count):
+        nonlocal rows_done
+        with lock:
+            rows_done += row_count
+            done = rows_done
+        if progress_callback:
+            progress_callback(done, total_rows)
+
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-export") as pool:
+            ledger_done = pool.submit(write_csv_rows, ledger_filepath, LEDGER_HEADERS,
+                                      ledger_rows(all_ledger_entries), on_chunk, is_cancelled)
+            completed = write_csv_rows(transaction_filepath, TRANSACTION_HEADERS,
+                                       transaction_rows(all_transactions), on_chunk, is_cancelled)
+            completed = ledger_done.result() and completed
+    except BaseException:
+        _remove_quietly(ledger_filepath)
+        _remove_quietly(transaction_filepath)
+        raise
+    if not completed:
+        _remove_quietly(ledger_filepath)
+        _remove_quietly(transaction_filepath)
+        return None
+    return ledger_filepath, transaction_filepath
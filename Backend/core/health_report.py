@@ -0,0 +1,173 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from Backend.core.ledger_manager import LedgerEntry
+from Backend.core.transaction_manager import Transaction
+from Backend.core.summary_calculator import calculate_paid_by_entry
+
+# A debt with a balance and no payment for this long is called out as stale
+STALE_DEBT_DAYS = 60
+# Months averaged on each side when comparing recent payments with the ones before
+VELOCITY_WINDOW_MONTHS = 3
+# Changes in payment pace smaller than this are reported as steady
+VELOCITY_STEADY_BAND = 0.15
+# A single debt holding at least this share of the total is called out
+CONCENTRATION_THRESHOLD = 0.5
+
+
+@dataclass
+class HealthMetrics:
+    total_debt: float = 0.0
+    total_loans: float = 0.0
+    active_debts: int = 0
+    active_loans: int = 0
+    debt_to_loan_ratio: float | None = None
+    # Paid against debts in each of the last complete months, oldest first
+    monthly_payments: list[float] = field(default_factory=list)
+    recent_monthly_average: float = 0.0
+    velocity_change: float | None = None
+    month_over_month_change: float | None = None
+    stale_debts: list[tuple[LedgerEntry, int]] = field(default_factory=list)
+    largest_debt: LedgerEntry | None = None
+    largest_debt_balance: float = 0.0
+    largest_debt_share: float = 0.0
+
+
+def _month_index(when: datetime) -> int:
+    return when.year * 12 + when.month - 1
+
+
+def _change(current: float, previous: float) -> float | None:
+    return (current - previous) / previous if previous > 0 else None
+
+
+def calculate_health_metrics(all_entries: list[LedgerEntry], all_transactions: list[Transaction],
+                             now: datetime | None = None, stale_days: int = STALE_DEBT_DAYS) -> HealthMetrics:
+    """Computes everything the offline health check reports on, in one pass over the transactions."""
+    now = now or datetime.now(timezone.utc)
+    metrics = HealthMetrics()
+    paid_by_entry = calculate_paid_by_entry(all_transactions)
+    debts = {e.id: e for e in all_entries if e.entry_type == 'debt'}
+
+    # Only complete months are compared, so a half-finished month doesn't read as a slowdown
+    months = 2 * VELOCITY_WINDOW_MONTHS
+    this_month = _month_index(now)
+    monthly = [0.0] * months
+    last_payment = {}
+    for t in all_transactions:
+        if t.entry_id not in debts:
+            continue
+        previous = last_payment.get(t.entry_id)
+        if previous is None or t.date_paid > previous:
+            last_payment[t.entry_id] = t.date_paid
+        age = this_month - _month_index(t.date_paid)
+        if 1 <= age <= months:
+            monthly[months - age] += t.amount
+    metrics.monthly_payments = monthly
+    recent = sum(monthly[VELOCITY_WINDOW_MONTHS:]) / VELOCITY_WINDOW_MONTHS
+    earlier = sum(monthly[:VELOCITY_WINDOW_MONTHS]) / VELOCITY_WINDOW_MONTHS
+    metrics.recent_monthly_average = recent
+    metrics.velocity_change = _change(recent, earlier)
+    metrics.month_over_month_change = _change(monthly[-1], monthly[-2])
+
+    for entry in all_entries:
+        balance = entry.amount - paid_by_entry.get(entry.id, 0.0)
+        if balance <= 0:
+            continue
+        if entry.entry_type == 'loan':
+            metrics.total_loans += balance
+            metrics.active_loans += 1
+            continue
+        if entry.entry_type != 'debt':
+            continue
+        metrics.total_debt += balance
+        metrics.active_debts += 1
+        if balance > metrics.largest_debt_balance:
+            metrics.largest_debt, metrics.largest_debt_balance = entry, balance
+        idle_days = (now - last_payment.get(entry.id, entry.date_incurred)).days
+        if idle_days >= stale_days:
+            metrics.stale_debts.append((entry, idle_days))
+
+    metrics.stale_debts.sort(key=lambda item: item[1], reverse=True)
+    if metrics.total_loans > 0:
+        metrics.debt_to_loan_ratio = metrics.total_debt / metrics.total_loans
+    if metrics.total_debt > 0:
+        metrics.largest_debt_share = metrics.largest_debt_balance / metrics.total_debt
+    return metrics
+
+
+def _percent(change: float) -> str:
+    return f"{abs(change):.0%}"
+
+
+def _summary(m: HealthMetrics) -> str:
+    lines = [f"You owe **${m.total_debt:,.2f}** across {m.active_debts} active debt(s), "
+             f"and are owed **${m.total_loans:,.2f}** across {m.active_loans} loan(s)."]
+    if m.debt_to_loan_ratio is not None:
+        lines.append(f"For every dollar owed to you, you owe ${m.debt_to_loan_ratio:,.2f}.")
+    if m.recent_monthly_average > 0:
+        lines.append(f"Over the last {VELOCITY_WINDOW_MONTHS} months you paid an average of "
+                     f"${m.recent_monthly_average:,.2f} a month toward your debts.")
+    if m.month_over_month_change is not None:
+        if abs(m.month_over_month_change) < 0.01:
+            lines.append("Last month's payments matched the month before.")
+        else:
+            direction = "up" if m.month_over_month_change > 0 else "down"
+            lines.append(f"Last month's payments were {direction} {_percent(m.month_over_month_change)} on the month before.")
+    return " ".join(lines)
+
+
+def _observation_and_suggestion(m: HealthMetrics, stale_days: int) -> tuple[str, str]:
+    """Picks the most pressing finding, in priority order, and the suggestion that goes with it."""
+    if m.total_debt <= 0:
+        return ("You have no outstanding debts. That's a strong position to be in.",
+                "Keep logging any new debts as they come up, and consider putting what you used to "
+                "spend on repayments toward an emergency fund.")
+    if m.stale_debts:
+        names = ", ".join(f"**{entry.label}** ({days} days)" for entry, days in m.stale_debts[:3])
+        more = f" and {len(m.stale_debts) - 3} more" if len(m.stale_debts) > 3 else ""
+        entry = m.stale_debts[0][0]
+        return (f"{len(m.stale_debts)} debt(s) haven't had a payment in over {stale_days} days: {names}{more}.",
+                f"Schedule even a small payment on **{entry.label}** this week. Regular progress on "
+                f"every debt keeps them from being forgotten.")
+    if m.active_debts > 1 and m.largest_debt_share >= CONCENTRATION_THRESHOLD:
+        return (f"**{m.largest_debt.label}** makes up {m.largest_debt_share:.0%} of everything you owe "
+                f"(${m.largest_debt_balance:,.2f}).",
+                f"Progress on **{m.largest_debt.label}** matters most for your overall position. Consider "
+                f"directing any extra payments there while keeping up the minimums on the rest.")
+    if m.velocity_change is not None and m.velocity_change <= -VELOCITY_STEADY_BAND:
+        return (f"Your payments over the last {VELOCITY_WINDOW_MONTHS} months are down "
+                f"{_percent(m.velocity_change)} on the {VELOCITY_WINDOW_MONTHS} months before.",
+                "Check whether something has squeezed your budget lately, and set a fixed monthly "
+                "repayment amount you can stick to.")
+    if m.velocity_change is not None and m.velocity_change >= VELOCITY_STEADY_BAND:
+        return (f"Your payments over the last {VELOCITY_WINDOW_MONTHS} months are up "
+                f"{_percent(m.velocity_change)} on the {VELOCITY_WINDOW_MONTHS} months before. Great momentum!",
+                "Lock in that pace by automating the higher repayment, so it continues without effort.")
+    if m.recent_monthly_average <= 0:
+        return (f"No payments toward your debts were recorded in the last {VELOCITY_WINDOW_MONTHS} months.",
+                "Start with a small, regular payment on your smallest debt. An early win builds momentum.")
+    return ("Your repayments are holding steady from month to month.",
+            "Consistency pays off. If your budget allows, a small increase each month will shorten "
+            "the time until you're debt-free.")
+
+
+def build_health_report(all_entries: list[LedgerEntry], all_transactions: list[Transaction],
+                        now: datetime | None = None, stale_days: int = STALE_DEBT_DAYS) -> str:
+    """
+    A Financial Health Check written locally from calculated metrics, in the same three Markdown
+    sections as the AI version. Needs no API key or network, and takes milliseconds.
+    """
+    if not all_entries and not all_transactions:
+        return ("Welcome! Here are three simple steps to set yourself up for success:\n\n"
+                "1. **Budget with a simple rule.** Split your income into needs, wants and savings, "
+                "for example 50/30/20.\n"
+                "2. **Build an emergency fund.** A few months of expenses set aside keeps surprises "
+                "from turning into new debt.\n"
+                "3. **Track consistently.** Log every debt, loan and payment here, and your progress "
+                "will be easy to see.")
+    metrics = calculate_health_metrics(all_entries, all_transactions, now, stale_days)
+    observation, suggestion = _observation_and_suggestion(metrics, stale_days)
+    return (f"### Financial Summary\n{_summary(metrics)}\n\n"
+            f"### Key Observation\n{observation}\n\n"
+            f"### Actionable Suggestion\n{suggestion}")
@@ -3,6 +3,8 @@ from datetime import datetime, timezone
 from dataclasses import dataclass, field
 from typing import Optional
 
+from Backend.core.data_version import bump_data_version
+
 DEFAULT_NOTEBOOK = "General"
 
 @dataclass
@@ -39,6 +41,7 @@ class JournalManager:
     def add_entry(self, content: str, notebook: str = DEFAULT_NOTEBOOK, tags: Optional[list[str]] = None):
         new_entry = JournalEntry(content=content, notebook=notebook, tags=tags if tags is not None else [])
         self.entries.append(new_entry)
+        bump_data_version()
         return new_entry
 
     def get_all_entries(self) -> list[JournalEntry]:
@@ -61,3 +64,4 @@ class JournalManager:
 
     def delete_entry_by_id(self, entry_id: str):
         self.entries = [e for e in self.entries if e.id != entry_id]
+        bump_data_version()
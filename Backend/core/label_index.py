@@ -0,0 +1,237 @@
+import heapq
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain, islice
+
+# Scores run from 0 to 1. Anything under MIN_MATCH_SCORE shares no convincing word with the query.
+MIN_MATCH_SCORE = 0.5
+# Candidates within this much of the best score are too close to pick between automatically
+AMBIGUITY_MARGIN = 0.08
+# Two words count as the same word (allowing for typos) from this Jaro-Winkler similarity up
+TOKEN_MATCH_THRESHOLD = 0.85
+# Words and trigrams shared by more labels than this are too common to count hits over
+MAX_POSTING_SIZE = 300
+# Once this many postings entries have been counted, the remaining (more common) ones only add to
+# labels already found
+SHORTLIST_WORK_BUDGET = 1500
+SHORTLIST_SIZE = 16
+# Labels sharing less than this share of the best label's hits with the query aren't scored
+SHORTLIST_MIN_OVERLAP = 0.8
+# Above this, even intersecting postings costs more than it saves
+MAX_INTERSECT_SIZE = 5000
+TOKEN_HIT_WEIGHT = 3
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset({"a", "an", "the", "my", "to", "for", "of", "on", "i", "me", "from", "and", "s", "with"})
+
+
+@dataclass
+class LabelMatch:
+    entry: object
+    score: float
+
+
+def _tokens(text: str) -> list[str]:
+    words = _WORD_PATTERN.findall(text.lower())
+    meaningful = [w for w in words if w not in _STOP_WORDS]
+    return meaningful or words
+
+
+def _trigrams(tokens: list[str]) -> set[str]:
+    padded = f" {' '.join(tokens)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Labels share a small vocabulary, so most word pairs have been compared before
+@lru_cache(maxsize=65536)
+def jaro_winkler(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    b_used = [False] * len(b)
+    a_matches = []
+    for i, ch in enumerate(a):
+        end = min(len(b), i + window + 1)
+        j = b.find(ch, max(0, i - window), end)
+        while j != -1 and b_used[j]:
+            j = b.find(ch, j + 1, end)
+        if j != -1:
+            b_used[j] = True
+            a_matches.append(ch)
+    if not a_matches:
+        return 0.0
+    b_matches = [b[j] for j, used in enumerate(b_used) if used]
+    transpositions = sum(x != y for x, y in zip(a_matches, b_matches)) / 2
+    m = len(a_matches)
+    jaro = (m / len(a) + m / len(b) + (m - transpositions) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def _coverage(words: list[str], other: list[str]) -> float:
+    """How much of `words` has a close match among `other`, from 0 to 1."""
+    total = 0.0
+    for word in words:
+        if word in other:
+            total += 1.0
+            continue
+        best = max(jaro_winkler(word, candidate) for candidate in other)
+        if best >= TOKEN_MATCH_THRESHOLD:
+            total += best
+    return total / len(words)
+
+
+def label_similarity(query_tokens: list[str], label_tokens: list[str]) -> float:
+    """
+    A token-set similarity with typo-tolerant word matching. Mostly it is how well the better
+    covered side is covered by the other, so a short query can match a long label and vice versa;
+    the rest is the other side's coverage, so an exact label outranks a longer one containing it.
+    """
+    if not query_tokens or not label_tokens:
+        return 0.0
+    query_coverage = _coverage(query_tokens, label_tokens)
+    label_coverage = _coverage(label_tokens, query_tokens)
+    return 0.75 * max(query_coverage, label_coverage) + 0.25 * min(query_coverage, label_coverage)
+
+
+class LabelIndex:
+    """
+    Word and trigram indexes over ledger entry labels for resolving loosely worded references,
+    such as the target of an AI command, to entries. Kept up to date incrementally by
+    LedgerManager as entries are added, relabelled and deleted.
+    """
+    def __init__(self, entries=()):
+        self.rebuild(entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, entries):
+        self._entries = {}
+        self._labels = {}
+        # defaultdicts, so adding to a posting doesn't build a throwaway empty set each time
+        self._exact = defaultdict(set)
+        self._words = defaultdict(set)
+        self._grams = defaultdict(set)
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        if entry.id in self._entries:
+            self.remove(entry.id)
+        tokens = _tokens(entry.label)
+        self._entries[entry.id] = entry
+        self._labels[entry.id] = tokens
+        self._exact[" ".join(tokens)].add(entry.id)
+        for token in set(tokens):
+            self._words[token].add(entry.id)
+        for gram in _trigrams(tokens):
+            self._grams[gram].add(entry.id)
+
+    def remove(self, entry_id: str):
+        tokens = self._labels.pop(entry_id, None)
+        if tokens is None:
+            return
+        del self._entries[entry_id]
+        self._discard(self._exact, " ".join(tokens), entry_id)
+        for token in set(tokens):
+            self._discard(self._words, token, entry_id)
+        for gram in _trigrams(tokens):
+            self._discard(self._grams, gram, entry_id)
+
+    def update(self, entry):
+        """Re-indexes an entry after its label has changed."""
+        self.add(entry)
+
+    @staticmethod
+    def _discard(postings: dict, key: str, entry_id: str):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del postings[key]
+
+    def _shortlist(self, tokens: list[str]) -> list[str]:
+        exact = list(self._exact.get(" ".join(tokens), ()))[:SHORTLIST_SIZE]
+        postings = [(self._words[t], TOKEN_HIT_WEIGHT) for t in set(tokens) if t in self._words]
+        postings += [(self._grams[g], 1) for g in _trigrams(tokens) if g in self._grams]
+        if not postings:
+            return exact
+        # Rarest first, so the work budget goes on the postings that say most about a label
+        postings.sort(key=lambda posting: len(posting[0]))
+        if len(postings[0][0]) > MAX_POSTING_SIZE:
+            return exact + self._sample_common([ids for ids, _ in postings])
+        budget = SHORTLIST_WORK_BUDGET
+        counted, rest = [], []
+        for ids, weight in postings:
+            if len(ids) > min(budget, MAX_POSTING_SIZE):
+                rest.append((ids, weight))
+            else:
+                budget -= len(ids)
+                counted.append((ids, weight))
+        # Counter counts in C; a posting is counted once per unit of its weight
+        hits = Counter(chain.from_iterable(ids for ids, weight in counted for _ in range(weight)))
+        # Scoring is what costs, so only labels close to the best overlap are kept
+        floor = max(hits.values()) * SHORTLIST_MIN_OVERLAP
+        candidates = {entry_id for entry_id, count in hits.items() if count >= floor}
+        hits = Counter({entry_id: hits[entry_id] for entry_id in candidates})
+        # The common postings are too big to walk, but their overlap with the candidates isn't
+        for ids, weight in rest:
+            shared = candidates & ids
+            for _ in range(weight):
+                hits.update(shared)
+        top = hits.most_common(SHORTLIST_SIZE)
+        floor = top[0][1] * SHORTLIST_MIN_OVERLAP
+        return exact + [entry_id for entry_id, count in top if count >= floor]
+
+    @staticmethod
+    def _sample_common(postings: list[set]) -> list[str]:
+        """
+        Every word and trigram in the query is shared by many labels. Narrow them down with set
+        intersections, which run in C, while the sets are small enough for that to be cheap, then
+        rank a bounded sample by how many of the query's postings each label appears in.
+        """
+        candidates = postings[0]
+        for ids in postings[1:]:
+            if len(candidates) <= SHORTLIST_SIZE * 4 or len(candidates) > MAX_INTERSECT_SIZE:
+                break
+            narrowed = candidates & ids
+            if narrowed:
+                candidates = narrowed
+        sample = islice(candidates, SHORTLIST_SIZE * 4)
+        return heapq.nlargest(SHORTLIST_SIZE, sample, key=lambda entry_id: sum(entry_id in ids for ids in postings))
+
+    def search(self, query: str, limit: int = 5, active_only: bool = False) -> list[LabelMatch]:
+        """Entries whose labels best match `query`, highest score first."""
+        tokens = _tokens(query)
+        matches = []
+        for entry_id in dict.fromkeys(self._shortlist(tokens)):
+            entry = self._entries[entry_id]
+            if active_only and entry.status != 'active':
+                continue
+            matches.append(LabelMatch(entry, label_similarity(tokens, self._labels[entry_id])))
+        return heapq.nlargest(limit, matches, key=lambda m: m.score)
+
+    def resolve(self, query: str, active_only: bool = True) -> list[LabelMatch]:
+        """
+        The entries `query` most plausibly refers to: one if there is a clear winner, several
+        if the best are too close to call, and none if nothing scores at least MIN_MATCH_SCORE.
+        """
+        exact = [self._entries[entry_id] for entry_id in self._exact.get(" ".join(_tokens(query)), ())]
+        exact = [entry for entry in exact if not active_only or entry.status == 'active']
+        if exact:
+            # An exact label (ignoring case and filler words) settles it, even if longer labels contain it
+            return [LabelMatch(entry, 1.0) for entry in exact]
+        matches = [m for m in self.search(query, active_only=active_only) if m.score >= MIN_MATCH_SCORE]
+        if not matches:
+            return []
+        best = matches[0].score
+        return [m for m in matches if best - m.score <= AMBIGUITY_MARGIN]
@@ -3,6 +3,9 @@ from datetime import datetime, timezone
 from dataclasses import dataclass, field
 from typing import Optional
 
+from Backend.core.data_version import bump_data_version
+from Backend.core.label_index import LabelIndex
+
 @dataclass
 class LedgerEntry:
     label: str
@@ -42,6 +45,8 @@ class LedgerEntry:
 class LedgerManager:
     def __init__(self):
         self.entries = []
+        self._label_index = LabelIndex()
+        self._indexed_entries = self.entries
 
     def add_entry(self, label: str, amount: float, entry_type: str, comments: Optional[str] = None, status: str = "active", tags: Optional[list[str]] = None):
         new_entry = LedgerEntry(
@@ -53,8 +58,20 @@ class LedgerManager:
             tags=tags if tags is not None else [],
         )
         self.entries.append(new_entry)
+        if self._label_index_is_current(len(self.entries) - 1):
+            self._label_index.add(new_entry)
+        bump_data_version()
         return new_entry
     
+    def add_entries(self, entries: list[LedgerEntry]):
+        """Adds already-built entries in one step, for batches."""
+        index_current = self._label_index_is_current(len(self.entries))
+        self.entries.extend(entries)
+        if index_current:
+            for entry in entries:
+                self._label_index.add(entry)
+        bump_data_version()
+
     def get_all_entries(self):
         return self.entries
 
@@ -65,4 +82,36 @@ class LedgerManager:
         return None
     
     def delete_entry_by_id(self, entry_id: str):
-        self.entries = [e for e in self.entries if e.id != entry_id]
\ No newline at end of file
+        index_current = self._label_index_is_current(len(self.entries))
+        self.entries = [e for e in self.entries if e.id != entry_id]
+        if index_current:
+            self._label_index.remove(entry_id)
+            self._indexed_entries = self.entries
+        bump_data_version()
+
+    def delete_entries_by_id(self, entry_ids: set[str]):
+        index_current = self._label_index_is_current(len(self.entries))
+        self.entries = [e for e in self.entries if e.id not in entry_ids]
+        if index_current:
+            for entry_id in entry_ids:
+                self._label_index.remove(entry_id)
+            self._indexed_entries = self.entries
+        bump_data_version()
+
+    def reindex_entry(self, entry: LedgerEntry):
+        """Call after changing an entry's label so label lookups find it by its new name."""
+        if self._label_index_is_current(len(self.entries)):
+            self._label_index.update(entry)
+
+    def _label_index_is_current(self, expected_size: int) -> bool:
+        return self._indexed_entries is self.entries and len(self._label_index) == expected_size
+
+    def get_label_index(self) -> LabelIndex:
+        """
+        The label index over all entries. It is updated incrementally by this manager, and rebuilt
+        here if the entry list was replaced or resized directly (loading, clearing, undo).
+        """
+        if not self._label_index_is_current(len(self.entries)):
+            self._label_index.rebuild(self.entries)
+            self._indexed_entries = self.entries
+        return self._label_index
\ No newline at end of file
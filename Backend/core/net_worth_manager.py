@@ -2,6 +2,8 @@ import uuid
 from datetime import datetime, timezone
 from dataclasses import dataclass, field
 
+from Backend.core.data_version import bump_data_version
+
 @dataclass
 class NetWorthSnapshot:
     net_position: float
@@ -30,6 +32,7 @@ class NetWorthManager:
     def add_snapshot(self, net_position: float):
         snapshot = NetWorthSnapshot(net_position=net_position)
         self.snapshots.append(snapshot)
+        bump_data_version()
         return snapshot
 
     def get_all_snapshots(self) -> list[NetWorthSnapshot]:
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from Backend.core.config_manager import get_config_path
+
+AI_CACHE_DIR_NAME = "ai_cache"
+AI_CACHE_TTL_SECONDS = 12 * 60 * 60
+AI_CACHE_MAX_ENTRIES = 200
+
+
+class ResponseCache:
+    """
+    An on-disk cache of AI responses, one JSON file per prompt under the config directory.
+    Entries expire after `ttl_seconds`, and once there are more than `max_entries` the least
+    recently used are evicted, using each file's modification time as its last use.
+    When `enabled` is False every lookup misses and nothing is stored.
+    """
+    def __init__(self, directory: str | None = None, ttl_seconds: float = AI_CACHE_TTL_SECONDS,
+                 max_entries: int = AI_CACHE_MAX_ENTRIES, enabled: bool = True):
+        self.directory = directory or os.path.join(get_config_path(), AI_CACHE_DIR_NAME)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, model: str, system_prompt: str, user_prompt: str) -> str:
+        """Keys a response by the service that gave it as well as the request, so services never share replies."""
+        return hashlib.sha256(json.dumps([endpoint, model, system_prompt, user_prompt]).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached response for key, or None if there is no live entry."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - entry["created"] > self.ttl_seconds:
+                os.remove(path)
+                raise KeyError(key)
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry["response"]
+
+    def put(self, key: str, response: str):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Written to a temporary file and renamed, so a concurrent reader never sees half an entry
+            temp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "response": response}, f)
+            os.replace(temp_path, self._path(key))
+            self._evict()
+        except OSError as e:
+            print(f"Error writing AI response cache: {e}")
+
+    def _evict(self):
+        paths = self._entry_paths()
+        if len(paths) <= self.max_entries:
+            return
+        last_used = {}
+        for path in paths:
+            try:
+                last_used[path] = os.path.getmtime(path)
+            except OSError:
+                pass
+        paths = sorted(last_used, key=last_used.get)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+                with self._lock:
+                    self.evictions += 1
+            except OSError:
+                pass
+
+    def _entry_paths(self) -> list[str]:
+        try:
+            return [entry.path for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        except OSError:
+            return []
+
+    def clear(self):
+        """Deletes every cached response without resetting the counters."""
+        for path in self._entry_paths():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entry_paths()),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,241 @@
+import csv
+import re
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, date, time, timezone
+
+import numpy as np
+
+from Backend.core.ledger_manager import LedgerManager, LedgerEntry
+from Backend.core.transaction_manager import TransactionManager, Transaction
+
+# Tried in order, for the whole date column, when the mapping doesn't name a date format
+COMMON_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d %b %Y", "%m/%d/%Y", "%d/%m/%y")
+# Statements carry dates without times; midday UTC falls on the same calendar date in Australian time zones
+STATEMENT_TIME = time(12, 0)
+STATEMENT_TAG = "Imported"
+
+_AMOUNT_JUNK = str.maketrans("", "", "$, \u00a0")
+_NON_WORD = re.compile(r"[^a-z]+")
+
+
+@dataclass
+class ColumnMapping:
+    """Which columns of a bank's CSV export hold what. Either `amount` or `debit`/`credit` is used."""
+    date: str = "Date"
+    description: str = "Description"
+    # One signed column, money out negative...
+    amount: str | None = "Amount"
+    # ...or money out and money in in separate columns, both positive
+    debit: str | None = None
+    credit: str | None = None
+    # None picks one of COMMON_DATE_FORMATS for the whole column
+    date_format: str | None = None
+    # For banks that show money out as positive in a single amount column
+    negate_amounts: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+
+@dataclass
+class StatementLine:
+    row: int
+    date: date
+    # Money out is negative
+    amount: float
+    description: str
+    entry: LedgerEntry | None = None
+    duplicate: bool = False
+
+
+@dataclass
+class StatementImport:
+    lines: list[StatementLine] = field(default_factory=list)
+    # Lines that couldn't be read, as messages naming the line
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def to_import(self) -> list[StatementLine]:
+        return [line for line in self.lines if line.entry is not None and not line.duplicate]
+
+    @property
+    def duplicates(self) -> int:
+        return sum(line.duplicate for line in self.lines)
+
+    @property
+    def unmatched(self) -> int:
+        return sum(line.entry is None and not line.duplicate for line in self.lines)
+
+
+def dedupe_key(day: date, amount: float, description: str) -> tuple:
+    """Identifies a statement line: its date, amount in cents and description ignoring case and spacing."""
+    return day, round(abs(amount) * 100), " ".join(description.lower().split())
+
+
+def match_text(description: str) -> str:
+    """A description without the card numbers, references and dates that differ from line to line."""
+    return _NON_WORD.sub(" ", description.lower()).strip()
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def parse_amounts(values: list[str]) -> tuple[np.ndarray, list[int]]:
+    """
+    Parses amounts such as "-1,234.50", "$20" and "(12.00)" in one numpy conversion. Blank
+    values are 0. Returns the amounts and the positions of values that aren't finite numbers,
+    which includes "nan" and "inf".
+    """
+    cleaned = [value.translate(_AMOUNT_JUNK) or "0" for value in values]
+    cleaned = [f"-{value[1:-1]}" if value.startswith("(") and value.endswith(")") else value for value in cleaned]
+    try:
+        amounts = np.array(cleaned, dtype=np.float64)
+    except ValueError:
+        amounts = np.array([_to_float(value) for value in cleaned], dtype=np.float64)
+    return amounts, np.flatnonzero(~np.isfinite(amounts)).tolist()
+
+
+def _parse_date(text: str, date_format: str) -> date | None:
+    try:
+        parsed = datetime.strptime(text, date_format).date()
+    except ValueError:
+        return None
+    # %Y also accepts two-digit years, which would land in the first century
+    return parsed if parsed.year >= 1900 else None
+
+
+def detect_date_format(values) -> str:
+    """
+    The first of COMMON_DATE_FORMATS that reads every value, so a whole column is read one way;
+    a file whose days never go past 12 reads day first. Failing that, the one reading the most.
+    """
+    values = [value for value in set(values) if value]
+    best, best_count = COMMON_DATE_FORMATS[0], -1
+    for date_format in COMMON_DATE_FORMATS:
+        count = sum(_parse_date(value, date_format) is not None for value in values)
+        if count == len(values):
+            return date_format
+        if count > best_count:
+            best, best_count = date_format, count
+    return best
+
+
+def parse_dates(values: list[str], date_format: str | None) -> list[date | None]:
+    """
+    Parses dates in one format for the whole column, detected if `date_format` is None. Each
+    distinct string is parsed only once; a statement repeats the same few hundred dates.
+    """
+    date_format = date_format or detect_date_format(values)
+    parsed = {text: _parse_date(text, date_format) for text in set(values)}
+    return [parsed[text] for text in values]
+
+
+def read_statement_header(path: str) -> list[str]:
+    """The column names of a statement CSV export, for choosing a ColumnMapping."""
+    with open(path, newline='', encoding='utf-8-sig') as csvfile:
+        return [name.strip() for name in next(csv.reader(csvfile), [])]
+
+
+def read_statement(path: str, mapping: ColumnMapping) -> StatementImport:
+    """Reads a bank statement CSV export into lines, noting the lines that can't be read."""
+    with open(path, newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        header = [name.strip() for name in next(reader, [])]
+        # Numbered as the lines of the file, counting the header as line 1
+        numbered = [(number, row) for number, row in enumerate(reader, start=2) if any(cell.strip() for cell in row)]
+
+    amount_columns = [mapping.amount] if mapping.amount else [mapping.debit, mapping.credit]
+    positions = {}
+    for name in [mapping.date, mapping.description] + amount_columns:
+        if name not in header:
+            raise ValueError(f"The statement has no '{name}' column. Its columns are: {', '.join(header)}")
+        positions[name] = header.index(name)
+    width = max(positions.values()) + 1
+
+    result = StatementImport()
+    for number, row in numbered:
+        if len(row) < width:
+            result.errors.append(f"Line {number}: has {len(row)} columns, expected at least {width}")
+    numbered = [(number, row) for number, row in numbered if len(row) >= width]
+    row_numbers = [number for number, _ in numbered]
+    rows = [row for _, row in numbered]
+
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    descriptions = [text.strip() for text in columns[positions[mapping.description]]]
+    dates = parse_dates([text.strip() for text in columns[positions[mapping.date]]], mapping.date_format)
+    if mapping.amount:
+        amounts, bad = parse_amounts(list(columns[positions[mapping.amount]]))
+        if mapping.negate_amounts:
+            amounts = -amounts
+    else:
+        debits, bad_debits = parse_amounts(list(columns[positions[mapping.debit]]))
+        credits, bad_credits = parse_amounts(list(columns[positions[mapping.credit]]))
+        amounts = credits - np.abs(debits)
+        bad = bad_debits + bad_credits
+    bad = set(bad)
+
+    for i, (row, day, amount, description) in enumerate(zip(row_numbers, dates, amounts.tolist(), descriptions)):
+        if day is None:
+            result.errors.append(f"Line {row}: couldn't read the date '{columns[positions[mapping.date]][i]}'")
+        elif i in bad:
+            result.errors.append(f"Line {row}: couldn't read the amount")
+        elif amount != 0:
+            result.lines.append(StatementLine(row, day, amount, description))
+    return result
+
+
+def match_lines(statement: StatementImport, ledger_manager: LedgerManager, transaction_manager: TransactionManager):
+    """
+    Marks lines already in the ledger as duplicates, and matches the rest to active entries by
+    description through the label index: money out to debts, money in to loans. A line is
+    only matched when one entry is a clear winner.
+    """
+    if not statement.lines:
+        return
+    first = min(line.date for line in statement.lines)
+    last = max(line.date for line in statement.lines)
+    # Imported transactions keep the statement's date, amount and description, so they can be recognised
+    existing = Counter(
+        dedupe_key(t.date_paid.date(), t.amount, t.label or "") for t in transaction_manager.get_all_transactions()
+        if first <= t.date_paid.date() <= last
+    )
+
+    index = ledger_manager.get_label_index()
+    matches = {}
+    for line in statement.lines:
+        key = dedupe_key(line.date, line.amount, line.description)
+        if existing[key] > 0:
+            # The same purchase can honestly appear twice in a day, so each existing copy only covers one line
+            existing[key] -= 1
+            line.duplicate = True
+            continue
+        entry_type = 'debt' if line.amount < 0 else 'loan'
+        query = match_text(line.description)
+        if (query, entry_type) not in matches:
+            candidates = [m.entry for m in index.resolve(query, active_only=True) if m.entry.entry_type == entry_type]
+            matches[query, entry_type] = candidates[0] if len(candidates) == 1 else None
+        line.entry = matches[query, entry_type]
+
+
+def build_transactions(lines: list[StatementLine]) -> list[Transaction]:
+    """Transactions for matched statement lines, dated and labelled as on the statement."""
+    return [
+        Transaction(
+            entry_id=line.entry.id,
+            transaction_type='payment' if line.entry.entry_type == 'debt' else 'repayment',
+            amount=abs(line.amount),
+            label=line.description,
+            date_paid=datetime.combine(line.date, STATEMENT_TIME, tzinfo=timezone.utc),
+            tags=[STATEMENT_TAG],
+        )
+        for line in lines
+    ]
@@ -1,6 +1,10 @@
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, date, time, timedelta, timezone
+from dataclasses import dataclass
+import numpy as np
+
 from Backend.core.ledger_manager import LedgerEntry
 from Backend.core.transaction_manager import Transaction
+from Backend.core.data_version import memoize_on_data_version
 
 def calculate_total_entry_amount(entries: list[LedgerEntry]) -> float:
     return sum(e.amount for e in entries)
@@ -8,11 +12,21 @@ def calculate_total_entry_amount(entries: list[LedgerEntry]) -> float:
 def calculate_total_transaction_amount(transactions: list[Transaction]) -> float:
     return sum(t.amount for t in transactions)
 
+@memoize_on_data_version(maxsize=4096)
 def calculate_balance_for_entry(entry: LedgerEntry, all_transactions: list[Transaction]) -> float:
     """Calculates the remaining balance for a single ledger entry."""
     paid = sum(t.amount for t in all_transactions if t.entry_id == entry.id)
     return entry.amount - paid
 
+@memoize_on_data_version(maxsize=16)
+def calculate_paid_by_entry(all_transactions: list[Transaction]) -> dict[str, float]:
+    """Totals every entry's transactions in a single pass, for callers that need many balances at once."""
+    paid = {}
+    for t in all_transactions:
+        paid[t.entry_id] = paid.get(t.entry_id, 0.0) + t.amount
+    return paid
+
+@memoize_on_data_version(maxsize=1024)
 def calculate_entry_eta(entry: LedgerEntry, all_transactions: list[Transaction]) -> str:
     """Calculates the smart ETA for a single ledger entry."""
     transactions_for_this_entry = [t for t in all_transactions if t.entry_id == entry.id]
@@ -52,6 +66,7 @@ def calculate_entry_eta(entry: LedgerEntry, all_transactions: list[Transaction])
     formatted_date = eta_date.strftime("%b %d, %Y")
     return f"ETA: {formatted_date}"
     
+@memoize_on_data_version(maxsize=16)
 def calculate_overall_eta(all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> str:
     """Calculates the overall estimated payoff date for all active debts."""
     
@@ -91,4 +106,191 @@ def calculate_overall_eta(all_entries: list[LedgerEntry], all_transactions: list
     today = datetime.now(timezone.utc)
     freedom_date = today + timedelta(days=days_to_go)
     formatted_date = freedom_date.strftime("%b %d, %Y")
-    return f"Debt-Free By: {formatted_date}"
\ No newline at end of file
+    return f"Debt-Free By: {formatted_date}"
+
+# --- Dashboard Summary ---
+
+@dataclass
+class DashboardSummary:
+    """Every figure the dashboard's cards, summary panel, pie and bar charts show."""
+    debt_balance: float
+    loan_balance: float
+    total_debt: float
+    total_loaned: float
+    total_paid: float
+    total_repaid: float
+    debt_eta: str
+    active_debt_count: int
+    paid_this_month: float
+    biggest_debt: tuple[str, float] | None
+    paid_off_count: int
+    active_entry_balances: list[tuple[LedgerEntry, float]]
+
+    @property
+    def net_position(self) -> float:
+        return self.loan_balance - self.debt_balance
+
+def calculate_dashboard_summary(all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> DashboardSummary:
+    """Computes the dashboard's figures in one pass over the transactions rather than one per entry."""
+    now = datetime.now(timezone.utc)
+    paid_by_entry = {}
+    total_paid = total_repaid = paid_this_month = 0.0
+    payments = []
+    for t in all_transactions:
+        paid_by_entry[t.entry_id] = paid_by_entry.get(t.entry_id, 0.0) + t.amount
+        if t.transaction_type == 'payment':
+            total_paid += t.amount
+            payments.append(t)
+        elif t.transaction_type == 'repayment':
+            total_repaid += t.amount
+        if t.date_paid.year == now.year and t.date_paid.month == now.month:
+            paid_this_month += t.amount
+
+    debt_entries = [e for e in all_entries if e.entry_type == 'debt']
+    loan_entries = [e for e in all_entries if e.entry_type == 'loan']
+    balance = lambda e: e.amount - paid_by_entry.get(e.id, 0.0)
+
+    active_debts = [e for e in debt_entries if e.status == 'active']
+    biggest = max(active_debts, key=balance) if active_debts else None
+    active_entries = sorted((e for e in all_entries if e.status == 'active'), key=lambda e: e.label)
+
+    return DashboardSummary(
+        debt_balance=sum(balance(e) for e in debt_entries),
+        loan_balance=sum(balance(e) for e in loan_entries),
+        total_debt=calculate_total_entry_amount(debt_entries),
+        total_loaned=calculate_total_entry_amount(loan_entries),
+        total_paid=total_paid,
+        total_repaid=total_repaid,
+        # Bypass the memo: these lists are built fresh on every call, so it would only ever miss
+        debt_eta=calculate_overall_eta.__wrapped__(debt_entries, payments),
+        active_debt_count=len(active_debts),
+        paid_this_month=paid_this_month,
+        biggest_debt=(biggest.label, balance(biggest)) if biggest else None,
+        paid_off_count=sum(1 for e in all_entries if e.status == 'paid'),
+        active_entry_balances=[(e, balance(e)) for e in active_entries],
+    )
+
+# --- As-Of-Date Balances ---
+
+SERIES_RESOLUTIONS = ("daily", "weekly", "monthly")
+
+@dataclass
+class BalanceSeries:
+    dates: list[datetime]
+    debt_balance: np.ndarray
+    loan_balance: np.ndarray
+    net_position: np.ndarray
+
+def _to_timestamp(when: datetime | date) -> float:
+    """Converts a query point to a POSIX timestamp. A bare date means the end of that (local) day."""
+    if not isinstance(when, datetime):
+        when = datetime.combine(when, time.max).astimezone()
+    return when.timestamp()
+
+def _cumulative_stream(times: list[float], deltas: list[float]) -> tuple[np.ndarray, np.ndarray]:
+    """Sorts signed balance changes by time and returns (times, running total)."""
+    times_arr = np.asarray(times, dtype=float)
+    order = np.argsort(times_arr, kind='stable')
+    return times_arr[order], np.cumsum(np.asarray(deltas, dtype=float)[order])
+
+def _value_at(times: np.ndarray, cumulative: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Binary-searches each query timestamp and returns the running total at that point."""
+    idx = np.searchsorted(times, query, side='right')
+    return np.where(idx > 0, cumulative[np.maximum(idx - 1, 0)], 0.0)
+
+def _period_ends(start: date, end: date, resolution: str) -> list[date]:
+    """Returns the last day of each day, week or month between start and end (inclusive)."""
+    first, last = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    if resolution == "daily":
+        days = np.arange(first, last + 1)
+    elif resolution == "weekly":
+        days = np.arange(last, first - 1, -7)[::-1]
+    elif resolution == "monthly":
+        months = np.arange(np.datetime64(start, 'M'), np.datetime64(end, 'M') + 1)
+        days = np.minimum((months + 1).astype('datetime64[D]') - 1, last)
+    else:
+        raise ValueError(f"Unknown resolution '{resolution}'. Expected one of {SERIES_RESOLUTIONS}.")
+    return days.astype(date).tolist()
+
+class BalanceIndex:
+    """
+    Per-entry cumulative sums over date-sorted transactions, so balances on any past date
+    are a binary search instead of a rescan of every transaction.
+    """
+    def __init__(self, all_entries: list[LedgerEntry], all_transactions: list[Transaction]):
+        self.entries = {e.id: e for e in all_entries}
+
+        grouped = {}
+        for t in all_transactions:
+            if t.entry_id in self.entries:
+                grouped.setdefault(t.entry_id, ([], []))
+                grouped[t.entry_id][0].append(t.date_paid.timestamp())
+                grouped[t.entry_id][1].append(t.amount)
+        self._paid = {entry_id: _cumulative_stream(times, amounts) for entry_id, (times, amounts) in grouped.items()}
+
+        # Aggregate streams: an entry adds its amount on date_incurred, each transaction takes it away again
+        streams = {'debt': ([], []), 'loan': ([], [])}
+        for e in all_entries:
+            if e.entry_type in streams:
+                streams[e.entry_type][0].append(e.date_incurred.timestamp())
+                streams[e.entry_type][1].append(e.amount)
+        for entry_id, (times, amounts) in grouped.items():
+            entry_type = self.entries[entry_id].entry_type
+            if entry_type in streams:
+                streams[entry_type][0].extend(times)
+                streams[entry_type][1].extend(-a for a in amounts)
+        self._debt = _cumulative_stream(*streams['debt'])
+        self._loan = _cumulative_stream(*streams['loan'])
+
+    def paid_as_of(self, entry: LedgerEntry, when: datetime | date) -> float:
+        """Total paid against an entry up to and including the given point in time."""
+        if entry.id not in self._paid:
+            return 0.0
+        times, cumulative = self._paid[entry.id]
+        return float(_value_at(times, cumulative, np.array([_to_timestamp(when)]))[0])
+
+    def balance_as_of(self, entry: LedgerEntry, when: datetime | date) -> float:
+        """The entry's remaining balance at the given point in time (zero before it was incurred)."""
+        ts = _to_timestamp(when)
+        if entry.date_incurred.timestamp() > ts:
+            return 0.0
+        return entry.amount - self.paid_as_of(entry, when)
+
+    def totals_as_of(self, whens: list[datetime | date]) -> tuple[np.ndarray, np.ndarray]:
+        """Total debt and loan balances at each of the given points in time, in one vectorised pass."""
+        query = np.array([_to_timestamp(w) for w in whens], dtype=float)
+        return _value_at(*self._debt, query), _value_at(*self._loan, query)
+
+    def net_position_as_of(self, when: datetime | date) -> float:
+        """Loans owed to you minus debts owed, at the given point in time."""
+        debt, loan = self.totals_as_of([when])
+        return float(loan[0] - debt[0])
+
+    def series(self, start: date, end: date, resolution: str = "monthly") -> BalanceSeries:
+        """Debt, loan and net position balances at the end of every day, week or month in a range."""
+        period_ends = _period_ends(start, end, resolution)
+        debt, loan = self.totals_as_of(period_ends)
+        return BalanceSeries(
+            dates=[datetime.combine(d, time.max).astimezone() for d in period_ends],
+            debt_balance=debt,
+            loan_balance=loan,
+            net_position=loan - debt,
+        )
+
+def calculate_net_position_series(all_entries: list[LedgerEntry], all_transactions: list[Transaction], resolution: str = "weekly") -> BalanceSeries | None:
+    """Net position from the first entry or transaction up to today, or None if there are no entries."""
+    if not all_entries:
+        return None
+    start = min(e.date_incurred for e in all_entries)
+    if all_transactions:
+        start = min(start, min(t.date_paid for t in all_transactions))
+    return BalanceIndex(all_entries, all_transactions).series(start.astimezone().date(), date.today(), resolution)
+
+def filter_snapshot_outliers(snapshots) -> list[tuple[datetime, float]]:
+    """Drops snapshots more than 10x the median absolute net position, returning (date, value) points."""
+    abs_vals = sorted(abs(s.net_position) for s in snapshots if s.net_position != 0)
+    if not abs_vals:
+        return [(s.date_recorded, s.net_position) for s in snapshots]
+    median_abs = abs_vals[len(abs_vals) // 2]
+    threshold = max(median_abs * 10, 50000)  # at least 50k to avoid filtering real data
+    return [(s.date_recorded, s.net_position) for s in snapshots if abs(s.net_position) <= threshold]
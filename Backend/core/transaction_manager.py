@@ -3,6 +3,8 @@ from datetime import datetime, timezone
 from dataclasses import dataclass, field
 from typing import Optional
 
+from Backend.core.data_version import get_data_version, bump_data_version
+
 @dataclass
 class Transaction:
     entry_id: str
@@ -42,6 +44,8 @@ class Transaction:
 class TransactionManager:
     def __init__(self):
         self.transactions = []
+        self._entry_index = {}
+        self._entry_index_key = None
 
     def add_transaction(self, entry_id: str, amount: float, transaction_type: str, label: str, comments: Optional[str] = None, tags: Optional[list[str]] = None) -> Transaction:
         new_transaction = Transaction(
@@ -53,18 +57,50 @@ class TransactionManager:
             tags=tags if tags is not None else [],
         )
         self.transactions.append(new_transaction)
+        bump_data_version()
         return new_transaction
     
+    def add_transactions(self, transactions: list[Transaction]):
+        """Adds already-built transactions in one step, for batches."""
+        self.transactions.extend(transactions)
+        bump_data_version()
+
     def get_transactions_for_entry(self, entry_id: str) -> list[Transaction]:
         return [t for t in self.transactions if t.entry_id == entry_id]
 
+    def get_transactions_for_entry_by_date(self, entry_id: str) -> list[Transaction]:
+        """
+        An entry's transactions, newest first. Served from an index that is rebuilt once per data
+        version, so repeated lookups don't scan. The returned list is shared and must not be modified.
+        """
+        return self._get_entry_index().get(entry_id, [])
+
+    def _get_entry_index(self) -> dict[str, list[Transaction]]:
+        # The list itself is also checked, since some callers replace or extend it directly
+        key = (get_data_version(), id(self.transactions), len(self.transactions))
+        if key != self._entry_index_key:
+            index = {}
+            for t in self.transactions:
+                index.setdefault(t.entry_id, []).append(t)
+            for transactions in index.values():
+                transactions.sort(key=lambda t: t.date_paid, reverse=True)
+            self._entry_index = index
+            self._entry_index_key = key
+        return self._entry_index
+
     def get_all_transactions(self) -> list[Transaction]:
         return self.transactions
     
     def delete_transactions_by_entry_id(self, entry_id: str):
         """Deletes all transactions related to a parent entry."""
         self.transactions = [t for t in self.transactions if t.entry_id != entry_id]
+        bump_data_version()
 
     def delete_transaction_by_id(self, transaction_id: str):
         """Removes a single transaction by its own ID."""
-        self.transactions = [t for t in self.transactions if t.id != transaction_id]
\ No newline at end of file
+        self.transactions = [t for t in self.transactions if t.id != transaction_id]
+        bump_data_version()
+
+    def delete_transactions_by_id(self, transaction_ids: set[str]):
+        self.transactions = [t for t in self.transactions if t.id not in transaction_ids]
+        bump_data_version()
@@ -9,6 +9,8 @@ from Backend.core.net_worth_manager import NetWorthManager
 from Backend.core.summary_calculator import *
 from Backend.utils.financial_algorithms import suggest_snowball_priority, calculate_what_if_eta
 from Backend.core.ai_analyser import FinancialAnalyser
+from Backend.core.chat_session import ChatSession
+from Backend.core.data_version import bump_data_version
 
 storage_manager = StorageManager()
 ledger_manager = LedgerManager()
@@ -41,6 +43,7 @@ def handle_edit_tags_ui(item, tag_manager):
                             tag_to_add = standard_tags[num - 1]
                             if tag_to_add not in item.tags:
                                 item.tags.append(tag_to_add)
+                                bump_data_version()
                         else:
                             print(f"    Warning: Invalid number '{num}'.")
                     except ValueError:
@@ -53,6 +56,7 @@ def handle_edit_tags_ui(item, tag_manager):
                         formatted_tag = f"other:{custom_tag}"
                         if formatted_tag not in item.tags:
                             item.tags.append(formatted_tag)
+                            bump_data_version()
         elif tag_choice == '3':
             if not item.tags:
                 print("    There are no tags to remove.")
@@ -64,6 +68,7 @@ def handle_edit_tags_ui(item, tag_manager):
                 num = int(removal_input.strip())
                 if 1 <= num <= len(item.tags):
                     item.tags.pop(num - 1)
+                    bump_data_version()
             except (ValueError, IndexError):
                 print("    Warning: Invalid input.")
         elif tag_choice.lower() == 'c':
@@ -82,6 +87,7 @@ def update_entry_status(entry: LedgerEntry, transaction_manager: TransactionMana
         status_changed = True
         
     if status_changed:
+        bump_data_version()
         print(f"\n--- Status Update: '{entry.label}' has been marked as [{entry.status.upper()}]. ---")
 
 def _handle_get_tags(tag_manager: TagManager) -> list[str] | None:
@@ -281,6 +287,7 @@ def handle_clear_all_data(ledger_manager: LedgerManager, transaction_manager: Tr
         transaction_manager.transactions.clear()
         journal_manager.entries.clear()
         net_worth_manager.snapshots.clear()
+        bump_data_version()
         print("All data has been cleared.")
     else:
         print("Operation cancelled.")
@@ -319,17 +326,21 @@ def _edit_ledger_entry(ledger_manager: LedgerManager, transaction_manager: Trans
             new_label = get_string_input(f"Enter the new label for '{target_entry.label}'")
             if new_label is not None:
                 target_entry.label = new_label
+                ledger_manager.reindex_entry(target_entry)
+                bump_data_version()
                 print("Label updated successfully.")
         elif edit_choice == "2":
             new_amount = get_positive_float_input("Enter the new positive amount")
             if new_amount is not None:
                 target_entry.amount = new_amount
+                bump_data_version()
                 print("Amount updated successfully.")
                 update_entry_status(target_entry, transaction_manager)
         elif edit_choice == "3":
             new_comments = get_string_input("Enter new comments (press Enter to clear)", allow_empty=True)
             if new_comments is not None:
                 target_entry.comments = new_comments if new_comments else None
+                bump_data_version()
                 print("Comments updated successfully.")
         elif edit_choice == "4":
             handle_edit_tags_ui(target_entry, tag_manager)
@@ -371,12 +382,14 @@ def _edit_transaction(ledger_manager: LedgerManager, transaction_manager: Transa
             new_label = get_string_input(f"Enter new label for '{target_transaction.label}'")
             if new_label is not None:
                 target_transaction.label = new_label
+                bump_data_version()
                 print("Label updated.")
 
         elif edit_choice == "2":
             new_amount = get_positive_float_input("Enter new positive amount")
             if new_amount is not None:
                 target_transaction.amount = new_amount
+                bump_data_version()
                 print("Amount updated.")
                 parent_id = target_transaction.entry_id
                 parent_entry = ledger_manager.get_entry_by_id(parent_id)
@@ -387,6 +400,7 @@ def _edit_transaction(ledger_manager: LedgerManager, transaction_manager: Transa
             new_comments = get_string_input("Enter new comments (press Enter to clear)", allow_empty=True)
             if new_comments is not None:
                 target_transaction.comments = new_comments if new_comments else None
+                bump_data_version()
                 print("Comments updated.")
 
         elif edit_choice == "4":
@@ -498,6 +512,7 @@ def handle_ai_chat(analyser: FinancialAnalyser, ledger_manager: LedgerManager, t
 
     all_entries = ledger_manager.get_all_entries()
     all_transactions = transaction_manager.get_all_transactions()
+    session = ChatSession(analyser)
     
     while True:
         user_question = input("\nYou: ")
@@ -506,18 +521,17 @@ def handle_ai_chat(analyser: FinancialAnalyser, ledger_manager: LedgerManager, t
             print("AI Assistant: Goodbye!")
             break
 
-        ai_response = analyser.answer_user_question(user_question, all_entries, all_transactions)
+        ai_response = session.reply(user_question, all_entries, all_transactions)
 
         print(f"\nAI Assistant: {ai_response}")
 
 def _find_target_entry_with_disambiguation(ledger_manager: LedgerManager, target_label_guess: str) -> LedgerEntry | None:
-    """Finds a target entry using a word-based fuzzy search, asking for clarification if needed."""
+    """Finds a target entry using the fuzzy label index, asking for clarification if needed."""
     if not target_label_guess:
         print("AI did not specify a target for the command (e.g., 'car loan').")
         return None
 
-    search_words = set(target_label_guess.lower().split())
-    possible_targets = [e for e in ledger_manager.get_all_entries() if e.status == 'active' and search_words.intersection(set(e.label.lower().split()))]
+    possible_targets = [m.entry for m in ledger_manager.get_label_index().resolve(target_label_guess, active_only=True)]
 
     if not possible_targets:
         print(f"Sorry, I couldn't find any active entry related to '{target_label_guess}'.")
@@ -0,0 +1,182 @@
+"""
+Timings for the app's local fast paths and its AI round trips (against the
+local mock server in Backend/utils/mock_openrouter.py), run by hand with:
+
+    python -m Backend.utils.benchmarks
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from Backend.core.ai_analyser import FinancialAnalyser
+from Backend.core.batch_executor import apply_transactions
+from Backend.core.command_parser import parse_command_locally
+from Backend.core.data_version import bump_data_version
+from Backend.core.label_index import LabelIndex
+from Backend.core.ledger_manager import LedgerEntry, LedgerManager
+from Backend.core.response_cache import ResponseCache
+from Backend.core.statement_importer import ColumnMapping, read_statement, match_lines, build_transactions
+from Backend.core.transaction_manager import Transaction, TransactionManager
+from Backend.utils.mock_openrouter import MockOpenRouterServer, MockSettings
+
+# Command bar phrasings timed through the local parser: ones it handles and ones it leaves to the AI.
+# Whether each is parsed correctly is checked by tests/test_command_parser.py.
+TIMED_COMMANDS = [
+    "add a $50 debt for groceries",
+    "I lent Mike $40",
+    "paid $100 on my car loan",
+    "Sarah paid me back $30",
+    "show all debts",
+    "paid $20 on visa\npaid $35.50 on car loan\n\nI lent Mike $40",
+    "I received a $100 repayment for the money I lent to John",
+    "what should I pay off first?",
+]
+
+
+def time_command_parser(repeats: int = 2000) -> float:
+    """Mean time in microseconds to parse one of TIMED_COMMANDS locally."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for command in TIMED_COMMANDS:
+            parse_command_locally(command)
+    return (time.perf_counter() - start) / (repeats * len(TIMED_COMMANDS)) * 1e6
+
+
+def time_label_index(entry_count: int = 100_000, queries: int = 500) -> dict:
+    """
+    Builds a LabelIndex over `entry_count` synthetic labels and times exact lookups and lookups
+    with a typo. Returns the build time in seconds and mean query times in milliseconds.
+    """
+    rng = random.Random(42)
+    syllables = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiou"]
+    kinds = ["loan", "debt", "card", "bill", "rent", "car", "phone", "credit", "personal", "mortgage"]
+    entries = [LedgerEntry(label=f"{''.join(rng.choices(syllables, k=rng.randint(2, 4))).title()} "
+                                 f"{rng.choice(kinds)} {rng.choice(kinds)}", amount=1.0, entry_type="debt")
+               for _ in range(entry_count)]
+    start = time.perf_counter()
+    index = LabelIndex(entries)
+    timings = {"build_s": time.perf_counter() - start}
+
+    labels = [rng.choice(entries).label for _ in range(queries)]
+    typos = [" ".join([words[0][:-1]] + words[1:]) for words in (label.split() for label in labels)]
+    for name, batch in (("exact_ms", labels), ("typo_ms", typos)):
+        start = time.perf_counter()
+        for query in batch:
+            index.resolve(query)
+        timings[name] = (time.perf_counter() - start) / len(batch) * 1000
+    return timings
+
+
+def time_statement_import(line_count: int = 100_000) -> dict:
+    """
+    Writes a synthetic bank statement with `line_count` lines, about a third of them paying
+    ledger entries, then times reading, matching and committing it, and matching it a second
+    time, when every line is a duplicate. Returns the times in seconds and the line counts.
+    """
+    rng = random.Random(3)
+    ledger_manager, transaction_manager = LedgerManager(), TransactionManager()
+    ledger_manager.add_entries([LedgerEntry(label=label, amount=1e9, entry_type=entry_type) for label, entry_type in
+                                (("Visa Credit Card", "debt"), ("Car Loan", "debt"), ("Loan to Sarah", "loan"))])
+    ledger_manager.add_entries([LedgerEntry(label=f"Entry {i}", amount=100.0, entry_type="debt") for i in range(1000)])
+    targets = [("BPAY VISA CREDIT CARD", -1), ("DIRECT DEBIT CAR LOAN", -1), ("TRANSFER FROM SARAH LOAN", 1)]
+    merchants = [(f"EFTPOS {shop} {city}", -1) for shop in ("WOOLWORTHS", "COLES", "SHELL", "KMART", "BUNNINGS")
+                 for city in ("SYDNEY", "MELBOURNE", "PERTH")]
+    start = datetime(2025, 1, 1)
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "statement.csv")
+        with open(path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Date", "Description", "Debit", "Credit"])
+            for _ in range(line_count):
+                description, sign = rng.choice(targets) if rng.random() < 0.3 else rng.choice(merchants)
+                amount = f"{rng.uniform(1, 500):,.2f}"
+                writer.writerow([(start + timedelta(days=rng.randint(0, 364))).strftime("%d/%m/%Y"),
+                                 f"{description} {rng.randint(1000, 99999)}", amount if sign < 0 else "", amount if sign > 0 else ""])
+        mapping = ColumnMapping(amount=None, debit="Debit", credit="Credit")
+        began = time.perf_counter()
+        statement = read_statement(path, mapping)
+        timings["read_s"] = time.perf_counter() - began
+        began = time.perf_counter()
+        match_lines(statement, ledger_manager, transaction_manager)
+        timings["match_s"] = time.perf_counter() - began
+        began = time.perf_counter()
+        apply_transactions(build_transactions(statement.to_import), ledger_manager, transaction_manager)
+        timings["commit_s"] = time.perf_counter() - began
+        timings["imported"] = len(statement.to_import)
+        again = read_statement(path, mapping)
+        began = time.perf_counter()
+        match_lines(again, ledger_manager, transaction_manager)
+        timings["rematch_s"] = time.perf_counter() - began
+        timings["duplicates"] = again.duplicates
+    return timings
+
+
+def _synthetic_ledger(entry_count: int, transaction_count: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    entries = [LedgerEntry(label=f"Entry {i}", amount=rng.uniform(100, 20000), entry_type=rng.choice(("debt", "loan")),
+                           date_incurred=now - timedelta(days=rng.randint(0, 1000)), tags=[rng.choice(("Car", "Card", "Personal"))])
+               for i in range(entry_count)]
+    transactions = [Transaction(entry_id=rng.choice(entries).id, transaction_type="payment", amount=rng.uniform(5, 200),
+                                label="Payment", date_paid=now - timedelta(days=rng.randint(0, 1000)))
+                    for _ in range(transaction_count)]
+    return entries, transactions
+
+
+def time_ai_round_trips(settings: MockSettings | None = None, calls: int = 5,
+                        entry_count: int = 500, transaction_count: int = 20_000) -> dict:
+    """
+    Runs generate_insights, answer_user_question and parse_command_to_json against the local mock
+    server. Each call's mean time is split into building the financial context and the rest:
+    the request, any retries, and reading the reply. The data version is bumped before every
+    call, so the context is always built from scratch. Times are in milliseconds.
+    """
+    server = MockOpenRouterServer(settings=settings or MockSettings(latency=0.05, seed=1)).start()
+    analyser = FinancialAnalyser(api_key="mock", cache=ResponseCache(enabled=False), base_url=server.base_url)
+    entries, transactions = _synthetic_ledger(entry_count, transaction_count, random.Random(7))
+    cases = {
+        "generate_insights": (lambda: analyser.generate_insights(entries, transactions), True),
+        "answer_user_question": (lambda: analyser.answer_user_question("Which debt should I pay off first?", entries, transactions), True),
+        # Phrased so the local parser leaves it to the AI
+        "parse_command_to_json": (lambda: analyser.parse_command_to_json("put half my bonus toward whatever costs me most"), False),
+    }
+    results = {}
+    try:
+        for name, (call, uses_context) in cases.items():
+            context_ms = total_ms = 0.0
+            for _ in range(calls):
+                if uses_context:
+                    bump_data_version()
+                    start = time.perf_counter()
+                    analyser._create_financial_context_string(entries, transactions)
+                    context_ms += (time.perf_counter() - start) * 1000
+                bump_data_version()
+                start = time.perf_counter()
+                call()
+                total_ms += (time.perf_counter() - start) * 1000
+            results[name] = {"total_ms": total_ms / calls, "context_ms": context_ms / calls,
+                             "network_ms": (total_ms - context_ms) / calls}
+    finally:
+        server.stop()
+    results["server"] = dict(server.stats)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Command parser: {time_command_parser():.1f} us per command")
+    label_timings = time_label_index()
+    print(f"Label index: built over 100k entries in {label_timings['build_s']:.2f} s, "
+          f"{label_timings['exact_ms']:.3f} ms per exact lookup, {label_timings['typo_ms']:.3f} ms per lookup with a typo")
+    import_timings = time_statement_import()
+    print(f"Statement import: 100k lines read in {import_timings['read_s']:.2f} s, matched in {import_timings['match_s']:.2f} s, "
+          f"{import_timings['imported']:,} committed in {import_timings['commit_s']:.2f} s; "
+          f"re-import found {import_timings['duplicates']:,} duplicates in {import_timings['rematch_s']:.2f} s")
+    for name, timing in time_ai_round_trips().items():
+        if name == "server":
+            print(f"Mock server: {timing}")
+        else:
+            print(f"{name}: {timing['total_ms']:.1f} ms per call ({timing['context_ms']:.1f} ms context, "
+                  f"{timing['network_ms']:.1f} ms request and reply)")
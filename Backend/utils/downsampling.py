@@ -0,0 +1,46 @@
+import numpy as np
+
+# Below this many output points LTTB has nothing to choose between
+MIN_DOWNSAMPLE_POINTS = 3
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduces a series to at most `threshold` points with Largest-Triangle-Three-Buckets. The
+    first and last points are always kept. Each bucket in between keeps the point forming the
+    largest triangle with the previously kept point and the next bucket's average, so peaks
+    and troughs survive.
+    x must be sorted ascending.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < MIN_DOWNSAMPLE_POINTS:
+        return x, y
+
+    # Bucket boundaries for the n - 2 interior points, plus a final bucket holding only the last point
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    edges[-1] = n - 1
+    bounds = np.append(edges, n)
+    counts = np.diff(bounds)
+    averages_x = np.add.reduceat(x, bounds[:-1]) / counts
+    averages_y = np.add.reduceat(y, bounds[:-1]) / counts
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - averages_x[i + 1]) * (y[start:end] - ay) - (ax - x[start:end]) * (averages_y[i + 1] - ay))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return x[selected], y[selected]
+
+
+def visible_range(x: np.ndarray, x_min: float, x_max: float) -> slice:
+    """The slice of a sorted series inside [x_min, x_max], plus one point either side so lines run off the edges."""
+    start = max(int(np.searchsorted(x, x_min, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    return slice(start, stop)
@@ -1,8 +1,16 @@
 from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
 from Backend.core.ledger_manager import LedgerEntry
 from Backend.core.transaction_manager import Transaction
 from Backend.core.summary_calculator import calculate_balance_for_entry
+from Backend.core.data_version import memoize_on_data_version
+
+AVG_DAYS_PER_MONTH = 30.44
 
+@memoize_on_data_version(maxsize=16)
 def suggest_snowball_priority(active_debts: list[LedgerEntry], all_transactions: list[Transaction]) -> LedgerEntry | None:
     """
     Analyzes active debts and suggests which to pay off first using the Snowball method.
@@ -41,10 +49,142 @@ def calculate_what_if_eta(all_entries, all_transactions, extra_monthly_payment:
         return "Extra payment must be positive to calculate a new ETA."
 
     months_to_go = total_debt_balance / extra_monthly_payment
-    days_to_go = months_to_go * 30.44 # Average days in a month
+    days_to_go = months_to_go * AVG_DAYS_PER_MONTH
 
     today = datetime.now(timezone.utc)
     freedom_date = today + timedelta(days=days_to_go)
     formatted_date = freedom_date.strftime("%b %d, %Y")
     
-    return f"Hypothetical Debt-Free Date: {formatted_date}"
\ No newline at end of file
+    return f"Hypothetical Debt-Free Date: {formatted_date}"
+
+# --- Monte Carlo What-If Simulation ---
+
+MONTE_CARLO_MAX_MONTHS = 600
+MONTE_CARLO_CHUNK_SIZE = 5000
+MONTE_CARLO_POOL_THRESHOLD = 20000
+FAN_CHART_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Compared by identity: field-wise equality would be ambiguous with numpy arrays
+@dataclass(eq=False)
+class MonteCarloResult:
+    starting_balance: float
+    extra_monthly_payment: float
+    num_paths: int
+    history_months: int
+    payoff_month_percentiles: dict[int, float]
+    debt_free_dates: dict[int, datetime | None]
+    balance_bands: np.ndarray
+    paid_off_ratio: float
+
+def get_monthly_payment_history(all_entries: list[LedgerEntry], all_transactions: list[Transaction]) -> np.ndarray:
+    """Returns the total paid against debts for each calendar month, with quiet months included as zero."""
+    debt_ids = {e.id for e in all_entries if e.entry_type == 'debt'}
+    monthly_totals = {}
+    for t in all_transactions:
+        if t.entry_id in debt_ids and t.transaction_type == 'payment':
+            key = (t.date_paid.year, t.date_paid.month)
+            monthly_totals[key] = monthly_totals.get(key, 0.0) + t.amount
+
+    if not monthly_totals:
+        return np.zeros(0)
+
+    first_year, first_month = min(monthly_totals)
+    last_year, last_month = max(monthly_totals)
+    history = np.zeros((last_year - first_year) * 12 + (last_month - first_month) + 1)
+    for (year, month), amount in monthly_totals.items():
+        history[(year - first_year) * 12 + (month - first_month)] = amount
+    return history
+
+def _simulate_payoff_chunk(history: np.ndarray, balance: float, extra_monthly_payment: float, num_paths: int, max_months: int, seed) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simulates one chunk of payoff paths. Module-level so it can run in a worker process.
+    Returns the payoff month of each path and the per-month balance percentiles for the chunk.
+    """
+    rng = np.random.default_rng(seed)
+    if history.size:
+        payments = rng.choice(history, size=(num_paths, max_months)) + extra_monthly_payment
+    else:
+        payments = np.full((num_paths, max_months), extra_monthly_payment)
+
+    remaining = balance - np.cumsum(payments, axis=1)
+    np.maximum(remaining, 0.0, out=remaining)
+
+    paid_off = remaining <= 0
+    payoff_months = np.where(paid_off.any(axis=1), paid_off.argmax(axis=1) + 1, max_months + 1)
+
+    bands = np.percentile(remaining, FAN_CHART_PERCENTILES, axis=0)
+    bands = np.hstack([np.full((len(FAN_CHART_PERCENTILES), 1), balance), bands])
+    return payoff_months, bands
+
+def run_monte_carlo_what_if(all_entries: list[LedgerEntry], all_transactions: list[Transaction], extra_monthly_payment: float,
+                            num_paths: int = MONTE_CARLO_POOL_THRESHOLD, seed: int | None = None,
+                            progress_callback=None, is_cancelled=None) -> MonteCarloResult | None:
+    """
+    Stochastic version of calculate_what_if_eta. Each simulated month pays an amount drawn from the
+    user's own monthly payment history plus the extra payment. Large runs are split across a process pool.
+    Returns None if there is nothing to simulate or the run was cancelled.
+    """
+    debt_entries = [e for e in all_entries if e.entry_type == 'debt']
+    balance = sum(calculate_balance_for_entry(d, all_transactions) for d in debt_entries)
+    if balance <= 0:
+        return None
+
+    history = get_monthly_payment_history(all_entries, all_transactions)
+    if extra_monthly_payment <= 0 and not history.any():
+        return None
+
+    chunk_sizes = [MONTE_CARLO_CHUNK_SIZE] * (num_paths // MONTE_CARLO_CHUNK_SIZE)
+    if num_paths % MONTE_CARLO_CHUNK_SIZE:
+        chunk_sizes.append(num_paths % MONTE_CARLO_CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    chunk_args = [(history, balance, extra_monthly_payment, size, MONTE_CARLO_MAX_MONTHS, s) for size, s in zip(chunk_sizes, seeds)]
+
+    results = []
+    if num_paths >= MONTE_CARLO_POOL_THRESHOLD and len(chunk_args) > 1:
+        executor = ProcessPoolExecutor()
+        try:
+            futures = {executor.submit(_simulate_payoff_chunk, *args): args[3] for args in chunk_args}
+            for future in as_completed(futures):
+                if is_cancelled and is_cancelled():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return None
+                results.append((futures[future], *future.result()))
+                if progress_callback:
+                    progress_callback(len(results), len(chunk_args))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        for args in chunk_args:
+            if is_cancelled and is_cancelled():
+                return None
+            results.append((args[3], *_simulate_payoff_chunk(*args)))
+            if progress_callback:
+                progress_callback(len(results), len(chunk_args))
+
+    payoff_months = np.concatenate([months for _, months, _ in results])
+    weights = np.array([size for size, _, _ in results], dtype=float)
+    # Chunk percentiles are merged by a path-weighted mean, which is close enough for a fan chart.
+    balance_bands = np.tensordot(weights / weights.sum(), np.stack([bands for _, _, bands in results]), axes=1)
+
+    today = datetime.now(timezone.utc)
+    month_percentiles = {}
+    debt_free_dates = {}
+    for p in (10, 50, 90):
+        months = float(np.percentile(payoff_months, p))
+        month_percentiles[p] = months
+        if months > MONTE_CARLO_MAX_MONTHS:
+            debt_free_dates[p] = None
+        else:
+            debt_free_dates[p] = today + timedelta(days=months * AVG_DAYS_PER_MONTH)
+
+    return MonteCarloResult(
+        starting_balance=balance,
+        extra_monthly_payment=extra_monthly_payment,
+        num_paths=num_paths,
+        history_months=int(history.size),
+        payoff_month_percentiles=month_percentiles,
+        debt_free_dates=debt_free_dates,
+        balance_bands=balance_bands,
+        paid_off_ratio=float(np.mean(payoff_months <= MONTE_CARLO_MAX_MONTHS)),
+    )
+
@@ -0,0 +1,186 @@
+"""
+A local stand-in for OpenRouter's chat completions endpoint, for testing and benchmarking the AI
+features without the real service or an API key. Run it with:
+
+    python -m Backend.utils.mock_openrouter --port 8765 --latency 0.3 --error-rate 0.1
+
+then set "ai_base_url" to "http://127.0.0.1:8765/api/v1" in the config file.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_REPORT = (
+    "### Financial Summary\nThis is a canned report from the local mock server.\n\n"
+    "### Key Observation\nYour prompt was {words} words long.\n\n"
+    "### Actionable Suggestion\nPoint ai_base_url back at OpenRouter for real analysis."
+)
+MOCK_COMMANDS = {"commands": [{"action": "unknown", "payload": {"reason": "The mock server doesn't parse commands."}}]}
+
+
+@dataclass
+class MockSettings:
+    latency: float = 0.2
+    # Each response's latency varies by up to this much either way
+    jitter: float = 0.0
+    # Share of requests answered with a 500 or 503
+    error_rate: float = 0.0
+    # Every burst_every-th request starts a run of burst_length 429 responses; 0 turns bursts off
+    burst_every: int = 0
+    burst_length: int = 2
+    retry_after: float | None = 1.0
+    # Gap between streamed words
+    token_delay: float = 0.02
+    seed: int | None = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockOpenRouterServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"No route for {self.path}"}})
+            return
+        request = json.loads(body or b"{}")
+        outcome = self.server.next_outcome()
+        if outcome == 429:
+            headers = {"Retry-After": f"{self.server.settings.retry_after:g}"} if self.server.settings.retry_after is not None else {}
+            self._send_json(429, {"error": {"message": "Rate limited by the mock server"}}, headers)
+            return
+        if outcome != 200:
+            self._send_json(outcome, {"error": {"message": "Simulated failure from the mock server"}})
+            return
+
+        time.sleep(self.server.response_latency())
+        if "response_format" in request:
+            content = json.dumps(MOCK_COMMANDS)
+        else:
+            words = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+            content = MOCK_REPORT.format(words=words)
+        # Word counts stand in for token counts
+        usage = {"prompt_tokens": len(json.dumps(request.get("messages", [])).split()), "completion_tokens": len(content.split())}
+        if request.get("stream"):
+            self._stream(content, usage)
+        else:
+            self._send_json(200, {"choices": [{"message": {"role": "assistant", "content": content}}], "usage": usage})
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, content, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            self._chunk(b": OPENROUTER PROCESSING\n\n")
+            for i, word in enumerate(content.split(" ")):
+                if i:
+                    time.sleep(self.server.settings.token_delay)
+                event = {"choices": [{"delta": {"content": word if i == 0 else f" {word}"}}]}
+                self._chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            # Like OpenRouter, the usage arrives in a last event with no choices
+            self._chunk(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n".encode("utf-8"))
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early, as a cancelled request does
+            self.server.count("aborted")
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockOpenRouterServer(ThreadingHTTPServer):
+    """A chat completions server with configurable latency, failures, 429 bursts and streaming."""
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, settings: MockSettings | None = None):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.settings = settings or MockSettings()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "aborted": 0}
+        self._random = random.Random(self.settings.seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def next_outcome(self) -> int:
+        """The status code for the next request: 429 inside a burst, sometimes 500/503, otherwise 200."""
+        settings = self.settings
+        with self._lock:
+            number = self.stats["requests"]
+            self.stats["requests"] += 1
+            if settings.burst_every and number % settings.burst_every < settings.burst_length:
+                outcome = 429
+            elif self._random.random() < settings.error_rate:
+                outcome = self._random.choice((500, 503))
+            else:
+                outcome = 200
+            self.stats[{429: "throttled", 200: "ok"}.get(outcome, "errors")] += 1
+        return outcome
+
+    def response_latency(self) -> float:
+        with self._lock:
+            offset = self._random.uniform(-self.settings.jitter, self.settings.jitter)
+        return max(0.0, self.settings.latency + offset)
+
+    def start(self):
+        """Serves requests on a background thread until stop() is called."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A local stand-in for OpenRouter's chat completions API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency varies by up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that get a 500 or 503")
+    parser.add_argument("--burst-every", type=int, default=0, help="start a run of 429s every N requests")
+    parser.add_argument("--burst-length", type=int, default=2, help="how many 429s each run has")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed words")
+    args = parser.parse_args()
+
+    server = MockOpenRouterServer(args.port, MockSettings(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, burst_every=args.burst_every,
+        burst_length=args.burst_length, token_delay=args.token_delay,
+    ))
+    print(f"Mock OpenRouter listening. Set \"ai_base_url\" to \"{server.base_url}\" in the config file.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
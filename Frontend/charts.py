@@ -0,0 +1,353 @@
+import numpy as np
+from PyQt6.QtCore import QSize
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas, NavigationToolbar2QT
+from matplotlib.dates import date2num
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+
+from Backend.utils.downsampling import lttb_downsample, visible_range, MIN_DOWNSAMPLE_POINTS
+
+CHART_BACKGROUND = '#3b4252'
+LEGEND_STYLE = dict(labelcolor='white', facecolor=CHART_BACKGROUND, edgecolor='#4c566a')
+
+# Above this many points the net position line drops its markers
+MAX_MARKED_POINTS = 60
+
+
+class ChartCanvas(FigureCanvas):
+    """A figure canvas that holds back redraws while hidden and catches up when shown."""
+    def __init__(self, figure):
+        super().__init__(figure)
+        self.draw_deferred = False
+
+    def request_draw(self):
+        if self.isVisible():
+            self.draw_idle()
+        else:
+            self.draw_deferred = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.draw_deferred:
+            self.draw_deferred = False
+            self.draw_idle()
+
+
+class DashboardChart:
+    """
+    One dashboard chart whose artists are created once and updated in place. refresh() only
+    touches the artists, and only draws, when the key describing its inputs changes.
+
+    Artists that change with the data are animated and drawn over a cached background, so an
+    update that leaves the axes alone is a blit rather than a full redraw of ticks and text.
+    """
+    def __init__(self, title, **subplot_margins):
+        self.figure = Figure(facecolor=CHART_BACKGROUND)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_facecolor(CHART_BACKGROUND)
+        self.ax.set_title(title, color='white')
+        self.figure.subplots_adjust(**subplot_margins)
+        self.canvas = ChartCanvas(self.figure)
+        self.message = self.ax.text(0.5, 0.5, '', ha='center', va='center', color='gray',
+                                    transform=self.ax.transAxes, visible=False, animated=True)
+        # Off except inside _rescale, so plotting calls can't queue an autoscale that moves the view
+        self.ax.set_autoscale_on(False)
+        self._key = None
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def dynamic_artists(self) -> list:
+        """The animated artists that blits redraw over the background."""
+        return [self.message]
+
+    def _static_state(self) -> tuple:
+        """Everything baked into the background; a blit is only valid while this is unchanged."""
+        return (tuple(self.ax.viewLim.bounds), self.ax.xaxis.get_visible(), self.ax.yaxis.get_visible())
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_dynamic()
+
+    def _draw_dynamic(self):
+        for artist in self.dynamic_artists():
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+    def _style_axes(self):
+        self.ax.tick_params(axis='x', colors='white')
+        self.ax.tick_params(axis='y', colors='white')
+        self.ax.spines['bottom'].set_color('#d8dee9')
+        self.ax.spines['left'].set_color('#d8dee9')
+        self.ax.spines['top'].set_color('#2e3440')
+        self.ax.spines['right'].set_color('#2e3440')
+
+    def refresh(self, key, update) -> bool:
+        """Calls update() and queues a draw if key differs from the last refresh's key."""
+        if self._key is not None and key == self._key:
+            return False
+        self._key = key
+        static_state = self._static_state()
+        update()
+        if self._background is not None and self.canvas.isVisible() and self._static_state() == static_state:
+            self.canvas.restore_region(self._background)
+            self._draw_dynamic()
+            self.canvas.blit(self.figure.bbox)
+        else:
+            self._background = None
+            self.canvas.request_draw()
+        return True
+
+    def _swap_fill(self, fill, *args, **kwargs):
+        """Replaces a fill_between collection, since its polygons can't be reshaped in place."""
+        if fill is not None:
+            fill.remove()
+        return self.ax.fill_between(*args, animated=True, **kwargs)
+
+    def _rescale(self, *fills, baseline=None):
+        """
+        Autoscales only when the data has left the current view or shrunk to under half of it,
+        so small changes keep the same ticks and can be blitted. `baseline` adds a y value the
+        view must include, such as the zero line a fill is drawn down to.
+        """
+        # relim() ignores collections, so add the fills' extents back before autoscaling
+        self.ax.relim()
+        for fill in fills:
+            if fill is not None:
+                self.ax.update_datalim(fill.get_datalim(self.ax.transData))
+        if baseline is not None:
+            self.ax.update_datalim([(self.ax.dataLim.x0, baseline)])
+        data, view = self.ax.dataLim, self.ax.viewLim
+        fits = (view.x0 <= data.x0 <= data.x1 <= view.x1 and view.y0 <= data.y0 <= data.y1 <= view.y1 and
+                data.width >= view.width / 2 and data.height >= view.height / 2)
+        if not fits:
+            self.ax.set_autoscale_on(True)
+            self.ax.autoscale_view()
+            self.ax.set_autoscale_on(False)
+
+
+class BalancePieChart(DashboardChart):
+    COLORS = ('#bf616a', '#a3be8c')
+    LABELS = ('Total Debt', 'Total Loans')
+    START_ANGLE = 90
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
+    def __init__(self):
+        super().__init__('Debt vs. Loans Balance', left=0.05, right=0.70, top=0.88, bottom=0.05)
+        self.wedges, self.labels, self.pct_texts = self.ax.pie(
+            [1, 1], labels=self.LABELS, autopct='%1.1f%%', startangle=self.START_ANGLE,
+            colors=self.COLORS, textprops={'color': 'white'},
+            labeldistance=self.LABEL_DISTANCE, pctdistance=self.PCT_DISTANCE,
+        )
+        for artist in (*self.wedges, *self.labels, *self.pct_texts):
+            artist.set_animated(True)
+
+    def dynamic_artists(self):
+        return [*self.wedges, *self.labels, *self.pct_texts, self.message]
+
+    def show_balances(self, debt_balance, loan_balance):
+        total = debt_balance + loan_balance
+        has_data = debt_balance > 0 or loan_balance > 0
+        for artist in (*self.wedges, *self.labels, *self.pct_texts):
+            artist.set_visible(has_data)
+        self.message.set_text('No Data')
+        self.message.set_visible(not has_data)
+        if not has_data:
+            return
+
+        # Same geometry as Axes.pie: counter-clockwise from the start angle
+        theta = self.START_ANGLE
+        for wedge, label, pct_text, value in zip(self.wedges, self.labels, self.pct_texts, (debt_balance, loan_balance)):
+            fraction = value / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + 360 * fraction)
+            middle = np.deg2rad(theta + 180 * fraction)
+            x, y = np.cos(middle), np.sin(middle)
+            label.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct_text.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            pct_text.set_text(f"{100 * fraction:1.1f}%")
+            theta += 360 * fraction
+
+
+class TotalsBarChart(DashboardChart):
+    CATEGORIES = ('Debts', 'Loans')
+    BAR_WIDTH = 0.35
+
+    def __init__(self):
+        super().__init__('Totals vs. Payments', left=0.18, right=0.95, top=0.88, bottom=0.30)
+        self._style_axes()
+        x = np.arange(len(self.CATEGORIES))
+        self.total_bars = self.ax.bar(x - self.BAR_WIDTH / 2, [0, 0], self.BAR_WIDTH, label='Total Incurred/Loaned', color='#d08770')
+        self.paid_bars = self.ax.bar(x + self.BAR_WIDTH / 2, [0, 0], self.BAR_WIDTH, label='Total Paid/Repaid', color='#a3be8c')
+        self.ax.set_ylabel('Amount (AUD)', color='white')
+        self.ax.set_xticks(x, self.CATEGORIES)
+        self.ax.legend(bbox_to_anchor=(0.5, -0.1), loc='upper center', **LEGEND_STYLE)
+        for bar in (*self.total_bars, *self.paid_bars):
+            bar.set_animated(True)
+
+    def dynamic_artists(self):
+        return [*self.total_bars, *self.paid_bars, self.message]
+
+    def show_totals(self, totals, paids):
+        for bar, height in zip((*self.total_bars, *self.paid_bars), (*totals, *paids)):
+            bar.set_height(height)
+        self._rescale()
+
+
+class ChartToolbar(NavigationToolbar2QT):
+    """Matplotlib's toolbar cut down to its view controls. Home re-fits the chart to all of its data."""
+    toolitems = [item for item in NavigationToolbar2QT.toolitems if item[0] in ('Home', 'Back', 'Forward', 'Pan', 'Zoom')]
+
+    def __init__(self, chart, parent=None):
+        super().__init__(chart.canvas, parent, coordinates=False)
+        self.setIconSize(QSize(16, 16))
+        self.chart = chart
+
+    def home(self, *args):
+        self.chart.reset_view()
+        # The saved views are relative to data that may since have changed, so start a fresh history
+        self.update()
+        self.canvas.draw_idle()
+
+
+class NetPositionLineChart(DashboardChart):
+    """
+    The net position line, cut down with LTTB to about one point per horizontal pixel of the
+    x-range on screen. Resizing, zooming and panning re-fetch detail from the full series.
+    """
+    COLOR = '#88c0d0'
+
+    def __init__(self):
+        super().__init__('Net Position Over Time', left=0.08, right=0.97, top=0.90, bottom=0.18)
+        self._style_axes()
+        self.ax.xaxis_date()
+        self.line, = self.ax.plot([], [], color=self.COLOR, linewidth=2, animated=True)
+        self.fill = None
+        self.figure.autofmt_xdate()
+        self.toolbar = None
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._markersize = 4
+        self._user_view = False
+        self._updating_view = False
+        self.ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        self.canvas.mpl_connect('resize_event', self._on_view_changed)
+
+    def create_toolbar(self, parent=None) -> ChartToolbar:
+        self.toolbar = ChartToolbar(self, parent)
+        return self.toolbar
+
+    def dynamic_artists(self):
+        return [self.fill, self.line, self.message] if self.fill is not None else [self.line, self.message]
+
+    def show_series(self, dates, values, markersize=4):
+        x = np.asarray(date2num(dates), dtype=float)
+        y = np.asarray(values, dtype=float)
+        # Snapshots come newest first, and the visible-range search needs ascending dates
+        order = np.argsort(x, kind='stable')
+        self._x, self._y = x[order], y[order]
+        self._markersize = markersize
+        self._set_axes_visible(True)
+        # Keep a view the user zoomed or panned to; otherwise fit the full series
+        self._update_view(fit=not self._user_view)
+
+    def show_message(self, text):
+        self._x = self._y = np.empty(0)
+        self.line.set_data([], [])
+        if self.fill is not None:
+            self.fill.remove()
+            self.fill = None
+        self._set_axes_visible(False, text)
+
+    def reset_view(self):
+        """Drops any zoom or pan and fits the view to the full series again."""
+        self._user_view = False
+        if len(self._x):
+            self._update_view(fit=True)
+
+    def _on_view_changed(self, *args):
+        # An active pan or zoom tool means the view change came from the user
+        if self.toolbar is not None and self.toolbar.mode:
+            self._user_view = True
+        if len(self._x) and not self._updating_view:
+            self._update_view(fit=False)
+
+    def _update_view(self, fit):
+        """
+        Optionally fits the view to the full series, then downsamples the part inside the
+        x-limits to the axes' pixel width. Limit changes made here don't call back into it,
+        since a new fill queues an autoscale that would set the limits again.
+        """
+        self._updating_view = True
+        try:
+            if fit:
+                self.line.set_data(self._x, self._y)
+                self._rescale(baseline=0.0)
+            visible = visible_range(self._x, *self.ax.get_xlim())
+            threshold = max(int(self.ax.bbox.width), MIN_DOWNSAMPLE_POINTS)
+            x, y = lttb_downsample(self._x[visible], self._y[visible], threshold)
+            self.line.set_data(x, y)
+            self.line.set_marker('o' if len(x) <= MAX_MARKED_POINTS else 'None')
+            self.line.set_markersize(self._markersize)
+            self.fill = self._swap_fill(self.fill, x, y, alpha=0.1, color=self.COLOR)
+        finally:
+            self._updating_view = False
+
+    def _set_axes_visible(self, visible, text=''):
+        self.line.set_visible(visible)
+        self.ax.xaxis.set_visible(visible)
+        self.ax.yaxis.set_visible(visible)
+        self.message.set_text(text)
+        self.message.set_visible(not visible)
+
+
+class WhatIfFanChart(DashboardChart):
+    COLOR = '#88c0d0'
+
+    def __init__(self):
+        super().__init__('What-If Forecast', left=0.14, right=0.95, top=0.90, bottom=0.18)
+        self._style_axes()
+        self.median_line, = self.ax.plot([], [], color=self.COLOR, linewidth=2, animated=True)
+        self.outer_fill = None
+        self.inner_fill = None
+        self.ax.set_xlabel('Months from today', color='white')
+        self.ax.set_ylabel('Debt Remaining (AUD)', color='white')
+        # Proxy handles, so the legend survives the fills being swapped out
+        self.legend = self.ax.legend(handles=[
+            Patch(color=self.COLOR, alpha=0.2, label='P10-P90'),
+            Patch(color=self.COLOR, alpha=0.35, label='P25-P75'),
+            Line2D([], [], color=self.COLOR, linewidth=2, label='Median'),
+        ], fontsize=8, **LEGEND_STYLE)
+
+    def dynamic_artists(self):
+        fills = [fill for fill in (self.outer_fill, self.inner_fill) if fill is not None]
+        return [*fills, self.median_line, self.message]
+
+    def _static_state(self):
+        return (*super()._static_state(), self.legend.get_visible())
+
+    def show_bands(self, months, bands):
+        """Draws the outer and inner percentile bands and the median from a 5-row band array."""
+        self.median_line.set_data(months, bands[2])
+        self.outer_fill = self._swap_fill(self.outer_fill, months, bands[0], bands[-1], alpha=0.2, color=self.COLOR)
+        self.inner_fill = self._swap_fill(self.inner_fill, months, bands[1], bands[-2], alpha=0.35, color=self.COLOR)
+        self._set_axes_visible(True)
+        self._rescale(self.outer_fill, self.inner_fill)
+
+    def show_message(self, text):
+        self.median_line.set_data([], [])
+        for fill in (self.outer_fill, self.inner_fill):
+            if fill is not None:
+                fill.remove()
+        self.outer_fill = self.inner_fill = None
+        self._set_axes_visible(False, text)
+
+    def _set_axes_visible(self, visible, text=''):
+        self.median_line.set_visible(visible)
+        self.legend.set_visible(visible)
+        self.ax.xaxis.set_visible(visible)
+        self.ax.yaxis.set_visible(visible)
+        self.message.set_text(text)
+        self.message.set_visible(not visible)
@@ -1,10 +1,10 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtGui import QAction, QFont, QKeySequence, QIcon
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QDate, QModelIndex, QThreadPool, QSortFilterProxyModel
 import copy
-from datetime import datetime, timezone
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+import html
+from collections import Counter, deque
+from datetime import datetime, date, timezone
 import numpy as np
 
 from Backend.core.ledger_manager import LedgerManager, LedgerEntry
@@ -13,11 +13,44 @@ from Backend.core.journal_manager import JournalManager
 from Backend.core.net_worth_manager import NetWorthManager
 from Backend.core.tag_manager import TagManager
 from Backend.storage.storage_manager import StorageManager
-from Backend.core.export_manager import export_data_to_csv
 from Backend.core.summary_calculator import *
 from Backend.utils.financial_algorithms import *
 from Backend.core.config_manager import save_config
-from Backend.core.ai_analyser import FinancialAnalyser
+from Backend.core.data_version import get_data_version, bump_data_version, get_cache_stats
+from Backend.core.ai_analyser import FinancialAnalyser, is_ai_error
+from Backend.core.chat_session import ChatSession
+from Backend.core.health_report import build_health_report
+from Backend.core.command_parser import parse_command_locally
+from Backend.core.batch_executor import apply_plan, apply_transactions
+from Backend.core.statement_importer import (
+    COMMON_DATE_FORMATS, ColumnMapping, read_statement_header, read_statement, match_lines, build_transactions,
+)
+from Backend.core.response_cache import ResponseCache
+from Backend.core.ai_telemetry import AiTelemetry, summarise_usage
+from Backend.core.ai_context import AI_CONTEXT_TOKEN_BUDGET
+from Frontend.charts import BalancePieChart, TotalsBarChart, NetPositionLineChart, WhatIfFanChart
+from Frontend.workers import MonteCarloWorker, CsvExportWorker, AiRequestWorker, AiStreamWorker, LedgerQuery, LedgerQueryTask, DashboardWorker, DashboardJob
+from Frontend.models import EntryListModel, HistoryListModel, TransactionListModel, EntryRole, LabelSortRole, TransactionRole
+
+# How long the ledger search waits for typing to pause before querying
+LEDGER_SEARCH_DEBOUNCE_MS = 200
+
+# Plans longer than this are listed under the confirmation box's details instead of in it
+PLAN_PREVIEW_STEPS = 15
+
+# Batches settling more entries than this list the rest under the message box's details
+PAYOFF_PREVIEW_ENTRIES = 10
+
+# How long closing the window waits for AI requests in flight
+AI_CLOSE_WAIT_MS = 2000
+
+# Which tabs (by index) show data from each manager, so a change only dirties those tabs
+DATA_SOURCE_TABS = {
+    'ledger': (0, 1, 2),
+    'transactions': (0, 1, 2),
+    'net_worth': (0,),
+    'journal': (3,),
+}
 
 # --- DIALOGS ---
 class ApiKeyDialog(QDialog):
@@ -177,6 +210,7 @@ class AiChatDialog(QDialog):
         self.ai_analyser = ai_analyser
         self.ledger_manager = ledger_manager
         self.transaction_manager = transaction_manager
+        self.chat_session = ChatSession(ai_analyser)
         self.setWindowTitle("AI Financial Chat")
         self.setMinimumSize(600, 500)
 
@@ -191,32 +225,189 @@ class AiChatDialog(QDialog):
         self.input_line.returnPressed.connect(self.send_message)
         send_btn = QPushButton("Send")
         send_btn.clicked.connect(self.send_message)
+        new_chat_btn = QPushButton("New Chat")
+        new_chat_btn.setToolTip("Forget the conversation so far and start again")
+        new_chat_btn.clicked.connect(self.new_chat)
         input_layout.addWidget(self.input_line)
         input_layout.addWidget(send_btn)
+        input_layout.addWidget(new_chat_btn)
         layout.addLayout(input_layout)
-        
+
+        # Shown while a question is being answered; later questions wait their turn
+        status_layout = QHBoxLayout()
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setMaximumHeight(10)
+        self.busy_bar.setTextVisible(False)
+        self.status_label = QLabel()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setToolTip("Stop waiting for the current answer and drop any queued questions")
+        self.cancel_btn.clicked.connect(self.cancel_pending)
+        status_layout.addWidget(self.busy_bar, 1)
+        status_layout.addWidget(self.status_label)
+        status_layout.addWidget(self.cancel_btn)
+        layout.addLayout(status_layout)
+
+        self._pending_questions = deque()
+        self._worker = None
+        self._answer_started = False
+        self._snapshot = None
+        self._snapshot_version = None
+        self._update_status()
+
         self.add_message("AI", "Hello! How can I help you analyze your finances today?")
 
     def add_message(self, author, text):
         self.history.append(f"<b>{author}:</b> {text.replace(chr(10), '<br>')}<br>")
+        self.history.verticalScrollBar().setValue(self.history.verticalScrollBar().maximum())
 
     def send_message(self):
         question = self.input_line.text().strip()
         if not question:
             return
-        
+
         self.add_message("You", question)
         self.input_line.clear()
-        QApplication.processEvents()
-        
-        response = self.ai_analyser.answer_user_question(
-            question,
-            self.ledger_manager.get_all_entries(),
-            self.transaction_manager.get_all_transactions()
-        )
-        self.add_message("AI", response)
+        self._pending_questions.append(question)
+        self._ask_next_question()
+
+    def _ask_next_question(self):
+        if self._worker is None and self._pending_questions:
+            question = self._pending_questions.popleft()
+            worker = AiStreamWorker(self.chat_session.stream_reply, question, *self._data_snapshot())
+            worker.chunk_ready.connect(lambda text, w=worker: self._on_answer_chunk(w, text))
+            worker.result_ready.connect(lambda response, w=worker: self._on_answer(w))
+            worker.failed.connect(lambda error, w=worker: (self._on_answer_chunk(w, f"\nError: {error}"), self._on_answer(w)))
+            self._worker = worker
+            worker.start()
+        self._update_status()
+
+    def _data_snapshot(self):
+        """
+        Copies of the data for the workers, taken once per data version. Reusing the same lists
+        lets every question in the session hit the AI context cached for them.
+        """
+        version = get_data_version()
+        if self._snapshot_version != version:
+            self._snapshot = (list(self.ledger_manager.get_all_entries()), list(self.transaction_manager.get_all_transactions()))
+            self._snapshot_version = version
+        return self._snapshot
+
+    def _on_answer_chunk(self, worker, text):
+        # A cancelled request's text can already be queued when it is cancelled
+        if worker is not self._worker:
+            return
+        if not self._answer_started:
+            self.history.append("<b>AI:</b> ")
+            self._answer_started = True
+        cursor = self.history.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText(text)
         self.history.verticalScrollBar().setValue(self.history.verticalScrollBar().maximum())
 
+    def _on_answer(self, worker):
+        if worker is not self._worker:
+            return
+        self._worker = None
+        if self._answer_started:
+            self.history.append("")
+        else:
+            self.add_message("AI", "(No response)")
+        self._answer_started = False
+        if self.chat_session.needs_compaction():
+            # Summarising older turns is another AI call; it runs alongside the next question
+            AiRequestWorker(self.chat_session.compact).start()
+        self._ask_next_question()
+
+    def new_chat(self):
+        self.cancel_pending()
+        self.chat_session.reset()
+        self.history.clear()
+        self.add_message("AI", "Starting a new conversation. What would you like to know?")
+
+    def cancel_pending(self):
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        self._worker = None
+        self._answer_started = False
+        dropped = len(self._pending_questions)
+        self._pending_questions.clear()
+        self.add_message("AI", "<i>Cancelled.</i>" if not dropped else f"<i>Cancelled, along with {dropped} queued question(s).</i>")
+        self._update_status()
+
+    def _update_status(self):
+        busy = self._worker is not None
+        self.busy_bar.setVisible(busy)
+        self.cancel_btn.setVisible(busy)
+        queued = len(self._pending_questions)
+        self.status_label.setText(f"Thinking... ({queued} queued)" if queued else "Thinking..." if busy else "")
+
+    def done(self, result):
+        self.cancel_pending()
+        super().done(result)
+
+
+class AiReportDialog(QDialog):
+    """Shows an AI report as it is streamed in, re-rendering its Markdown as each piece arrives."""
+    def __init__(self, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setMinimumSize(600, 450)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+
+        layout = QVBoxLayout(self)
+        self.browser = QTextBrowser()
+        self.browser.setOpenExternalLinks(True)
+        self.browser.setPlaceholderText("Waiting for the AI...")
+        layout.addWidget(self.browser)
+
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setMaximumHeight(10)
+        self.busy_bar.setTextVisible(False)
+        layout.addWidget(self.busy_bar)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._text = ""
+        self._preview = None
+        self._worker = None
+
+    def show_preview(self, text, note):
+        """Shows a locally written report, with a note under it, until the first streamed piece replaces it."""
+        self._preview = text
+        self.browser.setMarkdown(f"{text}\n\n_{note}_")
+
+    def start(self, worker):
+        self._worker = worker
+        worker.chunk_ready.connect(self.append_text)
+        worker.result_ready.connect(self._finish)
+        worker.failed.connect(lambda error: (self.append_text(f"\n\nError: {error}"), self._finish()))
+        worker.start()
+
+    def append_text(self, text):
+        if self._preview is not None:
+            if not self._text and is_ai_error(text):
+                # Keep the local report rather than replacing it with nothing but an error
+                text = f"{self._preview}\n\n_The AI's analysis isn't available: {text.strip()}_"
+            self._preview = None
+        self._text += text
+        self.browser.setMarkdown(self._text)
+        self.browser.verticalScrollBar().setValue(self.browser.verticalScrollBar().maximum())
+
+    def _finish(self, *args):
+        self._worker = None
+        self.busy_bar.setVisible(False)
+
+    def done(self, result):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        super().done(result)
+
 
 class AiPlanEditorDialog(QDialog):
     """A dialog for reviewing and editing a plan generated by the AI."""
@@ -288,6 +479,8 @@ class WhatIfDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("What-If Calculator")
         self.amount = 0
+        self.stochastic = False
+        self.num_paths = 0
 
         layout = QVBoxLayout(self)
         label = QLabel("Enter a hypothetical EXTRA monthly payment:")
@@ -298,16 +491,138 @@ class WhatIfDialog(QDialog):
         self.amount_input.setDecimals(2)
         self.amount_input.setValue(100.0)
 
+        self.stochastic_check = QCheckBox("Simulate using my payment history (Monte Carlo)")
+        self.paths_input = QSpinBox()
+        self.paths_input.setRange(1000, 500000)
+        self.paths_input.setSingleStep(5000)
+        self.paths_input.setValue(20000)
+        self.paths_input.setEnabled(False)
+        self.stochastic_check.toggled.connect(self.paths_input.setEnabled)
+        paths_layout = QFormLayout()
+        paths_layout.addRow("Simulated paths:", self.paths_input)
+
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
 
         layout.addWidget(label)
         layout.addWidget(self.amount_input)
+        layout.addWidget(self.stochastic_check)
+        layout.addLayout(paths_layout)
         layout.addWidget(button_box)
 
     def accept(self):
         self.amount = self.amount_input.value()
+        self.stochastic = self.stochastic_check.isChecked()
+        self.num_paths = self.paths_input.value()
+        super().accept()
+
+
+class AsOfDateDialog(QDialog):
+    """A dialog for choosing the date to report balances as of."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Balances As Of Date")
+        self.selected_date = None
+
+        # Default to the end of the most recent Australian financial year
+        today = date.today()
+        fy_end = date(today.year if today >= date(today.year, 6, 30) else today.year - 1, 6, 30)
+
+        layout = QVBoxLayout(self)
+        label = QLabel("Show every balance as it stood at the end of:")
+        self.date_input = QDateEdit(QDate(fy_end.year, fy_end.month, fy_end.day))
+        self.date_input.setCalendarPopup(True)
+        self.date_input.setDisplayFormat("dd MMM yyyy")
+        self.date_input.setMaximumDate(QDate.currentDate())
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+
+        layout.addWidget(label)
+        layout.addWidget(self.date_input)
+        layout.addWidget(button_box)
+
+    def accept(self):
+        self.selected_date = self.date_input.date().toPyDate()
+        super().accept()
+
+
+class StatementImportDialog(QDialog):
+    """A dialog for matching a bank statement's columns to dates, descriptions and amounts."""
+    SEPARATE_COLUMNS = "(Separate debit and credit columns)"
+    NONE = "(None)"
+    DETECT_FORMAT = "Detect automatically"
+
+    def __init__(self, header, mapping, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import Bank Statement")
+        self.mapping = mapping
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Choose which columns of the statement hold each value:"))
+        form = QFormLayout()
+        self.date_combo = self._column_combo(header, mapping.date)
+        self.description_combo = self._column_combo(header, mapping.description)
+        self.amount_combo = self._column_combo(header, mapping.amount, first=self.SEPARATE_COLUMNS)
+        self.debit_combo = self._column_combo(header, mapping.debit, first=self.NONE)
+        self.credit_combo = self._column_combo(header, mapping.credit, first=self.NONE)
+        self.format_combo = QComboBox()
+        self.format_combo.setEditable(True)
+        self.format_combo.addItems([self.DETECT_FORMAT, *COMMON_DATE_FORMATS])
+        self.format_combo.setCurrentText(mapping.date_format or self.DETECT_FORMAT)
+        self.negate_check = QCheckBox("Money out is shown as a positive amount")
+        self.negate_check.setChecked(mapping.negate_amounts)
+        form.addRow("Date:", self.date_combo)
+        form.addRow("Date format:", self.format_combo)
+        form.addRow("Description:", self.description_combo)
+        form.addRow("Amount:", self.amount_combo)
+        form.addRow("Money out (debit):", self.debit_combo)
+        form.addRow("Money in (credit):", self.credit_combo)
+        form.addRow("", self.negate_check)
+        layout.addLayout(form)
+
+        self.amount_combo.currentTextChanged.connect(self._update_enabled)
+        self._update_enabled()
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    @staticmethod
+    def _column_combo(header, current, first=None):
+        combo = QComboBox()
+        if first:
+            combo.addItem(first)
+        combo.addItems(header)
+        if current in header:
+            combo.setCurrentText(current)
+        return combo
+
+    def _update_enabled(self):
+        separate = self.amount_combo.currentText() == self.SEPARATE_COLUMNS
+        self.debit_combo.setEnabled(separate)
+        self.credit_combo.setEnabled(separate)
+        self.negate_check.setEnabled(not separate)
+
+    def accept(self):
+        separate = self.amount_combo.currentText() == self.SEPARATE_COLUMNS
+        debit, credit = self.debit_combo.currentText(), self.credit_combo.currentText()
+        if separate and self.NONE in (debit, credit):
+            QMessageBox.warning(self, "Import Bank Statement", "Choose both the debit and the credit column.")
+            return
+        date_format = self.format_combo.currentText().strip()
+        self.mapping = ColumnMapping(
+            date=self.date_combo.currentText(),
+            description=self.description_combo.currentText(),
+            amount=None if separate else self.amount_combo.currentText(),
+            debit=debit if separate else None,
+            credit=credit if separate else None,
+            date_format=None if date_format in ("", self.DETECT_FORMAT) else date_format,
+            negate_amounts=not separate and self.negate_check.isChecked(),
+        )
         super().accept()
 
 
@@ -322,8 +637,30 @@ class MainWindow(QMainWindow):
             setattr(self, name, instance)
 
         self._undo_stack = []  # List of (type, data) tuples for undo
-
-        self.ai_analyser = FinancialAnalyser(api_key=self.config.get("OPENROUTER_API_KEY"))
+        self._what_if_worker = None
+        self._export_worker = None
+        self._what_if_result = None
+        self._balance_index = None
+        self._balance_index_version = None
+        self._dashboard_generation = 0
+        self._dashboard_worker = DashboardWorker(self)
+        self._dashboard_worker.result_ready.connect(self._apply_dashboard_result)
+        self._dashboard_worker.failed.connect(self._on_dashboard_failed)
+        self._dashboard_worker.start()
+        self._ledger_query_generation = 0
+        self._dirty_tabs = set()
+        self._current_tab = 0
+        self._previous_tab = None
+
+        self.ai_analyser = FinancialAnalyser(
+            api_key=self.config.get("OPENROUTER_API_KEY"),
+            cache=ResponseCache(enabled=self.config.get('ai_response_cache', True)),
+            hedge_after_seconds=self.config.get('ai_hedge_after_seconds'),
+            hedge_model=self.config.get('ai_hedge_model'),
+            context_token_budget=self.config.get('ai_context_token_budget', AI_CONTEXT_TOKEN_BUDGET),
+            base_url=self.config.get('ai_base_url'),
+            telemetry=AiTelemetry(),
+        )
         if not self.config.get("OPENROUTER_API_KEY"):
             self.show_api_key_dialog(is_first_run=True)
 
@@ -342,7 +679,13 @@ class MainWindow(QMainWindow):
         self.create_tabs()
         self._setup_keyboard_shortcuts()
 
-        self.tabs.currentChanged.connect(self.refresh_ui)
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(0)
+        self._prefetch_timer.timeout.connect(self._prefetch_next_tab)
+
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        self.mark_tabs_dirty()
         self.refresh_ui()
 
     def _setup_keyboard_shortcuts(self):
@@ -393,7 +736,7 @@ class MainWindow(QMainWindow):
         file_menu = menu_bar.addMenu("File")
         save_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_DialogSaveButton)), "Save", self)
         save_action.setShortcut(QKeySequence.StandardKey.Save)
-        save_action.triggered.connect(self.save_and_refresh)
+        save_action.triggered.connect(lambda: self.save_and_refresh())
         export_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_ArrowUp)), "Export All to CSV", self)
         export_action.setShortcut(QKeySequence("Ctrl+E"))
         export_action.triggered.connect(self.export_all_data)
@@ -405,9 +748,12 @@ class MainWindow(QMainWindow):
         backup_action.triggered.connect(self.backup_data)
         restore_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_DialogOpenButton)), "Restore from Backup...", self)
         restore_action.triggered.connect(self.restore_data)
+        import_statement_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_ArrowDown)), "Import Bank Statement...", self)
+        import_statement_action.triggered.connect(self.import_bank_statement)
 
         file_menu.addAction(save_action)
         file_menu.addAction(export_action)
+        file_menu.addAction(import_statement_action)
         file_menu.addSeparator()
         file_menu.addAction(backup_action)
         file_menu.addAction(restore_action)
@@ -432,14 +778,23 @@ class MainWindow(QMainWindow):
         whatif_action.triggered.connect(self.show_what_if_calc)
         networth_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_ToolBarVerticalExtensionButton)), "Log Net Position Snapshot", self)
         networth_action.triggered.connect(self.log_net_position)
+        self.auto_snapshot_action = QAction("Auto-Log Net Position on Save", self)
+        self.auto_snapshot_action.setCheckable(True)
+        self.auto_snapshot_action.setChecked(self.config.get('auto_net_position_snapshots', True))
+        self.auto_snapshot_action.toggled.connect(self.toggle_auto_snapshots)
         monthly_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_FileDialogListView)), "Monthly Payment Summary", self)
         monthly_action.setShortcut(QKeySequence("Ctrl+M"))
         monthly_action.triggered.connect(self.show_monthly_summary)
+        as_of_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_FileDialogContentsView)), "Balances As Of Date...", self)
+        as_of_action.setShortcut(QKeySequence("Ctrl+B"))
+        as_of_action.triggered.connect(self.show_balances_as_of)
         tools_menu.addAction(snowball_action)
         tools_menu.addAction(whatif_action)
         tools_menu.addAction(networth_action)
+        tools_menu.addAction(self.auto_snapshot_action)
         tools_menu.addSeparator()
         tools_menu.addAction(monthly_action)
+        tools_menu.addAction(as_of_action)
 
         ai_menu = menu_bar.addMenu("AI Tools")
         health_check_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_ComputerIcon)), "Get Financial Health Check", self)
@@ -448,9 +803,27 @@ class MainWindow(QMainWindow):
         chat_action.triggered.connect(self.run_ai_chat)
         command_bar_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_CommandLink)), "Use AI Command Bar", self)
         command_bar_action.triggered.connect(self.run_ai_command_bar)
+        self.ai_cache_action = QAction("Reuse Cached AI Responses", self)
+        self.ai_cache_action.setCheckable(True)
+        self.ai_cache_action.setChecked(self.config.get('ai_response_cache', True))
+        self.ai_cache_action.setToolTip("Answer repeated prompts on unchanged data from disk instead of asking the AI again")
+        self.ai_cache_action.toggled.connect(self.toggle_ai_response_cache)
         ai_menu.addAction(health_check_action)
         ai_menu.addAction(chat_action)
         ai_menu.addAction(command_bar_action)
+        ai_menu.addSeparator()
+        ai_menu.addAction(self.ai_cache_action)
+
+        diagnostics_menu = menu_bar.addMenu("Diagnostics")
+        cache_stats_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_FileDialogInfoView)), "Calculation Cache", self)
+        cache_stats_action.triggered.connect(self.show_cache_stats)
+        ai_cache_stats_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_DriveHDIcon)), "AI Response Cache", self)
+        ai_cache_stats_action.triggered.connect(self.show_ai_cache_stats)
+        ai_usage_action = QAction(QIcon(s.standardIcon(QStyle.StandardPixmap.SP_FileDialogDetailedView)), "AI Usage", self)
+        ai_usage_action.triggered.connect(self.show_ai_usage)
+        diagnostics_menu.addAction(cache_stats_action)
+        diagnostics_menu.addAction(ai_cache_stats_action)
+        diagnostics_menu.addAction(ai_usage_action)
 
     def create_tabs(self):
         self.tabs = QTabWidget()
@@ -571,50 +944,63 @@ class MainWindow(QMainWindow):
         sum_layout.addLayout(form)
         sum_layout.addStretch()
 
-        self.pie_chart_canvas = self.create_pie_chart()
-        self.bar_chart_canvas = self.create_bar_chart()
-        self.line_chart_canvas = self.create_line_chart()
+        # Charts are built once here and updated in place by refresh_dashboard
+        self.pie_chart = BalancePieChart()
+        self.bar_chart = TotalsBarChart()
+        self.line_chart = NetPositionLineChart()
+        self.fan_chart = WhatIfFanChart()
 
         pie_card, pie_layout = self._make_card()
         pie_layout.setContentsMargins(2, 2, 2, 2)
-        pie_layout.addWidget(self.pie_chart_canvas)
+        pie_layout.addWidget(self.pie_chart.canvas)
 
         bar_card, bar_layout = self._make_card()
         bar_layout.setContentsMargins(2, 2, 2, 2)
-        bar_layout.addWidget(self.bar_chart_canvas)
+        bar_layout.addWidget(self.bar_chart.canvas)
 
         mid_row.addWidget(sum_card, 2)
         mid_row.addWidget(pie_card, 3)
         mid_row.addWidget(bar_card, 3)
         main_layout.addLayout(mid_row, 3)
 
-        # ===== ROW 3: Line chart =====
+        # ===== ROW 3: Line chart + What-If fan chart =====
+        bottom_row = QHBoxLayout()
+        bottom_row.setSpacing(8)
+
         line_card, line_layout = self._make_card()
         line_layout.setContentsMargins(4, 4, 4, 4)
-        line_layout.addWidget(self.line_chart_canvas)
-        main_layout.addWidget(line_card, 4)
+        line_controls = QHBoxLayout()
+        line_controls.setContentsMargins(8, 4, 8, 0)
+        self.line_source_combo = QComboBox()
+        self.line_source_combo.addItem("Derived from transactions", "derived")
+        self.line_source_combo.addItem("Logged snapshots", "snapshots")
+        self.line_source_combo.setCurrentIndex(max(0, self.line_source_combo.findData(self.config.get('net_position_source', 'derived'))))
+        self.line_resolution_combo = QComboBox()
+        for resolution in SERIES_RESOLUTIONS:
+            self.line_resolution_combo.addItem(resolution.capitalize(), resolution)
+        self.line_resolution_combo.setCurrentIndex(max(0, self.line_resolution_combo.findData(self.config.get('net_position_resolution', 'weekly'))))
+        self.line_resolution_combo.setEnabled(self.line_source_combo.currentData() == 'derived')
+        self.line_source_combo.currentIndexChanged.connect(self.on_line_chart_options_changed)
+        self.line_resolution_combo.currentIndexChanged.connect(self.on_line_chart_options_changed)
+        line_controls.addWidget(self.line_chart.create_toolbar(self))
+        line_controls.addStretch()
+        line_controls.addWidget(QLabel("Source:"))
+        line_controls.addWidget(self.line_source_combo)
+        line_controls.addWidget(self.line_resolution_combo)
+        line_layout.addLayout(line_controls)
+        line_layout.addWidget(self.line_chart.canvas)
+
+        fan_card, fan_layout = self._make_card()
+        fan_layout.setContentsMargins(4, 4, 4, 4)
+        fan_layout.addWidget(self.fan_chart.canvas)
+
+        bottom_row.addWidget(line_card, 5)
+        bottom_row.addWidget(fan_card, 3)
+        main_layout.addLayout(bottom_row, 4)
 
         scroll.setWidget(widget)
         return scroll
     
-    def create_pie_chart(self):
-        fig, self.pie_ax = plt.subplots(facecolor='#3b4252')
-        self.pie_ax.set_facecolor('#3b4252')
-        fig.subplots_adjust(left=0.05, right=0.70, top=0.88, bottom=0.05)
-        return FigureCanvas(fig)
-
-    def create_bar_chart(self):
-        fig, self.bar_ax = plt.subplots(facecolor='#3b4252')
-        self.bar_ax.set_facecolor('#3b4252')
-        fig.subplots_adjust(left=0.18, right=0.95, top=0.88, bottom=0.30)
-        return FigureCanvas(fig)
-
-    def create_line_chart(self):
-        fig, self.line_ax = plt.subplots(facecolor='#3b4252')
-        self.line_ax.set_facecolor('#3b4252')
-        fig.subplots_adjust(left=0.08, right=0.97, top=0.90, bottom=0.18)
-        return FigureCanvas(fig)
-
     def _create_details_panel_widgets(self):
         """Factory method to create a reusable details panel."""
         container = QWidget()
@@ -654,8 +1040,11 @@ class MainWindow(QMainWindow):
         trans_header_layout.addWidget(widgets['delete_transaction_btn'])
         layout.addLayout(trans_header_layout)
 
-        widgets['transaction_list'] = QListWidget()
-        widgets['transaction_list'].currentItemChanged.connect(self.on_transaction_selection_changed)
+        widgets['transaction_model'] = TransactionListModel(self)
+        widgets['transaction_list'] = QListView()
+        widgets['transaction_list'].setUniformItemSizes(True)
+        widgets['transaction_list'].setModel(widgets['transaction_model'])
+        widgets['transaction_list'].selectionModel().currentChanged.connect(self.on_transaction_selection_changed)
         layout.addWidget(widgets['transaction_list'], 1)
 
         payment_btn_layout = QHBoxLayout()
@@ -702,24 +1091,34 @@ class MainWindow(QMainWindow):
         self.ledger_search = QLineEdit()
         self.ledger_search.setPlaceholderText("Search entries...")
         self.ledger_search.setClearButtonEnabled(True)
-        self.ledger_search.textChanged.connect(self.refresh_ledger_list)
+        self.ledger_search.textChanged.connect(self.on_ledger_search_changed)
+        self._ledger_search_timer = QTimer(self)
+        self._ledger_search_timer.setSingleShot(True)
+        self._ledger_search_timer.setInterval(LEDGER_SEARCH_DEBOUNCE_MS)
+        self._ledger_search_timer.timeout.connect(self.refresh_ledger_list)
         list_layout.addWidget(self.ledger_search)
 
         # Filter and sort controls
         filter_sort_layout = QHBoxLayout()
         self.ledger_filter = QComboBox()
         self.ledger_filter.addItems(["All Types", "Debts Only", "Loans Only"])
-        self.ledger_filter.currentIndexChanged.connect(self.refresh_ledger_list)
+        self.ledger_filter.currentIndexChanged.connect(self.on_ledger_filter_changed)
         self.ledger_sort = QComboBox()
         self.ledger_sort.addItems(["Sort: A-Z", "Sort: Z-A", "Balance (Low)", "Balance (High)", "Date (Newest)", "Date (Oldest)"])
-        self.ledger_sort.currentIndexChanged.connect(self.refresh_ledger_list)
+        self.ledger_sort.currentIndexChanged.connect(self.on_ledger_sort_changed)
         filter_sort_layout.addWidget(self.ledger_filter)
         filter_sort_layout.addWidget(self.ledger_sort)
         list_layout.addLayout(filter_sort_layout)
 
-        self.active_list_widget = QListWidget()
-        self.active_list_widget.currentItemChanged.connect(self.on_active_list_selection)
-        list_layout.addWidget(self.active_list_widget)
+        # Filtering and sorting happen in LedgerQueryTask, so the view shows the model's rows as-is
+        self.ledger_model = EntryListModel(self)
+        self.active_list_view = QListView()
+        self.active_list_view.setUniformItemSizes(True)
+        # Lay out large lists a batch at a time so big updates don't stall the event loop
+        self.active_list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.active_list_view.setModel(self.ledger_model)
+        self.active_list_view.selectionModel().currentChanged.connect(self.on_active_list_selection)
+        list_layout.addWidget(self.active_list_view)
 
         self.ledger_details_panel, self.ledger_widgets = self._create_details_panel_widgets()
 
@@ -734,9 +1133,16 @@ class MainWindow(QMainWindow):
         list_container = QWidget()
         list_layout = QVBoxLayout(list_container)
         list_layout.addWidget(QLabel("<b>Paid & Settled History</b>"))
-        self.history_list_widget = QListWidget()
-        self.history_list_widget.currentItemChanged.connect(self.on_history_list_selection)
-        list_layout.addWidget(self.history_list_widget)
+        self.history_model = HistoryListModel(self)
+        self.history_proxy = QSortFilterProxyModel(self)
+        self.history_proxy.setSourceModel(self.history_model)
+        self.history_proxy.setSortRole(LabelSortRole)
+        self.history_proxy.sort(0, Qt.SortOrder.AscendingOrder)
+        self.history_list_view = QListView()
+        self.history_list_view.setUniformItemSizes(True)
+        self.history_list_view.setModel(self.history_proxy)
+        self.history_list_view.selectionModel().currentChanged.connect(self.on_history_list_selection)
+        list_layout.addWidget(self.history_list_view)
 
         self.history_details_panel, self.history_widgets = self._create_details_panel_widgets()
         self.history_widgets['add_payment_btn'].setVisible(False)
@@ -804,11 +1210,38 @@ class MainWindow(QMainWindow):
 
     # --- UI Refresh & Update Logic ---
 
+    def mark_tabs_dirty(self, *sources):
+        """Flags the tabs showing data from the given managers (all tabs if none are given) for a rebuild."""
+        for source in sources or DATA_SOURCE_TABS:
+            self._dirty_tabs.update(DATA_SOURCE_TABS[source])
+
+    def on_tab_changed(self, index):
+        self._previous_tab, self._current_tab = self._current_tab, index
+        self.refresh_ui(index)
+
     def refresh_ui(self, index=None):
-        """Refreshes the currently active tab."""
+        """Rebuilds the given tab (the current one by default) if its data changed since it was last built."""
         if index is None:
             index = self.tabs.currentIndex()
-        
+        if index in self._dirty_tabs:
+            self._dirty_tabs.discard(index)
+            self._refresh_tab(index)
+        if self._dirty_tabs:
+            self._prefetch_timer.start()
+
+    def _prefetch_next_tab(self):
+        """
+        Rebuilds the tab the user is most likely to open next while the event loop is idle:
+        the one they just came from, otherwise the one to the right of the current tab.
+        """
+        current = self.tabs.currentIndex()
+        for index in (self._previous_tab, (current + 1) % self.tabs.count()):
+            if index is not None and index != current and index in self._dirty_tabs:
+                self._dirty_tabs.discard(index)
+                self._refresh_tab(index)
+                return
+
+    def _refresh_tab(self, index):
         if index == 0:
             self.refresh_dashboard()
         elif index == 1:
@@ -819,207 +1252,115 @@ class MainWindow(QMainWindow):
             self.refresh_journal_list()
 
     def refresh_dashboard(self):
-        all_entries = self.ledger_manager.get_all_entries()
-        all_transactions = self.transaction_manager.get_all_transactions()
-        
-        debt_entries = [e for e in all_entries if e.entry_type == 'debt']
-        loan_entries = [e for e in all_entries if e.entry_type == 'loan']
-        
-        debt_balance = sum(calculate_balance_for_entry(d, all_transactions) for d in debt_entries)
-        loan_balance = sum(calculate_balance_for_entry(l, all_transactions) for l in loan_entries)
-        net_position = loan_balance - debt_balance
-        
-        total_debt = calculate_total_entry_amount(debt_entries)
-        total_loaned = calculate_total_entry_amount(loan_entries)
-        total_paid = calculate_total_transaction_amount([t for t in all_transactions if t.transaction_type == 'payment'])
-        total_repaid = calculate_total_transaction_amount([t for t in all_transactions if t.transaction_type == 'repayment'])
-        
-        self.summary_labels['debt_incurred'].setText(f"<span style='color:#bf616a'>${total_debt:,.2f}</span>")
-        self.summary_labels['debt_paid'].setText(f"<span style='color:#a3be8c'>${total_paid:,.2f}</span>")
-        self.summary_labels['debt_remaining'].setText(f"<span style='color:#bf616a'>${debt_balance:,.2f}</span>")
-        self.summary_labels['debt_eta'].setText(calculate_overall_eta(debt_entries, [t for t in all_transactions if t.transaction_type == 'payment']))
-        self.summary_labels['loan_out'].setText(f"${total_loaned:,.2f}")
-        self.summary_labels['loan_repaid'].setText(f"<span style='color:#a3be8c'>${total_repaid:,.2f}</span>")
-        self.summary_labels['loan_remaining'].setText(f"${loan_balance:,.2f}")
+        """
+        Hands a snapshot of the data to the dashboard worker. The cards and charts keep showing
+        the previous figures until _apply_dashboard_result receives the new ones.
+        """
+        self._dashboard_generation += 1
+        self._dashboard_worker.submit(DashboardJob(
+            generation=self._dashboard_generation,
+            data_version=get_data_version(),
+            all_entries=list(self.ledger_manager.get_all_entries()),
+            all_transactions=list(self.transaction_manager.get_all_transactions()),
+            snapshots=list(self.net_worth_manager.get_all_snapshots()),
+            line_source=self.line_source_combo.currentData(),
+            line_resolution=self.line_resolution_combo.currentData(),
+        ))
+        # The fan chart is drawn from a finished simulation, so there's nothing to compute
+        self.fan_chart.refresh((self._what_if_result,), self._update_fan_chart)
+
+    def _on_dashboard_failed(self, job, error):
+        print(f"Error updating the dashboard: {error}")
+        if job.generation == self._dashboard_generation:
+            self.statusBar().showMessage(f"Couldn't update the dashboard: {error}", 5000)
+
+    def _apply_dashboard_result(self, job, result):
+        if job.generation != self._dashboard_generation:
+            return
+        summary = result.summary
+
+        self.summary_labels['debt_incurred'].setText(f"<span style='color:#bf616a'>${summary.total_debt:,.2f}</span>")
+        self.summary_labels['debt_paid'].setText(f"<span style='color:#a3be8c'>${summary.total_paid:,.2f}</span>")
+        self.summary_labels['debt_remaining'].setText(f"<span style='color:#bf616a'>${summary.debt_balance:,.2f}</span>")
+        self.summary_labels['debt_eta'].setText(summary.debt_eta)
+        self.summary_labels['loan_out'].setText(f"${summary.total_loaned:,.2f}")
+        self.summary_labels['loan_repaid'].setText(f"<span style='color:#a3be8c'>${summary.total_repaid:,.2f}</span>")
+        self.summary_labels['loan_remaining'].setText(f"${summary.loan_balance:,.2f}")
         # Net position goes to the KPI card
+        net_position = summary.net_position
         net_color = '#a3be8c' if net_position >= 0 else '#bf616a'
         self.stats_cards['net_position_card'].setText(f"${net_position:,.2f}")
         self.stats_cards['net_position_card'].setStyleSheet(f"color: {net_color}; font-size: 13pt; font-weight: bold;")
 
-        self.pie_ax.clear()
-        self.pie_ax.set_title('Debt vs. Loans Balance', color='white')
-        if debt_balance > 0 or loan_balance > 0:
-            self.pie_ax.pie(
-                [debt_balance, loan_balance],
-                labels=['Total Debt', 'Total Loans'],
-                autopct='%1.1f%%',
-                startangle=90,
-                colors=['#bf616a', '#a3be8c'],
-                textprops={'color': 'white'}
-            )
-        else:
-            self.pie_ax.text(0.5, 0.5, 'No Data', ha='center', va='center', color='gray')
-        self.pie_chart_canvas.draw()
-        
-        self.bar_ax.clear()
-        self.bar_ax.set_title('Totals vs. Payments', color='white')
-        self.bar_ax.tick_params(axis='x', colors='white')
-        self.bar_ax.tick_params(axis='y', colors='white')
-        self.bar_ax.spines['bottom'].set_color('#d8dee9')
-        self.bar_ax.spines['left'].set_color('#d8dee9')
-        self.bar_ax.spines['top'].set_color('#2e3440')
-        self.bar_ax.spines['right'].set_color('#2e3440')
-        categories = ['Debts', 'Loans']
-        totals = [total_debt, total_loaned]
-        paids = [total_paid, total_repaid]
-        x = np.arange(len(categories))
-        width = 0.35
-        self.bar_ax.bar(x - width / 2, totals, width, label='Total Incurred/Loaned', color='#d08770')
-        self.bar_ax.bar(x + width / 2, paids, width, label='Total Paid/Repaid', color='#a3be8c')
-        self.bar_ax.set_ylabel('Amount (AUD)', color='white')
-        self.bar_ax.set_xticks(x, categories)
-        self.bar_ax.legend(labelcolor='white', facecolor='#3b4252', edgecolor='#4c566a', bbox_to_anchor=(0.5, -0.1), loc='upper center')
-        self.bar_chart_canvas.draw()
-        
-        self.line_ax.clear()
-        self.line_ax.set_title('Net Position Over Time', color='white')
-        self.line_ax.tick_params(axis='x', colors='white')
-        self.line_ax.tick_params(axis='y', colors='white')
-        self.line_ax.spines['bottom'].set_color('#d8dee9')
-        self.line_ax.spines['left'].set_color('#d8dee9')
-        self.line_ax.spines['top'].set_color('#2e3440')
-        self.line_ax.spines['right'].set_color('#2e3440')
-        snapshots = self.net_worth_manager.get_all_snapshots()
-        if len(snapshots) > 1:
-            # Filter outliers: remove points >10x the median absolute value
-            all_values = [s.net_position for s in snapshots]
-            abs_vals = sorted([abs(v) for v in all_values if v != 0])
-            if abs_vals:
-                median_abs = abs_vals[len(abs_vals) // 2]
-                threshold = max(median_abs * 10, 50000)  # at least 50k to avoid filtering real data
-                filtered = [(s.date_recorded, s.net_position) for s in snapshots if abs(s.net_position) <= threshold]
-            else:
-                filtered = [(s.date_recorded, s.net_position) for s in snapshots]
-
-            if len(filtered) > 1:
-                dates, values = zip(*filtered)
-                self.line_ax.plot(dates, values, marker='o', color='#88c0d0', linewidth=2, markersize=5)
-                self.line_ax.fill_between(dates, values, alpha=0.1, color='#88c0d0')
-                self.line_ax.figure.autofmt_xdate()
-            else:
-                self.line_ax.text(0.5, 0.5, 'Not enough data to chart', ha='center', va='center', color='gray')
-        else:
-            self.line_ax.text(0.5, 0.5, 'At least two snapshots needed to see a trend', ha='center', va='center', color='gray')
-        self.line_chart_canvas.draw()
+        balances = (summary.debt_balance, summary.loan_balance)
+        self.pie_chart.refresh(balances, lambda: self.pie_chart.show_balances(*balances))
+        totals, paids = (summary.total_debt, summary.total_loaned), (summary.total_paid, summary.total_repaid)
+        self.bar_chart.refresh((totals, paids), lambda: self.bar_chart.show_totals(totals, paids))
+        # Snapshots and transactions both bump the data version, so it covers every input to the line
+        self.line_chart.refresh((job.line_source, job.line_resolution, job.data_version),
+                                lambda: self._update_line_chart(job, result.line_points))
 
         # --- Quick-stats cards ---
-        active_debts = [e for e in debt_entries if e.status == 'active']
-        self.stats_cards['active_debts'].setText(str(len(active_debts)))
-
-        # Paid this month
-        now = datetime.now(timezone.utc)
-        month_transactions = [t for t in all_transactions
-                              if t.date_paid.year == now.year and t.date_paid.month == now.month]
-        paid_this_month = sum(t.amount for t in month_transactions)
-        self.stats_cards['paid_this_month'].setText(f"${paid_this_month:,.2f}")
-
-        # Biggest remaining debt
-        if active_debts:
-            biggest = max(active_debts, key=lambda e: calculate_balance_for_entry(e, all_transactions))
-            biggest_bal = calculate_balance_for_entry(biggest, all_transactions)
-            self.stats_cards['biggest_debt'].setText(f"{biggest.label[:15]}\n${biggest_bal:,.2f}")
+        self.stats_cards['active_debts'].setText(str(summary.active_debt_count))
+        self.stats_cards['paid_this_month'].setText(f"${summary.paid_this_month:,.2f}")
+        if summary.biggest_debt:
+            label, balance = summary.biggest_debt
+            self.stats_cards['biggest_debt'].setText(f"{label[:15]}\n${balance:,.2f}")
         else:
             self.stats_cards['biggest_debt'].setText("None!")
-
-        # Settled entries count
-        paid_entries = [e for e in all_entries if e.status == 'paid']
-        self.stats_cards['entries_paid_off'].setText(str(len(paid_entries)))
+        self.stats_cards['entries_paid_off'].setText(str(summary.paid_off_count))
 
         # --- Quick-add payment dropdown ---
         self.quick_add_combo.clear()
-        active_entries = [e for e in all_entries if e.status == 'active']
-        for entry in sorted(active_entries, key=lambda e: e.label):
-            balance = calculate_balance_for_entry(entry, all_transactions)
+        for entry, balance in summary.active_entry_balances:
             self.quick_add_combo.addItem(f"{entry.label} (${balance:,.2f})", entry)
-        self.quick_add_btn.setEnabled(bool(active_entries))
+        self.quick_add_btn.setEnabled(bool(summary.active_entry_balances))
 
     def refresh_ledger_list(self):
-        current_id = self.get_selected_entry_id()
-        self.active_list_widget.clear()
-        selected_item_to_restore = None
-
-        all_transactions = self.transaction_manager.get_all_transactions()
-
-        # Filter active entries
-        entries = [e for e in self.ledger_manager.get_all_entries() if e.status == 'active']
-
-        # Apply type filter
-        filter_idx = self.ledger_filter.currentIndex() if hasattr(self, 'ledger_filter') else 0
-        if filter_idx == 1:
-            entries = [e for e in entries if e.entry_type == 'debt']
-        elif filter_idx == 2:
-            entries = [e for e in entries if e.entry_type == 'loan']
-
-        # Apply search
-        search_text = self.ledger_search.text().strip().lower() if hasattr(self, 'ledger_search') else ""
-        if search_text:
-            entries = [e for e in entries if search_text in e.label.lower() or
-                       any(search_text in tag.lower() for tag in e.tags) or
-                       (e.comments and search_text in e.comments.lower())]
-
-        # Pre-calculate balances for sorting
-        entry_balances = {e.id: calculate_balance_for_entry(e, all_transactions) for e in entries}
-
-        # Apply sort
-        sort_idx = self.ledger_sort.currentIndex() if hasattr(self, 'ledger_sort') else 0
-        if sort_idx == 0:
-            entries.sort(key=lambda e: (e.label or '').lower())
-        elif sort_idx == 1:
-            entries.sort(key=lambda e: (e.label or '').lower(), reverse=True)
-        elif sort_idx == 2:
-            entries.sort(key=lambda e: entry_balances[e.id])
-        elif sort_idx == 3:
-            entries.sort(key=lambda e: entry_balances[e.id], reverse=True)
-        elif sort_idx == 4:
-            entries.sort(key=lambda e: e.date_incurred, reverse=True)
-        elif sort_idx == 5:
-            entries.sort(key=lambda e: e.date_incurred)
+        """
+        Starts a background query for the Ledger tab's rows. Any query still in flight is
+        superseded, and only the newest one's results reach the model.
+        """
+        self._ledger_search_timer.stop()
+        self._ledger_query_generation += 1
+        query = LedgerQuery(
+            search_text=self.ledger_search.text(),
+            entry_type={1: 'debt', 2: 'loan'}.get(self.ledger_filter.currentIndex()),
+            sort_index=self.ledger_sort.currentIndex(),
+        )
+        task = LedgerQueryTask(
+            self._ledger_query_generation,
+            lambda: self._ledger_query_generation,
+            self.ledger_manager.get_all_entries(),
+            self.transaction_manager.get_all_transactions(),
+            query,
+        )
+        task.signals.result_ready.connect(self._apply_ledger_query_result)
+        QThreadPool.globalInstance().start(task)
+        # The selected entry's balance may have changed even if the rows haven't arrived yet
+        self._update_details_panel(self._current_entry(self.active_list_view), self.ledger_widgets)
 
-        for entry in entries:
-            balance = entry_balances[entry.id]
-            type_icon = "\u25B2" if entry.entry_type == 'loan' else "\u25BC"
-            item = QListWidgetItem(f"{type_icon}  {entry.label}    ${balance:,.2f}")
-            item.setData(Qt.ItemDataRole.UserRole, entry)
-            self.active_list_widget.addItem(item)
-            if entry and current_id and entry.id == current_id:
-                selected_item_to_restore = item
+    def _apply_ledger_query_result(self, generation, result):
+        if generation != self._ledger_query_generation:
+            return
+        current = self._current_entry(self.active_list_view)
+        self.ledger_model.set_entries(result.entries, result.paid_by_entry, result.signatures, result.ids)
+        index = self.ledger_model.index_for_id(current.id) if current else QModelIndex()
+        # A reset drops the selection even when the entry is still listed, so put it back by id
+        if index != self.active_list_view.currentIndex():
+            self.active_list_view.setCurrentIndex(index)
 
-        if selected_item_to_restore:
-            self.active_list_widget.setCurrentItem(selected_item_to_restore)
-        else:
-            self._update_details_panel(None, self.ledger_widgets)
-            
     def refresh_history_list(self):
-        current_id = self.get_selected_entry_id()
-        self.history_list_widget.clear()
-        selected_item_to_restore = None
-
-        sorted_entries = sorted(self.ledger_manager.get_all_entries(), key=lambda e: e.label or '')
+        entries = [e for e in self.ledger_manager.get_all_entries() if e.status == 'paid']
+        self._sync_entry_list(self.history_model, self.history_list_view, entries)
+        self._update_details_panel(self._current_entry(self.history_list_view), self.history_widgets)
 
-        all_transactions = self.transaction_manager.get_all_transactions()
-        for entry in sorted_entries:
-            if entry.status == 'paid':
-                type_label = "Loan" if entry.entry_type == 'loan' else "Debt"
-                item = QListWidgetItem(f"\u2713  {entry.label}  ({type_label} - ${entry.amount:,.2f})")
-                item.setData(Qt.ItemDataRole.UserRole, entry)
-                self.history_list_widget.addItem(item)
-                if entry and current_id and entry.id == current_id:
-                    selected_item_to_restore = item
-
-        if selected_item_to_restore:
-            self.history_list_widget.setCurrentItem(selected_item_to_restore)
-        else:
-            self._update_details_panel(None, self.history_widgets)
+    def _sync_entry_list(self, model, list_view, entries):
+        """Diffs an entry list model in place, so the selection survives unless its entry left the list."""
+        current = self._current_entry(list_view)
+        model.set_entries(entries, calculate_paid_by_entry(self.transaction_manager.get_all_transactions()))
+        if current and not model.index_for_id(current.id).isValid():
+            list_view.setCurrentIndex(QModelIndex())
 
     def refresh_journal_list(self):
         # Refresh notebook list
@@ -1070,7 +1411,6 @@ class MainWindow(QMainWindow):
 
     def _update_details_panel(self, entry, widgets):
         """A generic function to update a details panel, given an entry and a dict of widgets."""
-        widgets['transaction_list'].clear()
         widgets['delete_transaction_btn'].setEnabled(False)
         widgets['edit_transaction_btn'].setEnabled(False)
 
@@ -1079,7 +1419,7 @@ class MainWindow(QMainWindow):
             widgets['add_payment_btn'].setText(f"Add {'Payment' if entry.entry_type == 'debt' else 'Repayment'}")
             widgets['use_template_btn'].setEnabled(entry.status == 'active' and bool(self.config.get('transaction_templates')))
 
-            balance = calculate_balance_for_entry(entry, self.transaction_manager.get_all_transactions())
+            balance = entry.amount - calculate_paid_by_entry(self.transaction_manager.get_all_transactions()).get(entry.id, 0.0)
             widgets['detail_label'].setText(entry.label)
             widgets['detail_balance'].setText(f"<b>Current Balance: ${balance:,.2f}</b>")
 
@@ -1099,12 +1439,9 @@ class MainWindow(QMainWindow):
                 f"<b>Comments:</b> {entry.comments or 'None'}"
             )
 
-            transactions = self.transaction_manager.get_transactions_for_entry(entry.id)
-            for t in sorted(transactions, key=lambda t: t.date_paid, reverse=True):
-                item = QListWidgetItem(f"{t.date_paid.strftime('%Y-%m-%d')} - {t.label} (${t.amount:,.2f})")
-                item.setData(Qt.ItemDataRole.UserRole, t)
-                widgets['transaction_list'].addItem(item)
+            widgets['transaction_model'].set_transactions(self.transaction_manager.get_transactions_for_entry_by_date(entry.id))
         else:
+            widgets['transaction_model'].set_transactions([])
             widgets['detail_label'].setText("No item selected")
             widgets['detail_balance'].setText("")
             widgets['detail_info'].setText("")
@@ -1115,13 +1452,23 @@ class MainWindow(QMainWindow):
     # --- Event Handlers / Slots ---
 
     def on_active_list_selection(self, current, previous):
-        entry = current.data(Qt.ItemDataRole.UserRole) if current else None
+        entry = current.data(EntryRole) if current.isValid() else None
         self._update_details_panel(entry, self.ledger_widgets)
 
     def on_history_list_selection(self, current, previous):
-        entry = current.data(Qt.ItemDataRole.UserRole) if current else None
+        entry = current.data(EntryRole) if current.isValid() else None
         self._update_details_panel(entry, self.history_widgets)
 
+    def on_ledger_search_changed(self, text):
+        # Restarting the timer means a query only runs once typing pauses
+        self._ledger_search_timer.start()
+
+    def on_ledger_filter_changed(self, index):
+        self.refresh_ledger_list()
+
+    def on_ledger_sort_changed(self, index):
+        self.refresh_ledger_list()
+
     def on_notebook_selection_changed(self, current, previous):
         self._refresh_journal_entries()
         can_rename = bool(current) and current.text() != "General"
@@ -1136,11 +1483,11 @@ class MainWindow(QMainWindow):
         """Enables edit/delete buttons for the correct tab's transaction list."""
         tab_index = self.tabs.currentIndex()
         if tab_index == 1:
-            is_selected = bool(self.ledger_widgets['transaction_list'].currentItem())
+            is_selected = self._current_transaction(self.ledger_widgets) is not None
             self.ledger_widgets['delete_transaction_btn'].setEnabled(is_selected)
             self.ledger_widgets['edit_transaction_btn'].setEnabled(is_selected)
         elif tab_index == 2:
-            is_selected = bool(self.history_widgets['transaction_list'].currentItem())
+            is_selected = self._current_transaction(self.history_widgets) is not None
             self.history_widgets['delete_transaction_btn'].setEnabled(is_selected)
             self.history_widgets['edit_transaction_btn'].setEnabled(is_selected)
 
@@ -1150,7 +1497,7 @@ class MainWindow(QMainWindow):
         dialog = EntryDialog(self.tag_manager, parent=self)
         if dialog.exec():
             self.ledger_manager.add_entry(**dialog.entry_data)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger',))
     
     def edit_entry(self):
         entry = self.get_selected_entry()
@@ -1166,8 +1513,10 @@ class MainWindow(QMainWindow):
             entry.entry_type = data['entry_type']
             entry.comments = data['comments']
             entry.tags = data['tags']
+            self.ledger_manager.reindex_entry(entry)
+            bump_data_version()
             self.update_entry_status(entry)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger',))
             
     def duplicate_entry(self):
         entry = self.get_selected_entry()
@@ -1181,7 +1530,7 @@ class MainWindow(QMainWindow):
             comments=entry.comments,
             tags=list(entry.tags),
         )
-        self.save_and_refresh()
+        self.save_and_refresh(changed=('ledger',))
 
     def delete_entry(self):
         entry = self.get_selected_entry()
@@ -1200,7 +1549,7 @@ class MainWindow(QMainWindow):
 
             self.ledger_manager.delete_entry_by_id(entry.id)
             self.transaction_manager.delete_transactions_by_entry_id(entry.id)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger', 'transactions'))
 
     def add_transaction(self):
         entry = self.get_selected_entry()
@@ -1216,7 +1565,7 @@ class MainWindow(QMainWindow):
                 **dialog.transaction_data
             )
             self.update_entry_status(entry)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger', 'transactions'))
 
             # Offer to save as template
             reply = QMessageBox.question(self, "Save Template?",
@@ -1259,42 +1608,41 @@ class MainWindow(QMainWindow):
             amount=template['amount'],
         )
         self.update_entry_status(entry)
-        self.save_and_refresh()
+        self.save_and_refresh(changed=('ledger', 'transactions'))
 
     def edit_transaction(self):
         tab_index = self.tabs.currentIndex()
         if tab_index == 1:
-            item = self.ledger_widgets['transaction_list'].currentItem()
+            trans = self._current_transaction(self.ledger_widgets)
         elif tab_index == 2:
-            item = self.history_widgets['transaction_list'].currentItem()
+            trans = self._current_transaction(self.history_widgets)
         else:
             return
-        if not item:
+        if not trans:
             return
 
-        trans = item.data(Qt.ItemDataRole.UserRole)
         dialog = TransactionDialog(transaction_data={'label': trans.label, 'amount': trans.amount}, parent=self)
         if dialog.exec():
             trans.label = dialog.transaction_data['label']
             trans.amount = dialog.transaction_data['amount']
+            bump_data_version()
             entry = self.get_selected_entry()
             if entry:
                 self.update_entry_status(entry)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger', 'transactions'))
 
     def delete_transaction(self):
         tab_index = self.tabs.currentIndex()
-        if tab_index == 1: 
-            item = self.ledger_widgets['transaction_list'].currentItem()
-        elif tab_index == 2: 
-            item = self.history_widgets['transaction_list'].currentItem()
+        if tab_index == 1:
+            trans = self._current_transaction(self.ledger_widgets)
+        elif tab_index == 2:
+            trans = self._current_transaction(self.history_widgets)
         else:
             return
 
-        if not item:
+        if not trans:
             return
-        
-        trans = item.data(Qt.ItemDataRole.UserRole)
+
         entry = self.get_selected_entry()
 
         reply = QMessageBox.question(self, "Confirm Delete", f"Delete transaction '{trans.label}'?",
@@ -1307,7 +1655,7 @@ class MainWindow(QMainWindow):
             self.transaction_manager.delete_transaction_by_id(trans.id)
             if entry:
                 self.update_entry_status(entry)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger', 'transactions'))
 
     def add_journal_entry(self):
         notebook = "General"
@@ -1316,7 +1664,7 @@ class MainWindow(QMainWindow):
         text, ok = QInputDialog.getMultiLineText(self, "New Journal Entry", f"New entry in '{notebook}':")
         if ok and text:
             self.journal_manager.add_entry(text, notebook=notebook)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('journal',))
 
     def edit_journal_entry(self):
         item = self.journal_list.currentItem()
@@ -1326,7 +1674,7 @@ class MainWindow(QMainWindow):
         text, ok = QInputDialog.getMultiLineText(self, "Edit Journal Entry", "Edit your entry:", entry.content)
         if ok and text:
             entry.content = text
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('journal',))
 
     def delete_journal_entry(self):
         item = self.journal_list.currentItem()
@@ -1341,7 +1689,7 @@ class MainWindow(QMainWindow):
             self.undo_action.setEnabled(True)
             self.undo_action.setText("Undo Delete Journal Entry")
             self.journal_manager.delete_entry_by_id(entry.id)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('journal',))
 
     def add_notebook(self):
         name, ok = QInputDialog.getText(self, "New Notebook", "Notebook name:")
@@ -1358,7 +1706,7 @@ class MainWindow(QMainWindow):
             text, text_ok = QInputDialog.getMultiLineText(self, "First Entry", f"Add the first entry to '{name}':")
             if text_ok and text:
                 self.journal_manager.add_entry(text, notebook=name)
-                self.save_and_refresh()
+                self.save_and_refresh(changed=('journal',))
                 # Select the new notebook
                 for i in range(self.notebook_list.count()):
                     if self.notebook_list.item(i).text() == name:
@@ -1376,24 +1724,37 @@ class MainWindow(QMainWindow):
             for entry in self.journal_manager.entries:
                 if entry.notebook == old_name:
                     entry.notebook = new_name
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('journal',))
 
     # --- AI-Specific Methods ---
 
     def run_ai_health_check(self):
+        entries = list(self.ledger_manager.get_all_entries())
+        transactions = list(self.transaction_manager.get_all_transactions())
+        # The local report is written in milliseconds, so it shows straight away and covers for the AI when there's no key
+        report = build_health_report(entries, transactions)
+        dialog = AiReportDialog("Financial Health Check", self)
         if not self.ai_analyser.api_key:
-            QMessageBox.warning(self, "AI Disabled", "Please set your API key first.")
-            return
-            
-        report = self.ai_analyser.generate_insights(
-            self.ledger_manager.get_all_entries(),
-            self.transaction_manager.get_all_transactions()
-        )
-        msg_box = QMessageBox(self)
-        msg_box.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-        msg_box.setWindowTitle("AI Financial Health Check")
-        msg_box.setText(report)
-        msg_box.exec()
+            dialog.show_preview(report, "Written offline from your data. Set an API key for the AI's own analysis.")
+            dialog._finish()
+        else:
+            dialog.show_preview(report, "A quick offline check. The AI's analysis will replace it as it arrives.")
+            dialog.start(AiStreamWorker(self.ai_analyser.stream_insights, entries, transactions))
+        dialog.show()
+
+    def _run_ai_request(self, title, text, on_result, request, *args):
+        """Runs request(*args) on an AiRequestWorker behind a cancellable busy dialog, then calls on_result with its return value."""
+        progress = QProgressDialog(text, "Cancel", 0, 0, self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        worker = AiRequestWorker(request, *args)
+        worker.result_ready.connect(lambda result: (progress.reset(), on_result(result)))
+        worker.failed.connect(lambda error: (progress.reset(), QMessageBox.critical(self, title, f"The AI request failed: {error}")))
+        worker.finished.connect(progress.deleteLater)
+        progress.canceled.connect(worker.cancel)
+        worker.start()
 
     def run_ai_chat(self):
         if not self.ai_analyser.api_key:
@@ -1404,15 +1765,23 @@ class MainWindow(QMainWindow):
         dialog.exec()
 
     def run_ai_command_bar(self):
+        command_str, ok = QInputDialog.getMultiLineText(self, "AI Command Bar", "Enter a command, or one per line (e.g., 'add $50 debt for groceries'):")
+        if not (ok and command_str):
+            return
+
+        # Common commands are understood locally, without a request or an API key
+        parsed = parse_command_locally(command_str)
+        if parsed is not None:
+            self._confirm_ai_plan(parsed)
+            return
+
         if not self.ai_analyser.api_key:
             QMessageBox.warning(self, "AI Disabled", "Please set your API key first.")
             return
-            
-        command_str, ok = QInputDialog.getText(self, "AI Command Bar", "Enter a command (e.g., 'add $50 debt for groceries'):")
-        if not (ok and command_str):
-            return
-        
-        parsed = self.ai_analyser.parse_command_to_json(command_str)
+        self._run_ai_request("AI Command Bar", "Interpreting your command...", self._confirm_ai_plan,
+                             self.ai_analyser.parse_command_to_json, command_str)
+
+    def _confirm_ai_plan(self, parsed):
         commands = parsed.get("commands", [])
         if not commands:
             QMessageBox.warning(self, "AI Command Error", "Sorry, I couldn't understand that command.")
@@ -1422,7 +1791,11 @@ class MainWindow(QMainWindow):
         msg_box.setWindowTitle("Confirm AI Plan")
         msg_box.setText("The AI understood the following plan. Proceed?")
         plan_text = "\n".join([f"Step {i+1}: {c.get('action','?').replace('_',' ').title()} with details: {c.get('payload',{})}" for i, c in enumerate(commands)])
-        msg_box.setInformativeText(plan_text)
+        if len(commands) > PLAN_PREVIEW_STEPS:
+            msg_box.setInformativeText(f"{len(commands)} steps. Use 'Show Details...' to review them all.")
+            msg_box.setDetailedText(plan_text)
+        else:
+            msg_box.setInformativeText(plan_text)
         yes_btn = msg_box.addButton("Yes", QMessageBox.ButtonRole.YesRole)
         edit_btn = msg_box.addButton("Edit Plan...", QMessageBox.ButtonRole.ActionRole)
         msg_box.addButton("Cancel", QMessageBox.ButtonRole.NoRole)
@@ -1453,35 +1826,26 @@ class MainWindow(QMainWindow):
                         self.execute_ai_plan(editor.commands)
                 return
 
-        for command in commands:
-            try:
-                if command['action'] == 'add_entry':
-                    self.ledger_manager.add_entry(**command['payload'])
-                elif command['action'] == 'add_transaction':
-                    payload = command['payload']
-                    target_label = payload.get('target_entry_label', '').lower()
-                    if not target_label:
-                        raise ValueError("AI command 'add_transaction' is missing 'target_entry_label'.")
-                    
-                    target_entry = next((e for e in self.ledger_manager.get_all_entries() if target_label in e.label.lower()), None)
-                    
-                    if target_entry:
-                        trans_data = {
-                            'entry_id': target_entry.id,
-                            'transaction_type': payload.get('transaction_type', 'payment'),
-                            'label': payload.get('label', 'AI Transaction'),
-                            'amount': payload.get('amount', 0)
-                        }
-                        self.transaction_manager.add_transaction(**trans_data)
-                        self.update_entry_status(target_entry)
-                    else:
-                        raise ValueError(f"Could not find an entry matching '{payload.get('target_entry_label')}'.")
-            except Exception as e:
-                QMessageBox.critical(self, "Execution Error", f"Failed to execute AI plan.\nCommand: {command}\nError: {e}")
-                return
+        try:
+            result = apply_plan(commands, self.ledger_manager, self.transaction_manager, self._resolve_target_entry)
+        except Exception as e:
+            QMessageBox.critical(self, "Execution Error", f"Failed to execute AI plan. No changes were made.\nError: {e}")
+            return
 
-        self.save_and_refresh()
-        QMessageBox.information(self, "AI Command Executed", "The AI commands were executed successfully.")
+        self.save_and_refresh(changed=('ledger', 'transactions'))
+        self._show_payoff_summary(result.newly_paid)
+        QMessageBox.information(self, "AI Command Executed",
+                                f"The AI commands were executed successfully.\n"
+                                f"New entries: {len(result.entries)}, new transactions: {len(result.transactions)}")
+
+    def _resolve_target_entry(self, target_label):
+        """Finds the entry an AI command refers to, asking the user to choose if several fit equally well."""
+        matches = self.ledger_manager.get_label_index().resolve(target_label, active_only=True)
+        if len(matches) <= 1:
+            return matches[0].entry if matches else None
+        choices = [f"{m.entry.label} ({m.entry.entry_type.capitalize()})" for m in matches]
+        choice, ok = QInputDialog.getItem(self, "Which Entry?", f"Several entries match '{target_label}':", choices, 0, False)
+        return matches[choices.index(choice)].entry if ok else None
 
     # --- Tool Actions ---
     
@@ -1529,6 +1893,45 @@ class MainWindow(QMainWindow):
         msg.setMinimumWidth(500)
         msg.exec()
 
+    def show_balances_as_of(self):
+        """Shows every entry's balance and the net position as they stood on a chosen date."""
+        dialog = AsOfDateDialog(self)
+        if not dialog.exec():
+            return
+
+        as_of = dialog.selected_date
+        all_entries = self.ledger_manager.get_all_entries()
+        index = self._get_balance_index()
+        debt_totals, loan_totals = index.totals_as_of([as_of])
+
+        lines = [f"<h3>Balances as of {as_of.strftime('%d %b %Y')}</h3><table style='width:100%'>"]
+        lines.append("<tr><th style='text-align:left'>Entry</th><th style='text-align:left'>Type</th>"
+                     "<th style='text-align:right'>Balance</th></tr>")
+        for entry in sorted(all_entries, key=lambda e: (e.entry_type, e.label)):
+            balance = index.balance_as_of(entry, as_of)
+            if abs(balance) < 0.01:
+                continue
+            color = '#bf616a' if entry.entry_type == 'debt' else '#a3be8c'
+            lines.append(
+                f"<tr><td>{entry.label}</td><td>{entry.entry_type.capitalize()}</td>"
+                f"<td style='text-align:right; color:{color}'>${balance:,.2f}</td></tr>"
+            )
+        lines.append("</table>")
+
+        net_position = float(loan_totals[0] - debt_totals[0])
+        lines.append(
+            f"<p><b>Total Debt:</b> ${debt_totals[0]:,.2f}<br>"
+            f"<b>Total Loans:</b> ${loan_totals[0]:,.2f}<br>"
+            f"<b>Net Position:</b> ${net_position:,.2f}</p>"
+        )
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Balances As Of Date")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText("\n".join(lines))
+        msg.setMinimumWidth(500)
+        msg.exec()
+
     def quick_add_payment(self):
         """Quick-add a payment from the dashboard dropdown."""
         if self.quick_add_combo.currentIndex() < 0:
@@ -1546,7 +1949,7 @@ class MainWindow(QMainWindow):
                 **dialog.transaction_data
             )
             self.update_entry_status(entry)
-            self.save_and_refresh()
+            self.save_and_refresh(changed=('ledger', 'transactions'))
 
     def show_debt_snowball(self):
         active_debts = [e for e in self.ledger_manager.get_all_entries() if e.entry_type == 'debt' and e.status == 'active']
@@ -1567,19 +1970,71 @@ class MainWindow(QMainWindow):
 
     def show_what_if_calc(self):
         dialog = WhatIfDialog(self)
-        if dialog.exec():
+        if not dialog.exec():
+            return
+        if not dialog.stochastic:
             eta_string = calculate_what_if_eta(self.ledger_manager.get_all_entries(), self.transaction_manager.get_all_transactions(), dialog.amount)
             QMessageBox.information(self, "What-If Result", eta_string)
+            return
+
+        if self._what_if_worker and self._what_if_worker.isRunning():
+            QMessageBox.information(self, "What-If Simulation", "A simulation is already running.")
+            return
+
+        progress = QProgressDialog(f"Simulating {dialog.num_paths:,} payoff paths...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("What-If Simulation")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        worker = MonteCarloWorker(
+            self.ledger_manager.get_all_entries(),
+            self.transaction_manager.get_all_transactions(),
+            dialog.amount,
+            dialog.num_paths,
+            self,
+        )
+        worker.progress.connect(lambda done, total: (progress.setMaximum(total), progress.setValue(done)))
+        worker.result_ready.connect(lambda result: (progress.reset(), self._show_what_if_simulation(result)))
+        worker.finished.connect(progress.deleteLater)
+        progress.canceled.connect(worker.cancel)
+        self._what_if_worker = worker
+        worker.start()
+
+    def _show_what_if_simulation(self, result):
+        """Shows the percentile debt-free dates of a finished Monte Carlo run and charts it on the dashboard."""
+        if result is None:
+            QMessageBox.information(self, "What-If Result", "Nothing to simulate: there are no outstanding debts or payments to sample from.")
+            return
+
+        self._what_if_result = result
+        rows = []
+        for p, label in ((10, "Optimistic (P10)"), (50, "Likely (P50)"), (90, "Cautious (P90)")):
+            date = result.debt_free_dates[p]
+            rows.append(f"<tr><td>{label}</td><td style='text-align:right'><b>{date.strftime('%b %d, %Y') if date else 'Over 50 years'}</b></td></tr>")
+
+        history_note = (f"Monthly payments were sampled from {result.history_months} month(s) of your payment history"
+                        if result.history_months else "No payment history was found, so only the extra payment was used")
+        msg = QMessageBox(self)
+        msg.setWindowTitle("What-If Result")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText(
+            f"<h3>Simulated Debt-Free Dates</h3>"
+            f"<p>{result.num_paths:,} paths from ${result.starting_balance:,.2f} with ${result.extra_monthly_payment:,.2f} extra per month.</p>"
+            f"<table style='width:100%'>{''.join(rows)}</table>"
+            f"<p><i>{history_note}.</i></p>"
+        )
+        msg.exec()
+        self.refresh_dashboard()
 
     def log_net_position(self):
         """Manually log a net position snapshot (also happens automatically on save)."""
         self._record_net_position_snapshot()
         net_pos = self.net_worth_manager.get_all_snapshots()[0].net_position
         QMessageBox.information(self, "Snapshot Logged", f"Net position snapshot logged: ${net_pos:,.2f}")
-        self.save_and_refresh()
+        self.save_and_refresh(changed=('net_worth',))
 
-    def _record_net_position_snapshot(self):
-        """Auto-records a net position snapshot if it has changed since the last one."""
+    def _record_net_position_snapshot(self) -> bool:
+        """Auto-records a net position snapshot if it has changed since the last one. Returns whether one was recorded."""
         all_e = self.ledger_manager.get_all_entries()
         all_t = self.transaction_manager.get_all_transactions()
         debt_bal = sum(calculate_balance_for_entry(e, all_t) for e in all_e if e.entry_type == 'debt')
@@ -1590,7 +2045,7 @@ class MainWindow(QMainWindow):
 
         # Skip if unchanged
         if snapshots and abs(snapshots[0].net_position - net_pos) < 0.01:
-            return
+            return False
 
         # Outlier guard: if change is >10x the median absolute value, skip recording
         if len(snapshots) >= 3:
@@ -1598,9 +2053,10 @@ class MainWindow(QMainWindow):
             if values:
                 median_val = sorted(values)[len(values) // 2]
                 if median_val > 0 and abs(net_pos) > median_val * 10:
-                    return
+                    return False
 
         self.net_worth_manager.add_snapshot(net_pos)
+        return True
 
     # --- Helper & Utility Methods ---
 
@@ -1609,24 +2065,106 @@ class MainWindow(QMainWindow):
         balance = calculate_balance_for_entry(entry, self.transaction_manager.get_all_transactions())
         if balance <= 0 and entry.status == 'active':
             entry.status = 'paid'
-            entry_type = "debt" if entry.entry_type == 'debt' else "loan"
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Fully Paid Off!")
-            msg.setTextFormat(Qt.TextFormat.RichText)
-            msg.setText(
-                f"<h2>Congratulations!</h2>"
-                f"<p><b>{entry.label}</b> (${entry.amount:,.2f}) has been fully settled!</p>"
-                f"<p>This {entry_type} has been moved to your <b>History</b> tab.</p>"
-            )
-            msg.setIcon(QMessageBox.Icon.Information)
-            msg.exec()
+            bump_data_version()
+            self._show_payoff_message(entry)
         elif balance > 0 and entry.status == 'paid':
             entry.status = 'active'
+            bump_data_version()
+
+    def _show_payoff_message(self, entry: LedgerEntry):
+        entry_type = "debt" if entry.entry_type == 'debt' else "loan"
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Fully Paid Off!")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText(
+            f"<h2>Congratulations!</h2>"
+            f"<p><b>{entry.label}</b> (${entry.amount:,.2f}) has been fully settled!</p>"
+            f"<p>This {entry_type} has been moved to your <b>History</b> tab.</p>"
+        )
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.exec()
+
+    def _show_payoff_summary(self, entries: list[LedgerEntry]):
+        """One celebration for everything a batch settled, rather than a box per entry."""
+        if len(entries) == 1:
+            self._show_payoff_message(entries[0])
+        if len(entries) <= 1:
+            return
+        lines = [f"{entry.label} (${entry.amount:,.2f}, {entry.entry_type})" for entry in entries]
+        shown = "".join(f"<li>{html.escape(line)}</li>" for line in lines[:PAYOFF_PREVIEW_ENTRIES])
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Fully Paid Off!")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText(
+            f"<h2>Congratulations!</h2>"
+            f"<p>{len(entries)} entries have been fully settled:</p><ul>{shown}</ul>"
+            + (f"<p>...and {len(entries) - PAYOFF_PREVIEW_ENTRIES} more.</p>" if len(entries) > PAYOFF_PREVIEW_ENTRIES else "")
+            + "<p>They have been moved to your <b>History</b> tab.</p>"
+        )
+        if len(entries) > PAYOFF_PREVIEW_ENTRIES:
+            msg.setDetailedText("\n".join(lines))
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.exec()
     
-    def save_and_refresh(self):
-        """Saves all data to disk, auto-logs net position, refreshes the UI."""
-        self._record_net_position_snapshot()
+    def _update_line_chart(self, job, line_points):
+        if line_points is not None:
+            self.line_chart.show_series(*line_points, markersize=4 if job.line_source == 'derived' else 5)
+        elif job.line_source == 'derived':
+            self.line_chart.show_message('Add entries to see your net position over time')
+        elif len(job.snapshots) <= 1:
+            self.line_chart.show_message('At least two snapshots needed to see a trend')
+        else:
+            self.line_chart.show_message('Not enough data to chart')
+
+    def _update_fan_chart(self):
+        result = self._what_if_result
+        if result is None:
+            self.fan_chart.show_message('Run a Monte Carlo What-If\nto see a forecast')
+            return
+        bands = result.balance_bands
+        # Trim the horizon to a little past the month where even the cautious band reaches zero
+        still_owing = np.nonzero(bands[-1] > 0)[0]
+        horizon = min(bands.shape[1], (still_owing[-1] + 2) if still_owing.size else 2)
+        self.fan_chart.show_bands(np.arange(horizon), bands[:, :horizon])
+
+    def _get_balance_index(self):
+        """The balance index for the current data, rebuilt only after a change."""
+        if self._balance_index is None or self._balance_index_version != get_data_version():
+            self._balance_index = BalanceIndex(self.ledger_manager.get_all_entries(), self.transaction_manager.get_all_transactions())
+            self._balance_index_version = get_data_version()
+        return self._balance_index
+
+    def on_line_chart_options_changed(self):
+        source = self.line_source_combo.currentData()
+        self.line_resolution_combo.setEnabled(source == 'derived')
+        self.config['net_position_source'] = source
+        self.config['net_position_resolution'] = self.line_resolution_combo.currentData()
+        save_config(self.config)
+        self.refresh_dashboard()
+
+    def toggle_auto_snapshots(self, enabled):
+        self.config['auto_net_position_snapshots'] = enabled
+        save_config(self.config)
+
+    def toggle_ai_response_cache(self, enabled):
+        self.ai_analyser.cache.enabled = enabled
+        self.config['ai_response_cache'] = enabled
+        save_config(self.config)
+
+    def save_and_refresh(self, changed=None):
+        """
+        Saves all data to disk, auto-logs net position, refreshes the UI. `changed` names the
+        managers whose data was touched (see DATA_SOURCE_TABS); by default every tab is rebuilt.
+        """
+        # Direct edits to entries and transactions (and clearing the lists) don't go through the managers
+        bump_data_version()
+        changed = set(changed) if changed is not None else set(DATA_SOURCE_TABS)
+        # The net position only moves when entries or transactions do
+        if self.config.get('auto_net_position_snapshots', True) and changed & {'ledger', 'transactions'}:
+            if self._record_net_position_snapshot():
+                changed.add('net_worth')
         self.storage_manager.save_data(self.ledger_manager, self.transaction_manager, self.journal_manager, self.net_worth_manager)
+        self.mark_tabs_dirty(*changed)
         self.refresh_ui()
         self.statusBar().showMessage("Data Saved!", 2000)
 
@@ -1634,15 +2172,21 @@ class MainWindow(QMainWindow):
         """Gets the selected entry object from the currently active tab."""
         tab_index = self.tabs.currentIndex()
         if tab_index == 1: # Ledger Tab
-            item = self.active_list_widget.currentItem()
-            return item.data(Qt.ItemDataRole.UserRole) if item else None
+            return self._current_entry(self.active_list_view)
         elif tab_index == 2: # History Tab
-            item = self.history_list_widget.currentItem()
-            return item.data(Qt.ItemDataRole.UserRole) if item else None
+            return self._current_entry(self.history_list_view)
         return None
 
+    def _current_entry(self, list_view):
+        index = list_view.currentIndex()
+        return index.data(EntryRole) if index.isValid() else None
+
+    def _current_transaction(self, widgets):
+        index = widgets['transaction_list'].currentIndex()
+        return index.data(TransactionRole) if index.isValid() else None
+
     def get_selected_entry_id(self):
-        if not hasattr(self, 'active_list_widget'):
+        if not hasattr(self, 'active_list_view'):
             return None
         entry = self.get_selected_entry()
         return entry.id if entry else None
@@ -1664,10 +2208,12 @@ class MainWindow(QMainWindow):
             transactions = undo_item[2]
             self.ledger_manager.entries.append(entry)
             self.transaction_manager.transactions.extend(transactions)
+            bump_data_version()
             self.statusBar().showMessage(f"Restored '{entry.label}' and {len(transactions)} transaction(s)", 3000)
         elif undo_type == 'transaction':
             trans = undo_item[1]
             self.transaction_manager.transactions.append(trans)
+            bump_data_version()
             # Re-check parent entry status
             parent = self.ledger_manager.get_entry_by_id(trans.entry_id)
             if parent:
@@ -1676,6 +2222,7 @@ class MainWindow(QMainWindow):
         elif undo_type == 'journal':
             journal_entry = undo_item[1]
             self.journal_manager.entries.append(journal_entry)
+            bump_data_version()
             self.statusBar().showMessage("Restored journal entry", 3000)
 
         self.undo_action.setEnabled(bool(self._undo_stack))
@@ -1696,12 +2243,87 @@ class MainWindow(QMainWindow):
 
     def export_all_data(self):
         path = QFileDialog.getExistingDirectory(self, "Select Export Directory")
-        if path:
-            try:
-                export_data_to_csv(self.ledger_manager, self.transaction_manager, path)
-                QMessageBox.information(self, "Export Successful", f"Data successfully exported to:\n{path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Export Failed", f"An error occurred: {e}")
+        if not path:
+            return
+        progress = QProgressDialog("Exporting ledger and transactions...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Export to CSV")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        # Small exports finish before the dialog would be worth showing
+        progress.setMinimumDuration(500)
+
+        worker = CsvExportWorker(self.ledger_manager, self.transaction_manager, path, self)
+        worker.progress.connect(lambda done, total: (progress.setMaximum(total), progress.setValue(done)))
+        worker.result_ready.connect(lambda paths: (
+            progress.reset(),
+            QMessageBox.information(self, "Export Successful", f"Data successfully exported to:\n{path}")))
+        worker.failed.connect(lambda error: (progress.reset(), QMessageBox.critical(self, "Export Failed", f"An error occurred: {error}")))
+        worker.finished.connect(progress.deleteLater)
+        progress.canceled.connect(worker.cancel)
+        progress.canceled.connect(lambda: self.statusBar().showMessage("Export cancelled", 3000))
+        self._export_worker = worker
+        worker.start()
+
+    def import_bank_statement(self):
+        """Imports payments and repayments from a bank's CSV export, matched to entries by description."""
+        path, _ = QFileDialog.getOpenFileName(self, "Import Bank Statement", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            header = read_statement_header(path)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.critical(self, "Import Failed", f"Could not read the statement: {e}")
+            return
+        dialog = StatementImportDialog(header, ColumnMapping.from_dict(self.config.get('statement_import_mapping', {})), self)
+        if not dialog.exec():
+            return
+        self.config['statement_import_mapping'] = dialog.mapping.to_dict()
+        save_config(self.config)
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            statement = read_statement(path, dialog.mapping)
+            match_lines(statement, self.ledger_manager, self.transaction_manager)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            QMessageBox.critical(self, "Import Failed", f"Could not read the statement: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        lines = statement.to_import
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Import Bank Statement")
+        msg.setText(f"{len(statement.lines):,} statement line(s) read. {len(lines):,} can be imported.")
+        msg.setInformativeText(
+            f"{statement.duplicates:,} were imported before and will be skipped.\n"
+            f"{statement.unmatched:,} don't clearly match an active debt or loan and will be skipped.\n"
+            f"{len(statement.errors):,} line(s) couldn't be read."
+        )
+        details = []
+        unmatched = Counter(line.description for line in statement.lines if line.entry is None and not line.duplicate)
+        if unmatched:
+            details.append("Most common unmatched descriptions:")
+            details += [f"  {description} ({count})" for description, count in unmatched.most_common(20)]
+        if statement.errors:
+            details.append("Lines that couldn't be read:")
+            details += [f"  {error}" for error in statement.errors[:50]]
+        if details:
+            msg.setDetailedText("\n".join(details))
+        if lines:
+            msg.setStandardButtons(QMessageBox.StandardButton.Ok | QMessageBox.StandardButton.Cancel)
+            msg.button(QMessageBox.StandardButton.Ok).setText(f"Import {len(lines):,}")
+        else:
+            msg.setStandardButtons(QMessageBox.StandardButton.Close)
+        if msg.exec() != QMessageBox.StandardButton.Ok or not lines:
+            return
+
+        try:
+            result = apply_transactions(build_transactions(lines), self.ledger_manager, self.transaction_manager)
+        except Exception as e:
+            QMessageBox.critical(self, "Import Failed", f"Failed to import the statement. No changes were made.\nError: {e}")
+            return
+        self.save_and_refresh(changed=('ledger', 'transactions'))
+        self._show_payoff_summary(result.newly_paid)
+        self.statusBar().showMessage(f"Imported {len(result.transactions):,} transaction(s) from the statement", 5000)
 
     def backup_data(self):
         path, _ = QFileDialog.getSaveFileName(self, "Save Backup", "finance_board_backup.json", "JSON Files (*.json)")
@@ -1732,11 +2354,122 @@ class MainWindow(QMainWindow):
             self.transaction_manager.transactions = [Transaction.from_dict(t) for t in all_data.get("transactions", [])]
             self.journal_manager.entries = [JournalEntry.from_dict(j) for j in all_data.get("journal_entries", [])]
             self.net_worth_manager.snapshots = [NetWorthSnapshot.from_dict(n) for n in all_data.get("net_worth_snapshots", [])]
+            bump_data_version()
+            self.mark_tabs_dirty()
             self.refresh_ui()
             QMessageBox.information(self, "Restore Successful", "Data has been restored from the backup.")
         else:
             QMessageBox.critical(self, "Restore Failed", "The selected file is not a valid Finance Board backup.")
 
+    def show_cache_stats(self):
+        """Shows hit/miss counters for the memoised summary calculations."""
+        lines = [f"<h3>Calculation Cache</h3><p>Data version: {get_data_version()}</p><table style='width:100%'>"]
+        lines.append("<tr><th style='text-align:left'>Function</th><th style='text-align:right'>Hits</th>"
+                     "<th style='text-align:right'>Misses</th><th style='text-align:right'>Hit Rate</th>"
+                     "<th style='text-align:right'>Size</th></tr>")
+        for name, stats in sorted(get_cache_stats().items()):
+            lines.append(
+                f"<tr><td>{name.rsplit('.', 1)[-1]}</td>"
+                f"<td style='text-align:right'>{stats['hits']:,}</td>"
+                f"<td style='text-align:right'>{stats['misses']:,}</td>"
+                f"<td style='text-align:right'>{stats['hit_rate']:.0%}</td>"
+                f"<td style='text-align:right'>{stats['size']}/{stats['maxsize']}</td></tr>"
+            )
+        lines.append("</table>")
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Calculation Cache")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText("\n".join(lines))
+        msg.setMinimumWidth(500)
+        msg.exec()
+
+    def show_ai_cache_stats(self):
+        """Shows hit/miss counters for the on-disk AI response cache, with an option to empty it."""
+        cache = self.ai_analyser.cache
+        stats = cache.get_stats()
+        msg = QMessageBox(self)
+        msg.setWindowTitle("AI Response Cache")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText(
+            f"<h3>AI Response Cache</h3>"
+            f"<p>{'Enabled' if stats['enabled'] else 'Bypassed'}; responses expire after {stats['ttl_seconds'] / 3600:g} hours.</p>"
+            f"<table style='width:100%'>"
+            f"<tr><td>Hits</td><td style='text-align:right'>{stats['hits']:,}</td></tr>"
+            f"<tr><td>Misses</td><td style='text-align:right'>{stats['misses']:,}</td></tr>"
+            f"<tr><td>Hit Rate</td><td style='text-align:right'>{stats['hit_rate']:.0%}</td></tr>"
+            f"<tr><td>Evictions</td><td style='text-align:right'>{stats['evictions']:,}</td></tr>"
+            f"<tr><td>Size</td><td style='text-align:right'>{stats['size']}/{stats['max_entries']}</td></tr>"
+            f"</table>"
+        )
+        msg.setInformativeText(cache.directory)
+        clear_btn = msg.addButton("Clear Cache", QMessageBox.ButtonRole.DestructiveRole)
+        msg.addButton(QMessageBox.StandardButton.Close)
+        msg.setMinimumWidth(400)
+        msg.exec()
+        if msg.clickedButton() == clear_btn:
+            cache.clear()
+            self.statusBar().showMessage("AI response cache cleared", 3000)
+
+    def show_ai_usage(self):
+        """Shows latency percentiles and daily totals for recent AI calls, with an option to clear them."""
+        telemetry = self.ai_analyser.telemetry
+        usage = summarise_usage(telemetry.records())
+
+        def ms(value):
+            return "–" if value is None else f"{value:,.0f} ms"
+
+        if not usage["calls"]:
+            lines = ["<h3>AI Usage</h3><p>No AI calls have been recorded yet.</p>"]
+        else:
+            lines = [
+                f"<h3>AI Usage</h3>"
+                f"<p>{usage['calls']:,} calls since {usage['since']:%d %b %Y}: {usage['cache_hits']:,} answered from the cache, "
+                f"{usage['errors']:,} failed, {usage['cancelled']:,} cancelled, {usage['retries']:,} retries.</p>"
+                f"<table style='width:100%'>"
+                f"<tr><th></th><th style='text-align:right'>p50</th><th style='text-align:right'>p95</th></tr>"
+                f"<tr><td>Total time</td><td style='text-align:right'>{ms(usage['p50_ms'])}</td>"
+                f"<td style='text-align:right'>{ms(usage['p95_ms'])}</td></tr>"
+                f"<tr><td>Time to first byte</td><td style='text-align:right'>{ms(usage['first_byte_p50_ms'])}</td>"
+                f"<td style='text-align:right'>{ms(usage['first_byte_p95_ms'])}</td></tr>"
+                f"</table><br>"
+                f"<table style='width:100%'>"
+                f"<tr><th style='text-align:left'>Day</th><th style='text-align:right'>Calls</th>"
+                f"<th style='text-align:right'>Cached</th><th style='text-align:right'>Errors</th>"
+                f"<th style='text-align:right'>Prompt Tokens</th><th style='text-align:right'>Response Tokens</th>"
+                f"<th style='text-align:right'>p50</th></tr>"
+            ]
+            for day in usage["daily"]:
+                lines.append(
+                    f"<tr><td>{day['day']:%a %d %b}</td>"
+                    f"<td style='text-align:right'>{day['calls']:,}</td>"
+                    f"<td style='text-align:right'>{day['cache_hits']:,}</td>"
+                    f"<td style='text-align:right'>{day['errors']:,}</td>"
+                    f"<td style='text-align:right'>{day['prompt_tokens']:,}</td>"
+                    f"<td style='text-align:right'>{day['response_tokens']:,}</td>"
+                    f"<td style='text-align:right'>{ms(day['p50_ms'])}</td></tr>"
+                )
+            lines.append("</table>")
+            if usage["recent_errors"]:
+                lines.append("<p><b>Recent errors</b></p><ul>")
+                for record in reversed(usage["recent_errors"]):
+                    error = record.error.replace("&", "&amp;").replace("<", "&lt;")
+                    lines.append(f"<li>{datetime.fromtimestamp(record.started):%d %b %H:%M}: {error}</li>")
+                lines.append("</ul>")
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("AI Usage")
+        msg.setTextFormat(Qt.TextFormat.RichText)
+        msg.setText("\n".join(lines))
+        msg.setInformativeText(f"Prompt tokens are estimated locally. The last {telemetry.max_records:,} calls are kept in {telemetry.path}")
+        clear_btn = msg.addButton("Clear History", QMessageBox.ButtonRole.DestructiveRole)
+        msg.addButton(QMessageBox.StandardButton.Close)
+        msg.setMinimumWidth(600)
+        msg.exec()
+        if msg.clickedButton() == clear_btn:
+            telemetry.clear()
+            self.statusBar().showMessage("AI usage history cleared", 3000)
+
     def show_api_key_dialog(self, is_first_run=False):
         current_key = self.config.get("OPENROUTER_API_KEY", "")
         dialog = ApiKeyDialog(current_key=current_key, parent=self)
@@ -1750,5 +2483,21 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """Ensures data is saved when the application is closed."""
+        if self._what_if_worker and self._what_if_worker.isRunning():
+            self._what_if_worker.cancel()
+            self._what_if_worker.wait()
+        if self._export_worker and self._export_worker.isRunning():
+            # Cancelling deletes the half-written files
+            self._export_worker.cancel()
+            self._export_worker.wait()
+        # A blocking AI call can't be interrupted, so it only gets a moment to finish. Streams close
+        # at their next chunk.
+        if not AiRequestWorker.cancel_all(timeout_ms=AI_CLOSE_WAIT_MS):
+            print("Closing with AI requests still running; their results will be dropped.")
+        self.ai_analyser.close()
+        # Let any ledger query see it's stale and exit before the window goes away
+        self._ledger_query_generation += 1
+        QThreadPool.globalInstance().waitForDone()
+        self._dashboard_worker.stop()
         self.save_and_refresh()
         super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,201 @@
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# Custom item data roles shared by the entry models and their proxies
+EntryRole = Qt.ItemDataRole.UserRole
+LabelSortRole = Qt.ItemDataRole.UserRole + 1
+TransactionRole = Qt.ItemDataRole.UserRole + 2
+
+# Rows handed to a view per fetchMore() call on the transaction list
+TRANSACTION_PAGE_SIZE = 200
+
+# Above this many separate removal ranges a single reset is cheaper than per-range signals
+MAX_REMOVAL_RANGES = 64
+
+
+def entry_signature(entry, paid_by_entry: dict[str, float]) -> tuple:
+    """Everything a row's display or sort keys depend on; rows are only re-emitted when it changes."""
+    return (entry.label, entry.entry_type, entry.amount, entry.status, entry.date_incurred,
+            entry.comments, tuple(entry.tags), paid_by_entry.get(entry.id, 0.0))
+
+
+def _contiguous_ranges(rows: list[int]) -> list[tuple[int, int]]:
+    """Groups sorted row numbers into inclusive (first, last) ranges."""
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
+
+
+class EntryListModel(QAbstractListModel):
+    """
+    A list model over ledger entries, in the order they were given. Rows are only formatted when
+    a view asks for them, and set_entries() diffs against the current rows so views get
+    fine-grained signals and keep their selection.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+        self._signatures = []
+        self._ids = []
+        self._row_by_id = {}
+        self._paid_by_entry = {}
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # Sorting calls this twice per comparison, so dispatch on the role with a single dict lookup
+        getter = self._role_getters.get(role)
+        if getter is None or not index.isValid():
+            return None
+        return getter(self, self._entries[index.row()])
+
+    # --- Formatting ---
+
+    def balance_for(self, entry) -> float:
+        return entry.amount - self._paid_by_entry.get(entry.id, 0.0)
+
+    def format_entry(self, entry) -> str:
+        type_icon = "\u25B2" if entry.entry_type == 'loan' else "\u25BC"
+        return f"{type_icon}  {entry.label}    ${self.balance_for(entry):,.2f}"
+
+    # --- Updates ---
+
+    def set_entries(self, entries, paid_by_entry: dict[str, float],
+                    signatures: list[tuple] | None = None, ids: list[str] | None = None):
+        """
+        Brings the model in line with the given entries, emitting only the row signals needed.
+        Signatures and ids can be precomputed off the GUI thread; otherwise they are built here.
+        """
+        self._paid_by_entry = paid_by_entry
+        if signatures is None:
+            signatures = [entry_signature(e, paid_by_entry) for e in entries]
+        if ids is None:
+            ids = [e.id for e in entries]
+        new_row_by_id = dict(zip(ids, range(len(ids))))
+
+        removed_rows = [row for row, entry_id in enumerate(self._ids) if entry_id not in new_row_by_id]
+        removal_ranges = _contiguous_ranges(removed_rows)
+        if len(removal_ranges) > MAX_REMOVAL_RANGES:
+            self.beginResetModel()
+            self._replace_rows(entries, signatures, ids, new_row_by_id)
+            self.endResetModel()
+            return
+
+        for first, last in reversed(removal_ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._entries[first:last + 1]
+            del self._signatures[first:last + 1]
+            del self._ids[first:last + 1]
+            self.endRemoveRows()
+
+        kept = len(self._ids)
+        if self._ids != ids[:kept]:
+            # The order changed, so views will re-read every row after the layout change anyway
+            existing_ids = set(self._ids)
+            self._append_rows(entries, signatures, ids, [row for row, entry_id in enumerate(ids) if entry_id not in existing_ids])
+            self._reorder(entries, signatures, ids, new_row_by_id)
+            return
+
+        changed_rows = [row for row, (old_entry, entry, old_signature, signature)
+                        in enumerate(zip(self._entries, entries, self._signatures, signatures))
+                        if entry is not old_entry or signature != old_signature]
+        for row in changed_rows:
+            self._entries[row] = entries[row]
+            self._signatures[row] = signatures[row]
+        for first, last in _contiguous_ranges(changed_rows):
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+        # With the kept rows as a prefix, everything after it is new
+        self._append_rows(entries, signatures, ids, range(kept, len(ids)))
+        self._row_by_id = new_row_by_id
+
+    def _append_rows(self, entries, signatures, ids, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        first = len(self._ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._entries.extend(entries[row] for row in rows)
+        self._signatures.extend(signatures[row] for row in rows)
+        self._ids.extend(ids[row] for row in rows)
+        self.endInsertRows()
+
+    def _replace_rows(self, entries, signatures, ids, row_by_id):
+        self._entries = list(entries)
+        self._signatures = list(signatures)
+        self._ids = list(ids)
+        self._row_by_id = row_by_id
+
+    def _reorder(self, entries, signatures, ids, new_row_by_id):
+        """Moves the existing rows into the given order as one layout change, keeping persistent indexes valid."""
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(new_row_by_id[self._ids[index.row()]]) for index in old_indexes]
+        self._replace_rows(entries, signatures, ids, new_row_by_id)
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def index_for_id(self, entry_id: str) -> QModelIndex:
+        row = self._row_by_id.get(entry_id)
+        return self.index(row) if row is not None else QModelIndex()
+
+    _role_getters = {
+        Qt.ItemDataRole.DisplayRole: lambda self, e: self.format_entry(e),
+        EntryRole: lambda self, e: e,
+        LabelSortRole: lambda self, e: (e.label or '').lower(),
+    }
+
+
+class HistoryListModel(EntryListModel):
+    """The History tab's list of paid and settled entries."""
+    def format_entry(self, entry) -> str:
+        type_label = "Loan" if entry.entry_type == 'loan' else "Debt"
+        return f"\u2713  {entry.label}  ({type_label} - ${entry.amount:,.2f})"
+
+
+class TransactionListModel(QAbstractListModel):
+    """
+    A details panel's transactions for one entry, in the order given. The list is shared rather
+    than copied, and rows are exposed a page at a time as the view scrolls, so showing an entry
+    costs the same however many transactions it has.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._transactions = []
+        self._loaded = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        t = self._transactions[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{t.date_paid.strftime('%Y-%m-%d')} - {t.label} (${t.amount:,.2f})"
+        if role == TransactionRole:
+            return t
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._transactions)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(TRANSACTION_PAGE_SIZE, len(self._transactions) - self._loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def set_transactions(self, transactions: list):
+        self.beginResetModel()
+        self._transactions = transactions
+        self._loaded = 0
+        self.endResetModel()
@@ -0,0 +1,318 @@
+from dataclasses import dataclass
+import queue
+
+from PyQt6.QtCore import QDeadlineTimer, QObject, QRunnable, QThread, pyqtSignal
+
+from Backend.core.summary_calculator import (
+    DashboardSummary, calculate_dashboard_summary, calculate_net_position_series,
+    calculate_paid_by_entry, filter_snapshot_outliers,
+)
+from Backend.utils.financial_algorithms import run_monte_carlo_what_if
+from Backend.core.export_manager import export_lists_to_csv
+from Frontend.models import entry_signature
+
+# How many entries a ledger query scans between checks for a newer query
+LEDGER_QUERY_CHECK_INTERVAL = 4096
+
+
+class MonteCarloWorker(QThread):
+    """Runs a Monte Carlo What-If simulation off the GUI thread."""
+    progress = pyqtSignal(int, int)
+    result_ready = pyqtSignal(object)
+
+    def __init__(self, all_entries, all_transactions, extra_monthly_payment, num_paths, parent=None):
+        super().__init__(parent)
+        # Shallow copies so edits made while the run is in flight don't change its inputs
+        self.all_entries = list(all_entries)
+        self.all_transactions = list(all_transactions)
+        self.extra_monthly_payment = extra_monthly_payment
+        self.num_paths = num_paths
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        result = run_monte_carlo_what_if(
+            self.all_entries,
+            self.all_transactions,
+            self.extra_monthly_payment,
+            num_paths=self.num_paths,
+            progress_callback=self.progress.emit,
+            is_cancelled=self.is_cancelled,
+        )
+        if not self._cancelled:
+            self.result_ready.emit(result)
+
+
+class CsvExportWorker(QThread):
+    """
+    Writes the ledger and transaction CSV exports off the GUI thread. result_ready carries the
+    two file paths; a cancelled export deletes its partial files and emits nothing.
+    The lists are copied on the GUI thread, so edits made during the export can't race it.
+    """
+    progress = pyqtSignal(int, int)
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, ledger_manager, transaction_manager, output_dir, parent=None):
+        super().__init__(parent)
+        self.all_entries = list(ledger_manager.get_all_entries())
+        self.all_transactions = list(transaction_manager.get_all_transactions())
+        self.output_dir = output_dir
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        try:
+            paths = export_lists_to_csv(self.all_entries, self.all_transactions, self.output_dir,
+                                        progress_callback=self.progress.emit, is_cancelled=self.is_cancelled)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        if paths is not None and not self._cancelled:
+            self.result_ready.emit(paths)
+
+
+class AiRequestWorker(QThread):
+    """
+    Runs one FinancialAnalyser call off the GUI thread and emits its return value. Cancelling
+    drops the result; the HTTP call itself runs to completion or its timeout in the background.
+    Running workers are kept alive by the class so callers needn't hold on to them.
+    """
+    result_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    _running = set()
+
+    def __init__(self, request, *args, parent=None):
+        super().__init__(parent)
+        self.request = request
+        self.args = args
+        self._cancelled = False
+        AiRequestWorker._running.add(self)
+        self.finished.connect(self._forget)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _forget(self):
+        # Runs on the GUI thread; finished is emitted just before the thread exits, so wait it out
+        self.wait()
+        AiRequestWorker._running.discard(self)
+
+    def run(self):
+        try:
+            result = self.request(*self.args)
+        except Exception as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+            return
+        if not self._cancelled:
+            self.result_ready.emit(result)
+
+    @classmethod
+    def cancel_all(cls, timeout_ms: int | None = None) -> bool:
+        """
+        Cancels every running request. With a timeout, waits up to `timeout_ms` in all for their
+        threads to finish. Returns whether none are still running.
+        """
+        workers = list(cls._running)
+        for worker in workers:
+            worker.cancel()
+        if timeout_ms is None:
+            return not any(worker.isRunning() for worker in workers)
+        deadline = QDeadlineTimer(timeout_ms)
+        return all(worker.wait(deadline) for worker in workers)
+
+
+class AiStreamWorker(AiRequestWorker):
+    """
+    Runs a streaming FinancialAnalyser call, emitting each piece of text as it arrives and the
+    full text at the end. Cancelling closes the stream, which also closes the connection.
+    """
+    chunk_ready = pyqtSignal(str)
+
+    def run(self):
+        parts = []
+        stream = None
+        try:
+            stream = self.request(*self.args)
+            for text in stream:
+                if self._cancelled:
+                    break
+                parts.append(text)
+                self.chunk_ready.emit(text)
+        except Exception as e:
+            if not self._cancelled:
+                self.failed.emit(str(e))
+            return
+        finally:
+            if stream is not None:
+                stream.close()
+        if not self._cancelled:
+            self.result_ready.emit("".join(parts))
+
+
+@dataclass(frozen=True)
+class LedgerQuery:
+    """The Ledger tab's search text, type filter and sort combo index."""
+    search_text: str = ""
+    entry_type: str | None = None
+    sort_index: int = 0
+
+
+@dataclass
+class LedgerQueryResult:
+    entries: list
+    paid_by_entry: dict
+    signatures: list
+    ids: list
+
+
+def filter_and_sort_entries(entries, paid_by_entry: dict[str, float], query: LedgerQuery, is_stale=None):
+    """
+    Returns the active entries matching the query, in the order the sort combo asks for.
+    Returns None if is_stale() reports a newer query part way through.
+    """
+    search_text = query.search_text.strip().lower()
+    matches = []
+    for i, entry in enumerate(entries):
+        if is_stale and i % LEDGER_QUERY_CHECK_INTERVAL == 0 and is_stale():
+            return None
+        if entry.status != 'active':
+            continue
+        if query.entry_type and entry.entry_type != query.entry_type:
+            continue
+        if search_text and not (search_text in entry.label.lower() or
+                                any(search_text in tag.lower() for tag in entry.tags) or
+                                (entry.comments and search_text in entry.comments.lower())):
+            continue
+        matches.append(entry)
+
+    if is_stale and is_stale():
+        return None
+
+    sort_key, reverse = {
+        0: (lambda e: (e.label or '').lower(), False),
+        1: (lambda e: (e.label or '').lower(), True),
+        2: (lambda e: e.amount - paid_by_entry.get(e.id, 0.0), False),
+        3: (lambda e: e.amount - paid_by_entry.get(e.id, 0.0), True),
+        4: (lambda e: e.date_incurred, True),
+        5: (lambda e: e.date_incurred, False),
+    }[query.sort_index]
+    matches.sort(key=sort_key, reverse=reverse)
+    return matches
+
+
+class _LedgerQuerySignals(QObject):
+    # QRunnable isn't a QObject, so its signals live on a helper
+    result_ready = pyqtSignal(int, object)
+
+
+class LedgerQueryTask(QRunnable):
+    """
+    Filters and sorts a snapshot of the ledger on a QThreadPool thread. Each task carries the
+    generation it was started for and gives up as soon as current_generation() moves past it.
+    """
+    def __init__(self, generation: int, current_generation, all_entries, all_transactions, query: LedgerQuery):
+        super().__init__()
+        self.signals = _LedgerQuerySignals()
+        self.generation = generation
+        self.current_generation = current_generation
+        # Shallow copies so the snapshot doesn't change length under the worker
+        self.all_entries = list(all_entries)
+        self.all_transactions = list(all_transactions)
+        self.query = query
+
+    def is_stale(self) -> bool:
+        return self.current_generation() != self.generation
+
+    def run(self):
+        if self.is_stale():
+            return
+        # Bypass the memo: the copied list would only ever miss and push out the GUI thread's entries
+        paid_by_entry = calculate_paid_by_entry.__wrapped__(self.all_transactions)
+        entries = filter_and_sort_entries(self.all_entries, paid_by_entry, self.query, self.is_stale)
+        if entries is None:
+            return
+        signatures = [entry_signature(e, paid_by_entry) for e in entries]
+        ids = [e.id for e in entries]
+        if not self.is_stale():
+            self.signals.result_ready.emit(self.generation, LedgerQueryResult(entries, paid_by_entry, signatures, ids))
+
+
+@dataclass
+class DashboardJob:
+    """A read-only snapshot of everything the dashboard is computed from."""
+    generation: int
+    data_version: int
+    all_entries: list
+    all_transactions: list
+    snapshots: list
+    line_source: str
+    line_resolution: str
+
+
+@dataclass
+class DashboardResult:
+    summary: DashboardSummary
+    # (dates, values) for the net position line, or None if there's too little data to chart
+    line_points: tuple[list, list] | None
+
+
+def compute_dashboard(job: DashboardJob) -> DashboardResult:
+    summary = calculate_dashboard_summary(job.all_entries, job.all_transactions)
+    if job.line_source == 'derived':
+        series = calculate_net_position_series(job.all_entries, job.all_transactions, job.line_resolution)
+        line_points = (series.dates, series.net_position) if series is not None and len(series.dates) > 1 else None
+    else:
+        points = filter_snapshot_outliers(job.snapshots) if len(job.snapshots) > 1 else []
+        line_points = tuple(map(list, zip(*points))) if len(points) > 1 else None
+    return DashboardResult(summary, line_points)
+
+
+class DashboardWorker(QThread):
+    """
+    A long-lived thread that computes dashboard figures from queued snapshots. Jobs queued
+    while one is running are collapsed to the newest, since the older ones are already stale.
+    A job that fails is reported through `failed`, and the thread carries on with the next.
+    """
+    result_ready = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = queue.Queue()
+
+    def submit(self, job: DashboardJob):
+        self._jobs.put(job)
+
+    def stop(self):
+        self._jobs.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            while job is not None and not self._jobs.empty():
+                job = self._jobs.get_nowait()
+            if job is None:
+                return
+            try:
+                result = compute_dashboard(job)
+            except Exception as e:
+                self.failed.emit(job, f"{type(e).__name__}: {e}")
+                continue
+            self.result_ready.emit(job, result)
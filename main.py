@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from Frontend.gui import MainWindow
 from PyQt6.QtWidgets import QApplication
 
@@ -61,25 +62,25 @@ DARK_STYLESHEET = """
     }
 
     /* --- Lists --- */
-    QListWidget, QTextBrowser {
+    QListWidget, QListView, QTextBrowser {
         background-color: #3b4252;
         border: 1px solid #3b4252;
         border-radius: 8px;
         padding: 4px;
         outline: none;
     }
-    QListWidget::item {
+    QListWidget::item, QListView::item {
         padding: 10px 14px;
         border-radius: 6px;
         margin: 1px 2px;
         border: 1px solid transparent;
     }
-    QListWidget::item:selected {
+    QListWidget::item:selected, QListView::item:selected {
         background-color: rgba(94, 129, 172, 0.35);
         color: #eceff4;
         border: 1px solid #5e81ac;
     }
-    QListWidget::item:hover:!selected {
+    QListWidget::item:hover:!selected, QListView::item:hover:!selected {
         background-color: rgba(76, 86, 106, 0.3);
     }
 
@@ -348,6 +349,8 @@ DARK_STYLESHEET = """
 """
 
 if __name__ == "__main__":
+    # Required for the What-If simulation's process pool in PyInstaller builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyleSheet(DARK_STYLESHEET.replace(
         "url(assets/dropdown_arrow.png)",
@@ -0,0 +1,59 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from Backend.core.ai_context import build_context_sections, build_financial_context
+from Backend.core.ledger_manager import LedgerManager
+from Backend.core.tag_manager import TagManager
+from Backend.core.transaction_manager import TransactionManager
+from Backend.ui_helpers import _edit_ledger_entry, _edit_transaction
+
+
+def run_cli(function, *args, answers):
+    """Runs a CLI handler with `answers` typed at its prompts, discarding what it prints."""
+    with patch("builtins.input", side_effect=answers), redirect_stdout(io.StringIO()):
+        function(*args)
+
+
+class ContextAfterCliEditsTests(unittest.TestCase):
+    """The AI context is cached per data version, so every CLI edit to its text must bump the version."""
+
+    def setUp(self):
+        self.ledger_manager = LedgerManager()
+        self.transaction_manager = TransactionManager()
+        self.tag_manager = TagManager()
+        self.entry = self.ledger_manager.add_entry("Visa Card", 1000.0, "debt")
+        self.transaction = self.transaction_manager.add_transaction(self.entry.id, 100.0, "payment", "First payment")
+
+    def context(self) -> str:
+        return build_financial_context(self.ledger_manager.get_all_entries(), self.transaction_manager.get_all_transactions())
+
+    def test_transaction_label_edit_reaches_the_context(self):
+        self.assertIn("First payment", self.context())
+        run_cli(_edit_transaction, self.ledger_manager, self.transaction_manager, self.tag_manager,
+                answers=[self.transaction.id[:8], "1", "Card repayment", "c"])
+
+        context = self.context()
+        self.assertIn("Card repayment", context)
+        self.assertNotIn("First payment", context)
+
+    def test_entry_label_edit_reaches_the_context(self):
+        self.assertIn("Visa Card", self.context())
+        run_cli(_edit_ledger_entry, self.ledger_manager, self.transaction_manager, self.tag_manager,
+                answers=[self.entry.id[:8], "1", "Mastercard", "c"])
+
+        self.assertIn("Mastercard", self.context())
+
+    def test_entry_tag_edit_reaches_the_context(self):
+        sections = lambda: build_context_sections(self.ledger_manager.get_all_entries(),
+                                                  self.transaction_manager.get_all_transactions())
+        self.assertEqual(sections().entries[0].group, "")
+        run_cli(_edit_ledger_entry, self.ledger_manager, self.transaction_manager, self.tag_manager,
+                answers=[self.entry.id[:8], "4", "2", "cards", "c", "c"])
+
+        self.assertEqual(sections().entries[0].group, "other:cards")
+
+
+if __name__ == "__main__":
+    unittest.main()
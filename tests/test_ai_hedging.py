@@ -0,0 +1,58 @@
+import os
+import tempfile
+import time
+import unittest
+
+from Backend.core.ai_analyser import FinancialAnalyser
+from Backend.core.ai_telemetry import AiTelemetry
+from Backend.core.response_cache import ResponseCache
+from Backend.utils.mock_openrouter import MockOpenRouterServer, MockSettings
+
+HEDGE_MODEL = "mock/hedge-model"
+
+
+class HedgedCallTests(unittest.TestCase):
+    """A blocking call that is hedged records the attempt whose answer was used."""
+
+    def setUp(self):
+        server = MockOpenRouterServer(settings=MockSettings(latency=0.0, token_delay=0.0, seed=1)).start()
+        self.addCleanup(server.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.telemetry = AiTelemetry(path=os.path.join(directory.name, "ai_usage.jsonl"))
+        self.analyser = FinancialAnalyser(api_key="mock", cache=ResponseCache(enabled=False), base_url=server.base_url,
+                                          telemetry=self.telemetry, hedge_after_seconds=0.05, hedge_model=HEDGE_MODEL)
+        self.addCleanup(self.analyser.close)
+
+    def slow_down(self, model: str, seconds: float):
+        post = self.analyser._post
+
+        def slow_post(headers, data, *args, **kwargs):
+            if data["model"] == model:
+                time.sleep(seconds)
+            return post(headers, data, *args, **kwargs)
+        self.analyser._post = slow_post
+
+    def test_hedge_that_wins_is_the_one_recorded(self):
+        primary_model = self.analyser.models["analyst"]
+        self.slow_down(primary_model, 0.5)
+        self.analyser._call_ai("You are a test.", "Say something.")
+
+        record = self.telemetry.records()[-1]
+        self.assertEqual(record.model, HEDGE_MODEL)
+        self.assertIsNotNone(record.response_tokens)
+        self.assertIsNotNone(record.first_byte_ms)
+        self.assertLess(record.first_byte_ms, 500)
+
+    def test_primary_that_answers_in_time_is_the_one_recorded(self):
+        primary_model = self.analyser.models["analyst"]
+        self.slow_down(HEDGE_MODEL, 0.5)
+        self.analyser._call_ai("You are a test.", "Say something.")
+
+        record = self.telemetry.records()[-1]
+        self.assertEqual(record.model, primary_model)
+        self.assertIsNotNone(record.response_tokens)
+
+
+if __name__ == "__main__":
+    unittest.main()
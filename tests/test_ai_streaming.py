@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from Backend.core.ai_analyser import FinancialAnalyser, is_ai_error
+from Backend.core.ai_telemetry import AiTelemetry
+from Backend.core.response_cache import ResponseCache
+from Backend.utils.mock_openrouter import MOCK_REPORT, MockOpenRouterServer, MockSettings
+
+SYSTEM_PROMPT = "You are a test."
+USER_PROMPT = "Say something."
+
+
+class StreamAiTests(unittest.TestCase):
+    """Runs FinancialAnalyser._stream_ai against the local mock of OpenRouter."""
+
+    def start_server(self, **settings):
+        server = MockOpenRouterServer(settings=MockSettings(latency=0.0, token_delay=0.0, seed=1, **settings)).start()
+        self.addCleanup(server.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.telemetry = AiTelemetry(path=os.path.join(directory.name, "ai_usage.jsonl"))
+        self.analyser = FinancialAnalyser(api_key="mock", cache=ResponseCache(enabled=False),
+                                          base_url=server.base_url, telemetry=self.telemetry)
+        return server
+
+    def test_streams_the_whole_reply(self):
+        self.start_server()
+        chunks = list(self.analyser._stream_ai(SYSTEM_PROMPT, USER_PROMPT))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), MOCK_REPORT.format(words=len(f"{SYSTEM_PROMPT} {USER_PROMPT}".split())))
+        record = self.telemetry.records()[-1]
+        self.assertEqual(record.outcome, "ok")
+        self.assertTrue(record.streamed)
+        self.assertIsNotNone(record.response_tokens)
+
+    def test_retries_a_rate_limited_request(self):
+        server = self.start_server(burst_every=1000, burst_length=1, retry_after=0)
+        reply = "".join(self.analyser._stream_ai(SYSTEM_PROMPT, USER_PROMPT))
+
+        self.assertFalse(is_ai_error(reply))
+        self.assertEqual(server.stats["throttled"], 1)
+        self.assertEqual(self.telemetry.records()[-1].retries, 1)
+
+    def test_reports_an_error_when_every_attempt_fails(self):
+        self.start_server(burst_every=1, burst_length=1, retry_after=0)
+        reply = "".join(self.analyser._stream_ai(SYSTEM_PROMPT, USER_PROMPT))
+
+        self.assertTrue(is_ai_error(reply))
+        self.assertEqual(self.telemetry.records()[-1].outcome, "error")
+
+    def test_closing_the_stream_cancels_the_call(self):
+        self.start_server()
+        stream = self.analyser._stream_ai(SYSTEM_PROMPT, USER_PROMPT)
+        next(stream)
+        stream.close()
+
+        self.assertEqual(self.telemetry.records()[-1].outcome, "cancelled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from Backend.core import batch_executor
+from Backend.core.batch_executor import apply_plan, apply_transactions
+from Backend.core.ledger_manager import LedgerManager
+from Backend.core.transaction_manager import Transaction, TransactionManager
+
+_real_update_statuses = batch_executor._update_statuses
+
+
+def update_statuses_then_fail(entries, all_transactions):
+    """Fails after the statuses have already been changed."""
+    _real_update_statuses(entries, all_transactions)
+    raise RuntimeError("disk full")
+
+
+class BatchRollbackTests(unittest.TestCase):
+    """A batch that fails part way through committing leaves the managers exactly as they were."""
+
+    def setUp(self):
+        self.ledger_manager = LedgerManager()
+        self.transaction_manager = TransactionManager()
+        self.card = self.ledger_manager.add_entry("Visa Card", 100.0, "debt")
+        self.loan = self.ledger_manager.add_entry("Car Loan", 500.0, "debt")
+        # Paid off, so a refund in the batch would reopen it
+        self.phone = self.ledger_manager.add_entry("Phone", 50.0, "debt", status="paid")
+        self.transaction_manager.add_transaction(self.loan.id, 200.0, "payment", "Loan payment")
+        self.transaction_manager.add_transaction(self.phone.id, 50.0, "payment", "Phone payment")
+        self.before = self.state()
+
+    def state(self):
+        return (
+            [(e.id, e.label, e.amount, e.status) for e in self.ledger_manager.get_all_entries()],
+            [(t.id, t.entry_id, t.amount) for t in self.transaction_manager.get_all_transactions()],
+        )
+
+    def plan(self):
+        return [
+            {"action": "add_entry", "payload": {"entry_type": "loan", "label": "Mike", "amount": 40.0}},
+            {"action": "add_transaction", "payload": {"target_entry_label": "Visa Card", "amount": 100.0}},
+            {"action": "add_transaction", "payload": {"target_entry_label": "Mike", "amount": 40.0,
+                                                      "transaction_type": "repayment"}},
+        ]
+
+    def resolve(self, label):
+        return next((e for e in self.ledger_manager.get_all_entries() if e.label == label), None)
+
+    def test_failure_while_updating_statuses_is_rolled_back(self):
+        with patch.object(batch_executor, "_update_statuses", side_effect=update_statuses_then_fail):
+            with self.assertRaises(RuntimeError):
+                apply_plan(self.plan(), self.ledger_manager, self.transaction_manager, self.resolve)
+
+        self.assertEqual(self.state(), self.before)
+        self.assertEqual(self.card.status, "active")
+
+    def test_failure_while_adding_transactions_is_rolled_back(self):
+        with patch.object(self.transaction_manager, "add_transactions", side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                apply_plan(self.plan(), self.ledger_manager, self.transaction_manager, self.resolve)
+
+        self.assertEqual(self.state(), self.before)
+
+    def test_reopened_entry_is_restored_when_a_batch_fails(self):
+        refund = Transaction(entry_id=self.phone.id, transaction_type="payment", amount=-20.0, label="Refund")
+
+        with patch.object(batch_executor, "_update_statuses", side_effect=update_statuses_then_fail):
+            with self.assertRaises(RuntimeError):
+                apply_transactions([refund], self.ledger_manager, self.transaction_manager)
+
+        self.assertEqual(self.state(), self.before)
+        self.assertEqual(self.phone.status, "paid")
+
+    def test_successful_batch_settles_entries(self):
+        result = apply_plan(self.plan(), self.ledger_manager, self.transaction_manager, self.resolve)
+
+        self.assertEqual(self.card.status, "paid")
+        self.assertEqual([e.label for e in result.newly_paid], ["Mike", "Visa Card"])
+        self.assertEqual(len(self.transaction_manager.get_all_transactions()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
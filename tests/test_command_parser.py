@@ -0,0 +1,68 @@
+import pytest
+
+from Backend.core.command_parser import parse_command_locally
+
+# Command bar phrasings and what the local parser should make of them: (action, payload) for each
+# step, or None when the command must be left to the AI
+COMMAND_CORPUS = [
+    ("add a $50 debt for groceries",
+     [("add_entry", {"entry_type": "debt", "label": "groceries", "amount": 50.0})]),
+    ("Add $1,250.50 loan to John",
+     [("add_entry", {"entry_type": "loan", "label": "John", "amount": 1250.5})]),
+    ("create a new debt of 2k for the Car Repair",
+     [("add_entry", {"entry_type": "debt", "label": "Car Repair", "amount": 2000.0})]),
+    ("new loan called Sarah's rent for $300",
+     [("add_entry", {"entry_type": "loan", "label": "Sarah's rent", "amount": 300.0})]),
+    ("I lent Mike $40",
+     [("add_entry", {"entry_type": "loan", "label": "Mike", "amount": 40.0})]),
+    ("lent 75 dollars to my brother",
+     [("add_entry", {"entry_type": "loan", "label": "brother", "amount": 75.0})]),
+    ("I borrowed $500 from Dad",
+     [("add_entry", {"entry_type": "debt", "label": "Dad", "amount": 500.0})]),
+    ("I owe Sarah $20",
+     [("add_entry", {"entry_type": "debt", "label": "Sarah", "amount": 20.0})]),
+    ("paid $100 on my car loan",
+     [("add_transaction", {"transaction_type": "payment", "target_entry_label": "car loan", "amount": 100.0})]),
+    ("pay 250 towards Visa Credit Card",
+     [("add_transaction", {"transaction_type": "payment", "target_entry_label": "Visa Credit Card", "amount": 250.0})]),
+    ("make a $60 payment on the phone bill",
+     [("add_transaction", {"transaction_type": "payment", "target_entry_label": "phone bill", "amount": 60.0})]),
+    ("add a 1.5k repayment from Loan to Sarah",
+     [("add_transaction", {"transaction_type": "repayment", "target_entry_label": "Loan to Sarah", "amount": 1500.0})]),
+    ("I received $100 back from John",
+     [("add_transaction", {"transaction_type": "repayment", "target_entry_label": "John", "amount": 100.0})]),
+    ("Sarah paid me back $30",
+     [("add_transaction", {"transaction_type": "repayment", "target_entry_label": "Sarah", "amount": 30.0})]),
+    ("Can you please list my loans?",
+     [("list", {"filter_by_type": "loan"})]),
+    ("show all debts", [("list", {"filter_by_type": "debt"})]),
+    ("list everything", [("list", {})]),
+    ("list", [("list", {})]),
+    ("show me the summary", [("show_summary", {})]),
+    ("how am I doing?", [("show_summary", {})]),
+    ("add a $50 debt for groceries and then show summary",
+     [("add_entry", {"entry_type": "debt", "label": "groceries", "amount": 50.0}),
+      ("show_summary", {})]),
+    ("paid $20 on visa; list debts",
+     [("add_transaction", {"transaction_type": "payment", "target_entry_label": "visa", "amount": 20.0}),
+      ("list", {"filter_by_type": "debt"})]),
+    ("paid $20 on visa\npaid $35.50 on car loan\n\nI lent Mike $40",
+     [("add_transaction", {"transaction_type": "payment", "target_entry_label": "visa", "amount": 20.0}),
+      ("add_transaction", {"transaction_type": "payment", "target_entry_label": "car loan", "amount": 35.5}),
+      ("add_entry", {"entry_type": "loan", "label": "Mike", "amount": 40.0})]),
+    # Left to the AI: vague, wordy, or more than one amount in a step
+    ("I received a $100 repayment for the money I lent to John", None),
+    ("Add $50 grocery debt with tag #shopping and then show summary", None),
+    ("add a $50 debt for groceries and $20 for fuel", None),
+    ("add fifty dollars of debt for lunch", None),
+    ("delete the car loan", None),
+    ("what should I pay off first?", None),
+    ("add a debt for groceries", None),
+]
+
+
+@pytest.mark.parametrize("command, expected", COMMAND_CORPUS, ids=[command for command, _ in COMMAND_CORPUS])
+def test_parses_command_locally(command, expected):
+    parsed = parse_command_locally(command)
+    got = None if parsed is None else [(c["action"], c["payload"]) for c in parsed["commands"]]
+    assert got == expected
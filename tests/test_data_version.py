@@ -0,0 +1,54 @@
+import gc
+import unittest
+import weakref
+
+from Backend.core.data_version import bump_data_version, memoize_on_data_version
+
+
+class Snapshot:
+    """A stand-in for a manager's list that, unlike a list, can be weakly referenced."""
+    def __init__(self, values):
+        self.values = values
+
+
+calls = []
+
+
+@memoize_on_data_version(maxsize=16)
+def total(snapshot: Snapshot) -> int:
+    calls.append(snapshot)
+    return sum(snapshot.values)
+
+
+class MemoizeOnDataVersionTests(unittest.TestCase):
+    def setUp(self):
+        calls.clear()
+        total.cache.clear()
+
+    def test_result_is_reused_until_the_version_is_bumped(self):
+        snapshot = Snapshot([1, 2])
+        self.assertEqual(total(snapshot), 3)
+        self.assertEqual(total(snapshot), 3)
+        self.assertEqual(len(calls), 1)
+
+        snapshot.values.append(4)
+        bump_data_version()
+        self.assertEqual(total(snapshot), 7)
+        self.assertEqual(len(calls), 2)
+
+    def test_bump_releases_results_from_older_versions(self):
+        old = Snapshot([1])
+        total(old)
+        released = weakref.ref(old)
+        calls.clear()
+        del old
+
+        bump_data_version()
+        total(Snapshot([2]))
+        gc.collect()
+        self.assertIsNone(released())
+        self.assertEqual(len(total.cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
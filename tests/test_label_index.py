@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+
+from Backend.core.ledger_manager import LedgerEntry, LedgerManager
+
+
+class LabelIndexTests(unittest.TestCase):
+    """Resolving loosely worded labels through the LedgerManager's incrementally kept index."""
+
+    def setUp(self):
+        self.ledger_manager = LedgerManager()
+        self.visa = self.ledger_manager.add_entry("Visa Credit Card", 1000.0, "debt")
+        self.car = self.ledger_manager.add_entry("Car Loan", 8000.0, "debt")
+        self.sarah = self.ledger_manager.add_entry("Loan to Sarah", 300.0, "loan")
+        # Built now; from here on the edits must keep it up to date without a rebuild
+        index = self.ledger_manager.get_label_index()
+        rebuild = patch.object(index, "rebuild", side_effect=AssertionError("the label index was rebuilt"))
+        rebuild.start()
+        self.addCleanup(rebuild.stop)
+
+    def resolve(self, query: str, active_only: bool = True) -> list:
+        return [match.entry for match in self.ledger_manager.get_label_index().resolve(query, active_only=active_only)]
+
+    def test_exact_label_wins_over_labels_containing_it(self):
+        phone = self.ledger_manager.add_entry("Phone", 50.0, "debt")
+        self.ledger_manager.add_entry("Phone Repairs", 200.0, "debt")
+
+        self.assertEqual(self.resolve("the phone"), [phone])
+
+    def test_relabelled_entry_resolves_by_its_new_label(self):
+        self.car.label = "Toyota Finance"
+        self.ledger_manager.reindex_entry(self.car)
+
+        self.assertEqual(self.resolve("toyota finance"), [self.car])
+        self.assertNotIn(self.car, self.resolve("car loan"))
+
+    def test_deleted_entry_no_longer_resolves(self):
+        self.ledger_manager.delete_entries_by_id({self.visa.id})
+
+        self.assertEqual(self.resolve("visa credit card"), [])
+
+    def test_entries_added_in_a_batch_resolve(self):
+        phone, rent = LedgerEntry("Phone Bill", 60.0, "debt"), LedgerEntry("Rent Arrears", 900.0, "debt")
+        self.ledger_manager.add_entries([phone, rent])
+
+        self.assertEqual(self.resolve("phone bill"), [phone])
+        self.assertEqual(self.resolve("rent arrears"), [rent])
+
+    def test_typo_resolves_to_the_intended_entry(self):
+        self.assertEqual(self.resolve("visa credt crad"), [self.visa])
+        self.assertEqual(self.resolve("sarrah"), [self.sarah])
+
+    def test_close_candidates_are_all_returned(self):
+        matches = self.resolve("loan")
+
+        self.assertGreater(len(matches), 1)
+        self.assertCountEqual(matches, [self.car, self.sarah])
+
+    def test_paid_entries_are_excluded_when_only_active_ones_are_wanted(self):
+        self.visa.status = "paid"
+
+        self.assertEqual(self.resolve("visa credit card"), [])
+        self.assertEqual(self.resolve("visa credit card", active_only=False), [self.visa])
+
+    def test_unrelated_query_resolves_to_nothing(self):
+        self.assertEqual(self.resolve("mortgage"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()